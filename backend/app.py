@@ -5,12 +5,23 @@ eventlet.monkey_patch()  # 👈 Must be first to patch sockets/threads before an
 
 from flask import Flask, jsonify
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, jwt_required
 from config import config
 from models.core import db
 from routes import register_blueprints
 from sockets import socketio, register_socket_events
-from utils.helpers import initialize_database
+from sockets.message_queue import client_manager_options
+from migrations import run_migrations
+from utils.candidate_deck import candidate_decks
+from utils.swipe_index import swipe_index
+from utils.match_engine import match_engine
+from utils.session_registry import session_registry
+from utils.presence import presence, presence_store
+from utils.token_revocations import token_revocations
+from utils.rate_limit import rate_limiter
+from utils.blob_store import blob_store
+from utils.thumbnails import thumbnails
+from utils.feed import feed, feed_notifier
 from sqlalchemy.pool import NullPool
 from supabase import create_client
 
@@ -36,6 +47,16 @@ def create_app(config_name=None):
     # ✅ Initialize extensions FIRST
     db.init_app(app)
     jwt = JWTManager(app)
+    candidate_decks.init_app(app)
+    swipe_index.init_app(app)
+    match_engine.init_app(app)
+    session_registry.init_app(app)
+    presence.init_app(app)
+    presence_store.init_app(app)
+    token_revocations.init_app(app)
+    rate_limiter.init_app(app)
+    feed.init_app(app)
+    feed_notifier.init_app(app)
 
 
     # ✅ Initialize Supabase after app is created
@@ -44,6 +65,8 @@ def create_app(config_name=None):
         app.config['SUPABASE_KEY']
     )
     app.config['supabase'] = supabase
+    blob_store.init_app(app)
+    thumbnails.init_app(app)
 
     # ✅ Configure CORS
     CORS(
@@ -70,14 +93,16 @@ def create_app(config_name=None):
         ping_timeout=60000,
         ping_interval=25000,
         supports_credentials=True,
+        **client_manager_options(app),  # ✅ fan-out between worker processes, if configured
     )
 
 
     # ✅ FIXED: Import and register socket events AFTER app context is set up
     with app.app_context():
-        # ✅ Initialize database and test connection
+        # ✅ Apply schema migrations and test connection
         try:
-            initialize_database()
+            if app.config.get('AUTO_MIGRATE', True):
+                run_migrations()
             # Test database connection
             db.session.execute('SELECT 1')
             print("✅ Database connection successful")
@@ -89,12 +114,13 @@ def create_app(config_name=None):
     register_socket_events()
 
     # JWT Configuration
-    from models.user import User, TokenBlocklist
+    from models.user import User
+    from utils.security import load_identity, get_current_user_from_jwt
 
+    # Revocation is checked in memory, the database is only asked on a Bloom filter hit
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
-        jti = jwt_payload["jti"]
-        return TokenBlocklist.query.filter_by(jti=jti).first() is not None
+        return token_revocations.is_revoked(jwt_payload["jti"])
 
     @jwt.user_identity_loader
     def user_identity_lookup(user):
@@ -104,8 +130,7 @@ def create_app(config_name=None):
 
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
-        identity = jwt_data["sub"]
-        return User.query.filter_by(public_id=identity).first()
+        return load_identity(jwt_data["sub"])
 
     # JWT Error handlers
     @jwt.unauthorized_loader
@@ -149,11 +174,9 @@ def create_app(config_name=None):
     @app.route("/protected")
     @jwt_required()
     def protected():
-        public_id = get_jwt_identity()
-        user = User.query.filter_by(public_id=public_id).first()
-
-        if not user:
-            return jsonify({"success": False, "message": "User not found"}), 404
+        user, error_response, status_code = get_current_user_from_jwt()
+        if error_response:
+            return error_response, status_code
 
         return jsonify({"success": True, "user": user.to_dict()})
     
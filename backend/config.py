@@ -22,6 +22,9 @@ class Config:
     SQLALCHEMY_DATABASE_URI = DB_URL
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Apply pending schema migrations on startup (manage.py turns this off)
+    AUTO_MIGRATE = os.environ.get("AUTO_MIGRATE", "true").lower() == "true"
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
@@ -57,6 +60,76 @@ class Config:
     PAYMENT_FAILURE_URL = os.getenv('PAYMENT_FAILURE_URL', 'https://laumeet.com/payment/failed')
 
 
+    # Shared state backend (optional, used when a backend below is set to 'redis')
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+    # Explore candidate decks
+    EXPLORE_DECK_TTL_SECONDS = int(os.getenv('EXPLORE_DECK_TTL_SECONDS', 1800))
+    EXPLORE_DECK_MAX_DECKS = int(os.getenv('EXPLORE_DECK_MAX_DECKS', 10000))
+
+    # Swipe exclusion index for explore ('memory' or 'redis')
+    SWIPE_INDEX_BACKEND = os.getenv('SWIPE_INDEX_BACKEND', 'memory')
+    SWIPE_INDEX_TTL_SECONDS = int(os.getenv('SWIPE_INDEX_TTL_SECONDS', 3600))
+    SWIPE_INDEX_MAX_USERS = int(os.getenv('SWIPE_INDEX_MAX_USERS', 20000))
+
+    # Match engine's reverse index of pending likes ('memory' for one process, 'redis' shared by all workers)
+    MATCH_INDEX_BACKEND = os.getenv('MATCH_INDEX_BACKEND', 'memory')
+    MATCH_INDEX_TTL_SECONDS = int(os.getenv('MATCH_INDEX_TTL_SECONDS', 3600))
+    MATCH_INDEX_MAX_USERS = int(os.getenv('MATCH_INDEX_MAX_USERS', 20000))
+
+    # Socket session registry ('memory', or 'redis' / 'local' to share presence across processes)
+    SESSION_REGISTRY_BACKEND = os.getenv('SESSION_REGISTRY_BACKEND', 'memory')
+    SESSION_REGISTRY_SHARDS = int(os.getenv('SESSION_REGISTRY_SHARDS', 16))
+    # Shared backends: each process refreshes its sockets this often, sockets not refreshed within the TTL count as gone
+    SESSION_HEARTBEAT_SECONDS = float(os.getenv('SESSION_HEARTBEAT_SECONDS', 30))
+    SESSION_TTL_SECONDS = float(os.getenv('SESSION_TTL_SECONDS', 90))
+
+    # Socket.IO fan-out between processes (see sockets/message_queue.py), empty for one process
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE', '')
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+
+    # UNIX socket of the local hub (python manage.py sockets hub)
+    LOCAL_HUB_PATH = os.getenv('LOCAL_HUB_PATH', '/tmp/laumeet-hub.sock')
+
+    # Presence digests: offline only after the grace period, changes batched per interval
+    PRESENCE_OFFLINE_GRACE_SECONDS = float(os.getenv('PRESENCE_OFFLINE_GRACE_SECONDS', 10))
+    PRESENCE_DIGEST_INTERVAL_SECONDS = float(os.getenv('PRESENCE_DIGEST_INTERVAL_SECONDS', 2))
+
+    # Presence write-behind: is_online / last_seen are persisted in bulk this often
+    PRESENCE_FLUSH_INTERVAL_SECONDS = float(os.getenv('PRESENCE_FLUSH_INTERVAL_SECONDS', 5))
+
+    # Revoked token cache (Bloom filter over unexpired blocklist rows)
+    TOKEN_BLOCKLIST_BLOOM_CAPACITY = int(os.getenv('TOKEN_BLOCKLIST_BLOOM_CAPACITY', 100000))
+    TOKEN_BLOCKLIST_SYNC_SECONDS = float(os.getenv('TOKEN_BLOCKLIST_SYNC_SECONDS', 10))
+    # Each sync re-reads revocations this far back, covering late commits and clock skew between workers
+    TOKEN_BLOCKLIST_SYNC_OVERLAP_SECONDS = float(os.getenv('TOKEN_BLOCKLIST_SYNC_OVERLAP_SECONDS', 60))
+    TOKEN_BLOCKLIST_PRUNE_SECONDS = float(os.getenv('TOKEN_BLOCKLIST_PRUNE_SECONDS', 3600))
+    TOKEN_BLOCKLIST_PRUNE_BATCH_SIZE = int(os.getenv('TOKEN_BLOCKLIST_PRUNE_BATCH_SIZE', 1000))
+
+    # Rate limiting counters ('memory' per worker, 'redis' shared by all workers)
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+
+    # Home feed page cache (shared by all viewers, per worker)
+    FEED_PAGE_CACHE_TTL_SECONDS = int(os.getenv('FEED_PAGE_CACHE_TTL_SECONDS', 30))
+    FEED_PAGE_CACHE_MAX_PAGES = int(os.getenv('FEED_PAGE_CACHE_MAX_PAGES', 512))
+    # Most comments a feed request may inline per post (?comments=N)
+    FEED_INLINE_COMMENTS_MAX = int(os.getenv('FEED_INLINE_COMMENTS_MAX', 3))
+
+    # Realtime feed topics: changes are coalesced into one event per topic this often
+    FEED_EVENTS_INTERVAL_SECONDS = float(os.getenv('FEED_EVENTS_INTERVAL_SECONDS', 1))
+
+    # Image blob store ('local' under static/uploads, 'supabase' storage bucket)
+    IMAGE_STORE_BACKEND = os.getenv('IMAGE_STORE_BACKEND', 'local')
+    IMAGE_STORE_ROOT = os.getenv('IMAGE_STORE_ROOT')
+    IMAGE_STORE_BUCKET = os.getenv('IMAGE_STORE_BUCKET', 'upload')
+
+    # Precomputed thumbnails (longest side in px, first format is the one serializers link)
+    IMAGE_THUMBNAIL_SIZES = [int(size) for size in os.getenv('IMAGE_THUMBNAIL_SIZES', '64,256,800').split(',')]
+    IMAGE_THUMBNAIL_FORMATS = os.getenv('IMAGE_THUMBNAIL_FORMATS', 'webp,jpg').split(',')
+    IMAGE_THUMBNAIL_QUALITY = int(os.getenv('IMAGE_THUMBNAIL_QUALITY', 80))
+    IMAGE_THUMBNAIL_WORKERS = int(os.getenv('IMAGE_THUMBNAIL_WORKERS', 2))
+
     # CORS origins
     CORS_ORIGINS = [
         "https://laumeet.vercel.app",
@@ -0,0 +1,247 @@
+"""
+Management commands
+Usage:
+    python manage.py db upgrade [--target N]
+    python manage.py db downgrade --target N
+    python manage.py db status
+    python manage.py db report [--live] [--output FILE]
+    python manage.py counters rebuild-unread [--user-id ID ...]
+    python manage.py counters rebuild-posts [--post-id ID ...]
+    python manage.py counters rebuild-liked-me [--user-id ID ...]
+    python manage.py matches backfill
+    python manage.py sockets hub [--path FILE]
+    python manage.py tokens prune
+    python manage.py images migrate [--batch-size N]
+    python manage.py images thumbnails [--batch-size N]
+    python manage.py serializers bench [--limit N] [--repeat N]
+"""
+import argparse
+import os
+
+# Commands decide themselves when to migrate
+os.environ.setdefault("AUTO_MIGRATE", "false")
+
+
+def get_app():
+    from app import app
+    return app
+
+
+def db_upgrade(args):
+    from migrations import run_migrations
+    with get_app().app_context():
+        applied = run_migrations() if args.target is None else _upgrade_to(args.target)
+    print(f"Applied {len(applied)} migration(s)")
+
+
+def _upgrade_to(target):
+    from migrations import upgrade
+    from models.core import db
+    db.create_all()
+    return upgrade(db.engine, target=target)
+
+
+def db_downgrade(args):
+    from migrations import downgrade
+    from models.core import db
+    with get_app().app_context():
+        reverted = downgrade(db.engine, args.target)
+    print(f"Reverted {len(reverted)} migration(s)")
+
+
+def db_status(args):
+    from migrations import discover_migrations, applied_versions
+    from models.core import db
+    with get_app().app_context():
+        with db.engine.begin() as connection:
+            done = applied_versions(connection)
+    for module in discover_migrations():
+        state = "applied" if module.VERSION in done else "pending"
+        print(f"{module.VERSION:04d}  {state:8}  {module.DESCRIPTION}")
+
+
+def db_report(args):
+    from migrations.report import scratch_report, live_report
+    if args.live:
+        from models.core import db
+        with get_app().app_context():
+            report = live_report(db.engine)
+    else:
+        report = scratch_report()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+        print(f"Report written to {args.output}")
+    else:
+        print(report)
+
+
+def counters_rebuild_unread(args):
+    from models.core import db
+    from utils.unread_counters import rebuild
+    with get_app().app_context():
+        rebuild(db.session, user_ids=args.user_id)
+        db.session.commit()
+    print("Unread counters rebuilt from messages")
+
+
+def counters_rebuild_posts(args):
+    from models.core import db
+    from utils.post_counters import rebuild
+    with get_app().app_context():
+        rebuild(db.session, post_ids=args.post_id)
+        db.session.commit()
+    print("Post like and comment counters rebuilt")
+
+
+def counters_rebuild_liked_me(args):
+    from models.core import db
+    from utils.liked_me import rebuild
+    with get_app().app_context():
+        rebuild(db.session, user_ids=args.user_id)
+        db.session.commit()
+    print("Liked-me inboxes and pending like counters rebuilt from swipes")
+
+
+def matches_backfill(args):
+    from models.core import db
+    from utils.match_engine import backfill
+    with get_app().app_context():
+        backfill(db.session)
+        db.session.commit()
+    print("Match records written for mutual likes")
+
+
+def sockets_hub(args):
+    from config import Config
+    from utils.local_hub import serve
+    serve(args.path or Config.LOCAL_HUB_PATH)
+
+
+def tokens_prune(args):
+    from utils.token_revocations import token_revocations
+    with get_app().app_context():
+        deleted = token_revocations.prune()
+    print(f"Deleted {deleted} expired blocklist token(s)")
+
+
+def images_migrate(args):
+    from models.user import Picture, Post
+    from utils.blob_store import migrate_inline_images
+    from utils.thumbnails import thumbnails
+    with get_app().app_context():
+        for column in (Picture.image, Post.image):
+            moved = 0
+            for batch in migrate_inline_images(column, batch_size=args.batch_size, save=thumbnails.store):
+                moved += batch
+                print(f"  {column.class_.__tablename__}: {moved} image(s) moved")
+            print(f"Moved {moved} inline image(s) out of {column.class_.__tablename__}")
+        thumbnails.wait()
+
+
+def images_thumbnails(args):
+    from models.user import Picture, Post
+    from utils.thumbnails import backfill_thumbnails, thumbnails
+    with get_app().app_context():
+        for column in (Picture.image, Post.image):
+            done = 0
+            for batch in backfill_thumbnails(column, batch_size=args.batch_size):
+                done += batch
+            print(f"Checked thumbnails of {done} image(s) in {column.class_.__tablename__}")
+        thumbnails.wait()
+
+
+def serializers_bench(args):
+    from utils.serializers import benchmark_projections
+    with get_app().test_request_context():
+        results = benchmark_projections(limit=args.limit, repeat=args.repeat)
+    print(f"{'projection':<12}{'users':>8}{'bytes/user':>14}{'ms/user':>10}")
+    for row in results:
+        print(f"{row['projection']:<12}{row['users']:>8}{row['bytes_per_user']:>14.0f}{row['ms_per_user']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laumeet backend management commands")
+    groups = parser.add_subparsers(dest="group", required=True)
+
+    db_parser = groups.add_parser("db", help="Database schema commands")
+    db_commands = db_parser.add_subparsers(dest="command", required=True)
+
+    upgrade_parser = db_commands.add_parser("upgrade", help="Apply pending migrations")
+    upgrade_parser.add_argument("--target", type=int, help="Highest version to apply")
+    upgrade_parser.set_defaults(func=db_upgrade)
+
+    downgrade_parser = db_commands.add_parser("downgrade", help="Revert migrations above a version")
+    downgrade_parser.add_argument("--target", type=int, required=True, help="Version to keep")
+    downgrade_parser.set_defaults(func=db_downgrade)
+
+    status_parser = db_commands.add_parser("status", help="List migrations and their state")
+    status_parser.set_defaults(func=db_status)
+
+    report_parser = db_commands.add_parser("report", help="Show before/after query plans for hot paths")
+    report_parser.add_argument("--live", action="store_true", help="Explain against the configured database")
+    report_parser.add_argument("--output", help="Write the report to a file")
+    report_parser.set_defaults(func=db_report)
+
+    counters_parser = groups.add_parser("counters", help="Denormalized counter maintenance")
+    counters_commands = counters_parser.add_subparsers(dest="command", required=True)
+
+    rebuild_unread_parser = counters_commands.add_parser("rebuild-unread", help="Recompute unread counters from messages")
+    rebuild_unread_parser.add_argument("--user-id", type=int, action="append", help="Only rebuild these users")
+    rebuild_unread_parser.set_defaults(func=counters_rebuild_unread)
+
+    rebuild_posts_parser = counters_commands.add_parser("rebuild-posts", help="Recompute post like/comment counters")
+    rebuild_posts_parser.add_argument("--post-id", type=int, action="append", help="Only rebuild these posts")
+    rebuild_posts_parser.set_defaults(func=counters_rebuild_posts)
+
+    rebuild_liked_me_parser = counters_commands.add_parser(
+        "rebuild-liked-me", help="Recompute liked-me inboxes and pending like counters"
+    )
+    rebuild_liked_me_parser.add_argument("--user-id", type=int, action="append", help="Only rebuild these users")
+    rebuild_liked_me_parser.set_defaults(func=counters_rebuild_liked_me)
+
+    matches_parser = groups.add_parser("matches", help="Match record maintenance")
+    matches_commands = matches_parser.add_subparsers(dest="command", required=True)
+
+    backfill_parser = matches_commands.add_parser("backfill", help="Write match records for existing mutual likes")
+    backfill_parser.set_defaults(func=matches_backfill)
+
+    sockets_parser = groups.add_parser("sockets", help="Socket.IO scale-out helpers")
+    sockets_commands = sockets_parser.add_subparsers(dest="command", required=True)
+
+    hub_parser = sockets_commands.add_parser("hub", help="Run the local pub/sub and presence hub")
+    hub_parser.add_argument("--path", help="UNIX socket path (default LOCAL_HUB_PATH)")
+    hub_parser.set_defaults(func=sockets_hub)
+
+    tokens_parser = groups.add_parser("tokens", help="JWT blocklist maintenance")
+    tokens_commands = tokens_parser.add_subparsers(dest="command", required=True)
+
+    prune_parser = tokens_commands.add_parser("prune", help="Delete expired blocklist rows")
+    prune_parser.set_defaults(func=tokens_prune)
+
+    images_parser = groups.add_parser("images", help="Image storage maintenance")
+    images_commands = images_parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = images_commands.add_parser("migrate", help="Move base64 images from the database to the blob store")
+    migrate_parser.add_argument("--batch-size", type=int, default=200, help="Rows per batch")
+    migrate_parser.set_defaults(func=images_migrate)
+
+    thumbnails_parser = images_commands.add_parser("thumbnails", help="Render missing thumbnails of stored images")
+    thumbnails_parser.add_argument("--batch-size", type=int, default=100, help="Rows per batch")
+    thumbnails_parser.set_defaults(func=images_thumbnails)
+
+    serializers_parser = groups.add_parser("serializers", help="User serializer projections")
+    serializers_commands = serializers_parser.add_subparsers(dest="command", required=True)
+
+    bench_parser = serializers_commands.add_parser("bench", help="Payload size and time per projection")
+    bench_parser.add_argument("--limit", type=int, default=200, help="Users to serialize")
+    bench_parser.add_argument("--repeat", type=int, default=5, help="Runs to average")
+    bench_parser.set_defaults(func=serializers_bench)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
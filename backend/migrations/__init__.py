@@ -0,0 +1,112 @@
+"""
+Versioned schema migrations
+Each module in migrations/versions defines VERSION, DESCRIPTION, upgrade(connection)
+and optionally downgrade(connection). Applied versions are recorded in schema_migrations.
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import text
+
+from migrations import versions
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+def discover_migrations():
+    """Import every migration module and return them ordered by VERSION"""
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions.__path__)
+    ]
+    modules.sort(key=lambda module: module.VERSION)
+
+    seen = set()
+    for module in modules:
+        if module.VERSION in seen:
+            raise RuntimeError(f"Duplicate migration version {module.VERSION}")
+        seen.add(module.VERSION)
+    return modules
+
+
+def _ensure_migrations_table(connection):
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def applied_versions(connection):
+    """Return the set of versions already applied to the database"""
+    _ensure_migrations_table(connection)
+    return {row[0] for row in connection.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+
+def pending_migrations(connection):
+    """Return migration modules that have not been applied yet, in order"""
+    done = applied_versions(connection)
+    return [module for module in discover_migrations() if module.VERSION not in done]
+
+
+def upgrade(engine, target=None):
+    """
+    Apply pending migrations in order, each in its own transaction
+    Args:
+        engine: SQLAlchemy engine to migrate
+        target: Optional highest version to apply
+    Returns:
+        List of applied versions
+    """
+    with engine.begin() as connection:
+        pending = pending_migrations(connection)
+
+    applied = []
+    for module in pending:
+        if target is not None and module.VERSION > target:
+            break
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(
+                text(f"INSERT INTO {MIGRATIONS_TABLE} (version, description, applied_at) "
+                     "VALUES (:version, :description, :applied_at)"),
+                {"version": module.VERSION, "description": module.DESCRIPTION, "applied_at": datetime.utcnow()}
+            )
+        print(f"✅ Applied migration {module.VERSION:04d}: {module.DESCRIPTION}")
+        applied.append(module.VERSION)
+    return applied
+
+
+def downgrade(engine, target):
+    """Roll back applied migrations above target, newest first"""
+    with engine.begin() as connection:
+        done = applied_versions(connection)
+
+    reverted = []
+    for module in reversed(discover_migrations()):
+        if module.VERSION <= target or module.VERSION not in done:
+            continue
+        if not hasattr(module, "downgrade"):
+            raise RuntimeError(f"Migration {module.VERSION} cannot be downgraded")
+        with engine.begin() as connection:
+            module.downgrade(connection)
+            connection.execute(text(f"DELETE FROM {MIGRATIONS_TABLE} WHERE version = :version"),
+                               {"version": module.VERSION})
+        print(f"↩️ Reverted migration {module.VERSION:04d}: {module.DESCRIPTION}")
+        reverted.append(module.VERSION)
+    return reverted
+
+
+def run_migrations():
+    """
+    Bring the database schema up to date
+    Creates missing tables from the models, then applies pending versioned migrations
+    Must be called inside an app context
+    """
+    from models.core import db
+    import models  # noqa: F401 - register every model on the metadata
+
+    db.create_all()
+    return upgrade(db.engine)
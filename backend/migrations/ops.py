@@ -0,0 +1,63 @@
+from sqlalchemy import inspect, text
+
+
+def create_index(connection, name, table, columns, unique=False, where=None):
+    """
+    Create an index if it does not exist yet
+    Args:
+        connection: Open SQLAlchemy connection (inside the migration transaction)
+        name: Index name
+        table: Table name
+        columns: List of column names
+        unique: Whether to create a unique index
+        where: Optional SQL predicate for a partial index (supported by SQLite and PostgreSQL)
+    """
+    statement = "CREATE {unique}INDEX IF NOT EXISTS {name} ON {table} ({columns})".format(
+        unique="UNIQUE " if unique else "",
+        name=name,
+        table=table,
+        columns=", ".join(columns)
+    )
+    if where:
+        statement += f" WHERE {where}"
+    connection.execute(text(statement))
+
+
+def drop_index(connection, name):
+    """Drop an index if it exists"""
+    connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def has_column(connection, table, column):
+    """Check whether a table already has a column"""
+    return column in {col["name"] for col in inspect(connection).get_columns(table)}
+
+
+def add_column(connection, table, column, ddl):
+    """
+    Add a column if it is missing
+    Args:
+        ddl: Column type and constraints, e.g. "INTEGER NOT NULL DEFAULT 0"
+    """
+    if not has_column(connection, table, column):
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def drop_column(connection, table, column):
+    """Drop a column if it exists (SQLite needs 3.35+)"""
+    if has_column(connection, table, column):
+        connection.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+
+
+def delete_duplicates(connection, table, columns, where=None):
+    """
+    Keep only the oldest row (lowest id) for each combination of columns
+    Used before adding a unique index to a table that may already hold duplicates
+    """
+    group_by = ", ".join(columns)
+    condition = f"WHERE {where}" if where else ""
+    also = f"AND {where}" if where else ""
+    connection.execute(text(
+        f"DELETE FROM {table} WHERE id NOT IN "
+        f"(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM {table} {condition} GROUP BY {group_by}) AS keep) {also}"
+    ))
@@ -0,0 +1,179 @@
+"""
+Query plan report for the hot-path queries covered by the migrations
+The scratch report builds an empty SQLite database from the models, drops the
+migration indexes to capture the "before" plans, re-applies every migration
+and captures the "after" plans.
+"""
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from migrations import discover_migrations
+
+# (name, SQL, parameters) for the statements behind explore, matches, liked-me,
+# chat history, unread counts and the like toggle
+HOT_PATH_QUERIES = [
+    (
+        "explore: liked users",
+        "SELECT target_user_id FROM swipes WHERE user_id = :user_id AND action = 'like'",
+        {"user_id": 1},
+    ),
+    (
+        "explore: recent passes",
+        "SELECT target_user_id FROM swipes WHERE user_id = :user_id AND action = 'pass' AND timestamp > :since",
+        {"user_id": 1, "since": "2025-01-01 00:00:00"},
+    ),
+    (
+        "swipe: reverse like lookup",
+        "SELECT id FROM swipes WHERE user_id = :target_id AND target_user_id = :user_id AND action = 'like'",
+        {"user_id": 1, "target_id": 2},
+    ),
+    (
+        "match engine: pending inbound likes (cold load)",
+        "SELECT user_id FROM swipes WHERE target_user_id = :user_id AND action = 'like' AND user_id NOT IN "
+        "(SELECT target_user_id FROM swipes WHERE user_id = :user_id AND action = 'like' AND target_user_id != :target_id)",
+        {"user_id": 1, "target_id": 2},
+    ),
+    (
+        "matches / liked-me: inbound likes",
+        "SELECT user_id, timestamp FROM swipes WHERE target_user_id = :user_id AND action = 'like'",
+        {"user_id": 1},
+    ),
+    (
+        "matches: newest page",
+        "SELECT matched_at, CASE WHEN user1_id = :user_id THEN user2_id ELSE user1_id END AS other_user_id "
+        "FROM matches WHERE user1_id = :user_id OR user2_id = :user_id "
+        "ORDER BY matched_at DESC, other_user_id DESC LIMIT 51",
+        {"user_id": 1},
+    ),
+    (
+        "liked-me: inbox page",
+        "SELECT liker_id, liked_at FROM liked_me_inbox WHERE user_id = :user_id "
+        "ORDER BY liked_at DESC, liker_id DESC LIMIT 21",
+        {"user_id": 1},
+    ),
+    (
+        "get_messages: latest page",
+        "SELECT id FROM messages WHERE conversation_id = :conversation_id ORDER BY timestamp DESC LIMIT 50",
+        {"conversation_id": 1},
+    ),
+    (
+        "unread count",
+        "SELECT COUNT(*) FROM messages WHERE conversation_id = :conversation_id "
+        "AND sender_id != :user_id AND is_read = :is_read",
+        {"conversation_id": 1, "user_id": 1, "is_read": False},
+    ),
+    (
+        "inbox: user's conversations",
+        "SELECT id FROM conversations WHERE user1_id = :user_id OR user2_id = :user_id",
+        {"user_id": 1},
+    ),
+    (
+        "inbox: first picture",
+        "SELECT image FROM pictures WHERE user_id = :user_id ORDER BY id LIMIT 1",
+        {"user_id": 1},
+    ),
+    (
+        "like toggle lookup",
+        "SELECT id FROM likes WHERE post_id = :post_id AND user_id = :user_id",
+        {"post_id": 1, "user_id": 1},
+    ),
+    (
+        "token blocklist: recent revocations",
+        "SELECT jti FROM token_blacklist WHERE revoked_at >= :since",
+        {"since": "2025-01-01 00:00:00"},
+    ),
+    (
+        "token blocklist: expired rows to prune",
+        "SELECT id FROM token_blacklist WHERE expires <= :now LIMIT 1000",
+        {"now": "2025-01-01 00:00:00"},
+    ),
+    (
+        "feed: keyset page",
+        "SELECT id FROM posts WHERE created_at < :created_at OR (created_at = :created_at AND id < :id) "
+        "ORDER BY created_at DESC, id DESC LIMIT 21",
+        {"created_at": "2025-01-01 00:00:00", "id": 100},
+    ),
+    (
+        "feed: counters and viewer's likes for a page",
+        "SELECT posts.id, likes_count, comments_count, EXISTS (SELECT likes.id FROM likes "
+        "WHERE likes.post_id = posts.id AND likes.user_id = :user_id) FROM posts WHERE posts.id IN (1, 2, 3, 4, 5)",
+        {"user_id": 1},
+    ),
+    (
+        "comments: keyset page",
+        "SELECT id FROM comments WHERE post_id = :post_id AND (created_at < :created_at "
+        "OR (created_at = :created_at AND id < :id)) ORDER BY created_at DESC, id DESC LIMIT 51",
+        {"post_id": 1, "created_at": "2025-01-01 00:00:00", "id": 100},
+    ),
+    (
+        "feed: newest comments per post",
+        "SELECT id FROM (SELECT id, row_number() OVER (PARTITION BY post_id ORDER BY created_at DESC, id DESC) "
+        "AS rank FROM comments WHERE post_id IN (1, 2, 3, 4, 5)) WHERE rank <= 3",
+        {},
+    ),
+    (
+        "post likes count",
+        "SELECT COUNT(*) FROM likes WHERE post_id = :post_id",
+        {"post_id": 1},
+    ),
+]
+
+
+def explain(connection, sql, params):
+    """Return the query plan for sql as a list of lines"""
+    if connection.dialect.name == "sqlite":
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+        return [row[-1] for row in rows]
+    rows = connection.execute(text(f"EXPLAIN {sql}"), params).fetchall()
+    return [row[0] for row in rows]
+
+
+def capture_plans(connection):
+    """Run EXPLAIN for every hot-path query, noting queries that need columns added by later migrations"""
+    plans = {}
+    for name, sql, params in HOT_PATH_QUERIES:
+        try:
+            plans[name] = explain(connection, sql, params)
+        except OperationalError as e:
+            plans[name] = [f"(not available on this schema: {e.orig})"]
+    return plans
+
+
+def scratch_report():
+    """Build before/after plans on a throwaway SQLite database"""
+    from models.core import db
+    import models  # noqa: F401 - register every model on the metadata
+
+    engine = create_engine("sqlite://")
+    db.metadata.create_all(engine)
+    migrations = discover_migrations()
+
+    with engine.begin() as connection:
+        for module in reversed(migrations):
+            if hasattr(module, "downgrade"):
+                module.downgrade(connection)
+        before = capture_plans(connection)
+
+        for module in migrations:
+            module.upgrade(connection)
+        after = capture_plans(connection)
+
+    return format_report(before, after)
+
+
+def live_report(engine):
+    """Show the current plans on the configured database"""
+    with engine.connect() as connection:
+        plans = capture_plans(connection)
+    return format_report(None, plans, title=f"Query plans ({engine.dialect.name}, current schema)")
+
+
+def format_report(before, after, title="Query plans before/after migrations (SQLite)"):
+    lines = [f"# {title}", ""]
+    for name, sql, _ in HOT_PATH_QUERIES:
+        lines += [f"## {name}", "", "```sql", sql, "```", ""]
+        if before is not None:
+            lines += ["Before:", ""] + [f"    {line}" for line in before[name]] + [""]
+            lines += ["After:", ""]
+        lines += [f"    {line}" for line in after[name]] + [""]
+    return "\n".join(lines)
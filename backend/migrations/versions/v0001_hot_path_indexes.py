@@ -0,0 +1,39 @@
+"""
+Composite indexes and uniqueness constraints for the swipe, message and like hot paths
+"""
+from migrations.ops import create_index, drop_index, delete_duplicates
+
+VERSION = 1
+DESCRIPTION = "Hot path indexes for swipes, messages and likes"
+
+
+def upgrade(connection):
+    # Swipes: explore exclusions, matches and liked-me
+    create_index(connection, "ix_swipes_user_action_timestamp", "swipes", ["user_id", "action", "timestamp"])
+    create_index(connection, "ix_swipes_target_action", "swipes", ["target_user_id", "action"])
+
+    # A user can only like another user once (passes may repeat after the reshow window)
+    delete_duplicates(connection, "swipes", ["user_id", "target_user_id"], where="action = 'like'")
+    create_index(connection, "uq_swipes_user_target_like", "swipes", ["user_id", "target_user_id"],
+                 unique=True, where="action = 'like'")
+
+    # Messages: chat history and unread counts
+    create_index(connection, "ix_messages_conversation_timestamp", "messages", ["conversation_id", "timestamp"])
+    create_index(connection, "ix_messages_conversation_sender_read", "messages",
+                 ["conversation_id", "sender_id", "is_read"])
+
+    # Likes: one like per user per post, also serves per-post counts
+    delete_duplicates(connection, "likes", ["post_id", "user_id"])
+    create_index(connection, "uq_likes_post_user", "likes", ["post_id", "user_id"], unique=True)
+
+
+def downgrade(connection):
+    for name in (
+        "ix_swipes_user_action_timestamp",
+        "ix_swipes_target_action",
+        "uq_swipes_user_target_like",
+        "ix_messages_conversation_timestamp",
+        "ix_messages_conversation_sender_read",
+        "uq_likes_post_user",
+    ):
+        drop_index(connection, name)
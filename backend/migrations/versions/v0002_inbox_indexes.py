@@ -0,0 +1,18 @@
+"""
+Indexes for the single-query inbox: conversation participants and first picture lookup
+"""
+from migrations.ops import create_index, drop_index
+
+VERSION = 2
+DESCRIPTION = "Inbox indexes for conversations and pictures"
+
+
+def upgrade(connection):
+    create_index(connection, "ix_conversations_user1_id", "conversations", ["user1_id"])
+    create_index(connection, "ix_conversations_user2_id", "conversations", ["user2_id"])
+    create_index(connection, "ix_pictures_user_id", "pictures", ["user_id"])
+
+
+def downgrade(connection):
+    for name in ("ix_conversations_user1_id", "ix_conversations_user2_id", "ix_pictures_user_id"):
+        drop_index(connection, name)
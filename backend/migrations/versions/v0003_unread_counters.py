@@ -0,0 +1,30 @@
+"""
+Materialized unread counters per (user, conversation) and per-user totals, backfilled from messages
+"""
+from sqlalchemy import text
+
+VERSION = 3
+DESCRIPTION = "Unread message counters"
+
+
+def upgrade(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS unread_counters ("
+        "user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE, "
+        "conversation_id INTEGER NOT NULL REFERENCES conversations(id) ON DELETE CASCADE, "
+        "unread_count INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (user_id, conversation_id))"
+    ))
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS user_counters ("
+        "user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE PRIMARY KEY, "
+        "unread_messages INTEGER NOT NULL DEFAULT 0)"
+    ))
+
+    from utils.unread_counters import rebuild
+    rebuild(connection)
+
+
+def downgrade(connection):
+    connection.execute(text("DROP TABLE IF EXISTS unread_counters"))
+    connection.execute(text("DROP TABLE IF EXISTS user_counters"))
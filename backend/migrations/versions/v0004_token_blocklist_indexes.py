@@ -0,0 +1,17 @@
+"""
+Indexes for the token revocation cache: syncing recent revocations and pruning expired rows
+"""
+from migrations.ops import create_index, drop_index
+
+VERSION = 4
+DESCRIPTION = "Token blocklist indexes for revocation sync and pruning"
+
+
+def upgrade(connection):
+    create_index(connection, "ix_token_blacklist_revoked_at", "token_blacklist", ["revoked_at"])
+    create_index(connection, "ix_token_blacklist_expires", "token_blacklist", ["expires"])
+
+
+def downgrade(connection):
+    for name in ("ix_token_blacklist_revoked_at", "ix_token_blacklist_expires"):
+        drop_index(connection, name)
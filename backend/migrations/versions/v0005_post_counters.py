@@ -0,0 +1,20 @@
+"""
+Denormalized like and comment counters on posts, backfilled from the likes and comments tables
+"""
+from migrations.ops import add_column, drop_column
+
+VERSION = 5
+DESCRIPTION = "Post like and comment counters"
+
+
+def upgrade(connection):
+    add_column(connection, "posts", "likes_count", "INTEGER NOT NULL DEFAULT 0")
+    add_column(connection, "posts", "comments_count", "INTEGER NOT NULL DEFAULT 0")
+
+    from utils.post_counters import rebuild
+    rebuild(connection)
+
+
+def downgrade(connection):
+    drop_column(connection, "posts", "likes_count")
+    drop_column(connection, "posts", "comments_count")
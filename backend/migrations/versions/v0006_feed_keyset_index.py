@@ -0,0 +1,15 @@
+"""
+Index for paging the home feed by (created_at, id)
+"""
+from migrations.ops import create_index, drop_index
+
+VERSION = 6
+DESCRIPTION = "Feed keyset index on posts"
+
+
+def upgrade(connection):
+    create_index(connection, "ix_posts_created_at_id", "posts", ["created_at", "id"])
+
+
+def downgrade(connection):
+    drop_index(connection, "ix_posts_created_at_id")
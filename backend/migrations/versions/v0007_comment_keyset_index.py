@@ -0,0 +1,15 @@
+"""
+Index for paging a post's comments by (created_at, id)
+"""
+from migrations.ops import create_index, drop_index
+
+VERSION = 7
+DESCRIPTION = "Comment keyset index on comments"
+
+
+def upgrade(connection):
+    create_index(connection, "ix_comments_post_created_at_id", "comments", ["post_id", "created_at", "id"])
+
+
+def downgrade(connection):
+    drop_index(connection, "ix_comments_post_created_at_id")
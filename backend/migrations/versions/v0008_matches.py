@@ -0,0 +1,22 @@
+"""
+Match records, one row per mutual like written by the match engine
+"""
+from sqlalchemy import text
+
+VERSION = 8
+DESCRIPTION = "Match records"
+
+
+def upgrade(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS matches ("
+        "user1_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE, "
+        "user2_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE, "
+        "matched_at TIMESTAMP NOT NULL, "
+        "PRIMARY KEY (user1_id, user2_id), "
+        "CONSTRAINT ck_matches_ordered_pair CHECK (user1_id < user2_id))"
+    ))
+
+
+def downgrade(connection):
+    connection.execute(text("DROP TABLE IF EXISTS matches"))
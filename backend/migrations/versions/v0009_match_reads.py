@@ -0,0 +1,20 @@
+"""
+Recency indexes for a user's matches, and match records for mutual likes made before the match engine
+"""
+from migrations.ops import create_index, drop_index
+
+VERSION = 9
+DESCRIPTION = "Match recency indexes and backfill"
+
+
+def upgrade(connection):
+    create_index(connection, "ix_matches_user1_matched_at", "matches", ["user1_id", "matched_at"])
+    create_index(connection, "ix_matches_user2_matched_at", "matches", ["user2_id", "matched_at"])
+
+    from utils.match_engine import backfill
+    backfill(connection)
+
+
+def downgrade(connection):
+    drop_index(connection, "ix_matches_user1_matched_at")
+    drop_index(connection, "ix_matches_user2_matched_at")
@@ -0,0 +1,29 @@
+"""
+Materialized liked-me inbox per user and a pending_likes badge, backfilled from swipes
+"""
+from sqlalchemy import text
+
+from migrations.ops import add_column, create_index, drop_column
+
+VERSION = 10
+DESCRIPTION = "Liked-me inbox and pending likes counter"
+
+
+def upgrade(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS liked_me_inbox ("
+        "user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE, "
+        "liker_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE, "
+        "liked_at TIMESTAMP NOT NULL, "
+        "PRIMARY KEY (user_id, liker_id))"
+    ))
+    create_index(connection, "ix_liked_me_inbox_user_liked_at", "liked_me_inbox", ["user_id", "liked_at", "liker_id"])
+    add_column(connection, "user_counters", "pending_likes", "INTEGER NOT NULL DEFAULT 0")
+
+    from utils.liked_me import rebuild
+    rebuild(connection)
+
+
+def downgrade(connection):
+    connection.execute(text("DROP TABLE IF EXISTS liked_me_inbox"))
+    drop_column(connection, "user_counters", "pending_likes")
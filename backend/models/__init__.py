@@ -1,5 +1,5 @@
-from .user import User, Picture, Swipe, TokenBlocklist
-from .chat import Conversation, Message
+from .user import User, Picture, Swipe, Match, LikeInbox, TokenBlocklist, UserCounter
+from .chat import Conversation, Message, UnreadCounter
 from .subscription import (
     SubscriptionPlan, 
     UserSubscription, 
@@ -16,9 +16,13 @@ __all__ = [
     'User', 
     'Picture', 
     'Swipe', 
+    'Match',
+    'LikeInbox',
     'TokenBlocklist', 
+    'UserCounter',
     'Conversation', 
     'Message',
+    'UnreadCounter',
     'SubscriptionPlan',
     'UserSubscription', 
     'Payment',
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from datetime import datetime
 from .core import db
@@ -12,8 +12,8 @@ class Conversation(db.Model):
     __tablename__ = "conversations"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user1_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
-    user2_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    user1_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    user2_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     last_message: Mapped[str] = mapped_column(String(500), nullable=True)
     last_message_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
@@ -33,9 +33,12 @@ class Conversation(db.Model):
             Dictionary representation of the conversation
         """
         from utils.helpers import build_image_url  # Import here to avoid circular imports
+        from utils.thumbnails import image_sizes
+        from utils.presence import presence_store
 
-        # Determine the other participant in the conversation
+        # Determine the other participant in the conversation, presence from the live store
         other_user = self.user2 if self.user1_id == current_user_id else self.user1
+        is_online, last_seen = presence_store.status(other_user)
 
         # Count unread messages
         unread_count = len([
@@ -52,8 +55,9 @@ class Conversation(db.Model):
                 "username": other_user.username,
                 "name": other_user.name,
                 "avatar": build_image_url(other_user.pictures[0].image) if other_user.pictures else None,
-                "isOnline": other_user.is_online,
-                "lastSeen": other_user.last_seen.isoformat() + "Z" if other_user.last_seen else None
+                "avatarSizes": image_sizes(other_user.pictures[0].image) if other_user.pictures else None,
+                "isOnline": is_online,
+                "lastSeen": last_seen.isoformat() + "Z" if last_seen else None
             },
             "last_message": self.last_message,
             "last_message_at": self.last_message_at.isoformat() + "Z" if self.last_message_at else None,
@@ -71,6 +75,10 @@ class Message(db.Model):
     Extended with delivery status tracking and reply functionality
     """
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_conversation_timestamp", "conversation_id", "timestamp"),
+        Index("ix_messages_conversation_sender_read", "conversation_id", "sender_id", "is_read"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     conversation_id: Mapped[int] = mapped_column(
@@ -151,4 +159,22 @@ class Message(db.Model):
         return False
 
     def __repr__(self):
-        return f"<Message {self.id} in Conversation {self.conversation_id} from User {self.sender_id}>"
\ No newline at end of file
+        return f"<Message {self.id} in Conversation {self.conversation_id} from User {self.sender_id}>"
+
+
+class UnreadCounter(db.Model):
+    """
+    Denormalized unread message count per (user, conversation)
+    Incremented when a message is sent and decremented when messages are marked read
+    """
+    __tablename__ = "unread_counters"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    conversation_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('conversations.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    unread_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UnreadCounter User {self.user_id} Conversation {self.conversation_id}: {self.unread_count}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Integer, String, Boolean, DateTime, ForeignKey, Text, Index, CheckConstraint, text
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from datetime import datetime
 import uuid
@@ -14,7 +14,7 @@ class Picture(db.Model):
     __tablename__ = "pictures"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     image: Mapped[str] = mapped_column(Text, nullable=False)
     user = relationship("User", back_populates="pictures")
 
@@ -90,35 +90,10 @@ class User(db.Model):
         Args:
             include_security: Whether to include security-related fields
         Returns:
-            Dictionary representation of the user
+            Dictionary representation of the user (the 'full' or 'admin' projection)
         """
-        from utils.helpers import build_image_url  # Import here to avoid circular imports
-
-        data = {
-            "id": self.public_id,
-            "username": self.username,
-            "name": self.name,
-            "age": str(self.age),
-            "gender": self.gender,
-            "department": self.department,
-            "genotype": self.genotype,
-            "level": self.level,
-            "interestedIn": self.interested_in,
-            "religious": self.religious,
-            "isAnonymous": self.is_anonymous,
-            "category": self.category,
-            "bio": self.bio,
-            "is_admin": self.is_admin,
-            "isOnline": self.is_online,
-            "lastSeen": self.last_seen.isoformat() + "Z" if self.last_seen else None,
-            "pictures": [build_image_url(picture.image) for picture in self.pictures],
-            "timestamp": self.timestamp.isoformat() + "Z" if self.timestamp else None
-        }
-
-        if include_security:
-            data["security_question"] = self.security_question
-
-        return data
+        from utils.serializers import serialize_user  # Import here to avoid circular imports
+        return serialize_user(self, "admin" if include_security else "full")
 
     def __repr__(self):
         return f"<User {self.username}>"
@@ -131,6 +106,10 @@ class Post(db.Model):
     Post model for user-generated content in the feed
     """
     __tablename__ = "posts"
+    __table_args__ = (
+        # Keyset order of the home feed
+        Index("ix_posts_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     public_id: Mapped[str] = mapped_column(String(36), unique=True, default=lambda: str(uuid.uuid4()))
@@ -142,6 +121,10 @@ class Post(db.Model):
     category: Mapped[str] = mapped_column(String(100), nullable=True)
     location: Mapped[str] = mapped_column(String(200), nullable=True)
 
+    # Denormalized counters, moved with each like/comment in the same transaction
+    likes_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    comments_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -151,30 +134,37 @@ class Post(db.Model):
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan", passive_deletes=True)
     likes = relationship("Like", back_populates="post", cascade="all, delete-orphan", passive_deletes=True)
 
-    def to_dict(self, current_user_id=None):
+    def to_dict(self, current_user_id=None, has_liked=None):
         """
         Convert Post object to dictionary for JSON response
+        Args:
+            current_user_id: Viewer, used to look up has_liked when it is not given
+            has_liked: Precomputed like state (feed pages fetch it for all posts in one query)
         """
         from utils.helpers import build_image_url
+        from utils.serializers import serialize_user
+        from utils.thumbnails import image_sizes
 
         data = {
             "id": self.public_id,
             "text": self.text,
             "image": build_image_url(self.image) if self.image else None,
+            "image_sizes": image_sizes(self.image),
             "category": self.category,
             "location": self.location,
             "created_at": self.created_at.isoformat() + "Z",
             "updated_at": self.updated_at.isoformat() + "Z",
-            "user": self.user.to_dict() if self.user else None,
-            "comments_count": len(self.comments),
-            "likes_count": len(self.likes),
-            "has_liked": False
+            "user": serialize_user(self.user, "avatar") if self.user else None,
+            "comments_count": self.comments_count or 0,
+            "likes_count": self.likes_count or 0,
+            "has_liked": bool(has_liked)
         }
 
-        # Check if current user has liked this post
-        if current_user_id:
-            user_likes = [like for like in self.likes if like.user_id == current_user_id]
-            data["has_liked"] = len(user_likes) > 0
+        # Single posts check the viewer's like with one indexed lookup
+        if has_liked is None and current_user_id:
+            data["has_liked"] = db.session.query(
+                Like.query.filter_by(post_id=self.id, user_id=current_user_id).exists()
+            ).scalar()
 
         return data
 
@@ -187,6 +177,10 @@ class Comment(db.Model):
     Comment model for user comments on posts
     """
     __tablename__ = "comments"
+    __table_args__ = (
+        # Keyset order of a post's comments and the per-post ranking behind feed previews
+        Index("ix_comments_post_created_at_id", "post_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     public_id: Mapped[str] = mapped_column(String(36), unique=True, default=lambda: str(uuid.uuid4()))
@@ -206,12 +200,14 @@ class Comment(db.Model):
 
     def to_dict(self):
         """Convert Comment object to dictionary for JSON response"""
+        from utils.serializers import serialize_user
+
         return {
             "id": self.public_id,
             "text": self.text,
             "created_at": self.created_at.isoformat() + "Z",
             "updated_at": self.updated_at.isoformat() + "Z",
-            "user": self.user.to_dict() if self.user else None
+            "user": serialize_user(self.user, "avatar") if self.user else None
         }
 
     def __repr__(self):
@@ -223,6 +219,10 @@ class Like(db.Model):
     Like model for tracking user likes on posts
     """
     __tablename__ = "likes"
+    __table_args__ = (
+        # One like per user per post; also serves per-post counts and the toggle lookup
+        Index("uq_likes_post_user", "post_id", "user_id", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -248,6 +248,13 @@ class Swipe(db.Model):
     Used for matching algorithm and explore functionality
     """
     __tablename__ = "swipes"
+    __table_args__ = (
+        Index("ix_swipes_user_action_timestamp", "user_id", "action", "timestamp"),
+        Index("ix_swipes_target_action", "target_user_id", "action"),
+        # A user can only like another user once, passes may repeat after the reshow window
+        Index("uq_swipes_user_target_like", "user_id", "target_user_id", unique=True,
+              sqlite_where=text("action = 'like'"), postgresql_where=text("action = 'like'")),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -259,6 +266,51 @@ class Swipe(db.Model):
         return f"<Swipe {self.id} by User{self.user_id} on User{self.target_user_id}>"
 
 
+class Match(db.Model):
+    """
+    A mutual like, stored once per pair with the lower user id first
+    Written by the match engine when the second like arrives, deleted on unmatch
+    """
+    __tablename__ = "matches"
+    __table_args__ = (
+        CheckConstraint("user1_id < user2_id", name="ck_matches_ordered_pair"),
+        # A user's matches by recency, from either side of the pair
+        Index("ix_matches_user1_matched_at", "user1_id", "matched_at"),
+        Index("ix_matches_user2_matched_at", "user2_id", "matched_at"),
+    )
+
+    user1_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    user2_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    matched_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @staticmethod
+    def pair(user_id, other_user_id):
+        """Primary key of the match between two users"""
+        return (user_id, other_user_id) if user_id < other_user_id else (other_user_id, user_id)
+
+    def __repr__(self):
+        return f"<Match User {self.user1_id} and User {self.user2_id}>"
+
+
+class LikeInbox(db.Model):
+    """
+    Likes a user has received and not answered with a swipe yet, one row per liker
+    Maintained by the swipe path, read by liked-me
+    """
+    __tablename__ = "liked_me_inbox"
+    __table_args__ = (
+        # Keyset order of the liked-me page
+        Index("ix_liked_me_inbox_user_liked_at", "user_id", "liked_at", "liker_id"),
+    )
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    liker_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    liked_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<LikeInbox User {self.user_id} liked by User {self.liker_id}>"
+
+
 class TokenBlocklist(db.Model):
     """
     Token blacklist model for storing revoked JWT tokens
@@ -270,9 +322,24 @@ class TokenBlocklist(db.Model):
     jti: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
     token_type: Mapped[str] = mapped_column(String(10), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
-    revoked_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
-    expires: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    expires: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     user = db.relationship('User', lazy='joined')
 
     def __repr__(self):
-        return f"<TokenBlocklist {self.jti} for User {self.user_id}>"
\ No newline at end of file
+        return f"<TokenBlocklist {self.jti} for User {self.user_id}>"
+
+
+class UserCounter(db.Model):
+    """
+    Per-user denormalized counters for badges (total unread messages, pending likes)
+    Read in O(1) instead of aggregating on every poll
+    """
+    __tablename__ = "user_counters"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    unread_messages: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pending_likes: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<UserCounter for User {self.user_id}>"
@@ -1,9 +1,9 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func, desc, and_, or_
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func, desc, and_, or_, select
 from datetime import datetime, timedelta
-from models.user import User, Picture, Swipe, TokenBlocklist
-from models.chat import Conversation, Message
+from models.user import User, Picture, Swipe, TokenBlocklist, Like, Comment
+from models.chat import Conversation, Message, UnreadCounter
 from models.subscription import (
     SubscriptionPlan,
     UserSubscription,
@@ -13,17 +13,21 @@ from models.subscription import (
     PaymentStatus
 )
 from models.core import db
+from utils import liked_me, post_counters, unread_counters
+from utils.match_engine import match_engine
+from utils.presence import presence_store
+from utils.security import get_current_user_from_jwt
+from utils.serializers import serialize_user, requested_fields, user_load_options
+from utils.swipe_index import swipe_index
 
 admin_bp = Blueprint('admin', __name__)
 
 
 def check_admin_access():
     """Helper function to check if current user is admin"""
-    public_id = get_jwt_identity()
-    current_user = User.query.filter_by(public_id=public_id).first()
-
-    if not current_user:
-        return jsonify({"success": False, "message": "User not found"}), 404
+    current_user, error_response, status_code = get_current_user_from_jwt()
+    if error_response:
+        return error_response, status_code
 
     if not current_user.is_admin:
         return jsonify({"success": False, "message": "Access denied: Admins only"}), 403
@@ -48,8 +52,9 @@ def get_all_users():
     sort_by = request.args.get('sort_by', 'created_at')
     sort_order = request.args.get('sort_order', 'desc')
 
-    # Base query
-    query = User.query
+    # Base query, loading only the columns the requested fields read
+    fields = requested_fields()
+    query = User.query.options(*user_load_options("admin", fields))
 
     # Search filter
     if search:
@@ -121,7 +126,7 @@ def get_all_users():
     # Enhanced user data with subscription info
     users_data = []
     for user in pagination.items:
-        user_dict = user.to_dict()
+        user_dict = serialize_user(user, "admin", fields)
 
         # Add subscription information
         current_sub = user.current_subscription
@@ -272,17 +277,34 @@ def delete_user(user_id):
             )
         ).all()
 
+        partner_ids = [
+            conversation.user2_id if conversation.user1_id == user_id_to_delete else conversation.user1_id
+            for conversation in user_conversations
+        ]
+        conversation_ids = [conversation.id for conversation in user_conversations]
+
         for conversation in user_conversations:
             Message.query.filter_by(conversation_id=conversation.id).delete()
             db.session.delete(conversation)
 
-        # 3. Delete swipes (both sent and received)
+        # Unread counters of those conversations, and the partners' unread totals without them
+        UnreadCounter.query.filter(UnreadCounter.conversation_id.in_(conversation_ids)).delete(synchronize_session=False)
+        db.session.flush()
+        unread_counters.rebuild(db.session, partner_ids)
+
+        # 3. Delete swipes (both sent and received); users this user liked lose an inbox entry
+        liked_user_ids = db.session.execute(
+            select(Swipe.target_user_id).where(Swipe.user_id == user_id_to_delete, Swipe.action == "like")
+        ).scalars().all()
         Swipe.query.filter(
             or_(
                 Swipe.user_id == user_id_to_delete,
                 Swipe.target_user_id == user_id_to_delete
             )
         ).delete()
+        # Inboxes and pending_likes badges from the remaining swipes, without relying on FK cascades
+        inbox_user_ids = [user_id_to_delete, *liked_user_ids]
+        liked_me.rebuild(db.session, inbox_user_ids)
 
         # 4. Delete subscription data
         UserSubscription.query.filter_by(user_id=user_id_to_delete).delete()
@@ -291,11 +313,25 @@ def delete_user(user_id):
         # 5. Delete pictures
         Picture.query.filter_by(user_id=user_id_to_delete).delete()
 
-        # 6. Finally delete the user
+        # 6. Delete likes and comments on posts, then recount the posts they were on
+        counted_post_ids = db.session.execute(
+            select(Like.post_id).where(Like.user_id == user_id_to_delete)
+            .union(select(Comment.post_id).where(Comment.user_id == user_id_to_delete))
+        ).scalars().all()
+        Like.query.filter_by(user_id=user_id_to_delete).delete()
+        Comment.query.filter_by(user_id=user_id_to_delete).delete()
+        post_counters.rebuild(db.session, counted_post_ids)
+
+        # 7. Finally delete the user
         db.session.delete(user_to_delete)
 
         db.session.commit()
 
+        # Cached match state still lists the deleted user's likes
+        for affected_user_id in inbox_user_ids:
+            match_engine.forget(affected_user_id)
+        swipe_index.forget(user_id_to_delete)
+
         return jsonify({
             "success": True,
             "message": "User and all associated data deleted successfully"
@@ -584,7 +620,7 @@ def get_admin_dashboard():
     new_users_today = User.query.filter(
         User.timestamp >= datetime.utcnow().date()
     ).count()
-    online_users = User.query.filter_by(is_online=True).count()
+    online_users = len(presence_store.online_user_ids())
 
     # Subscription statistics
     active_subscriptions = UserSubscription.query.filter(
@@ -702,7 +738,7 @@ def update_user(user_id):
         return jsonify({
             "success": True,
             "message": "User updated successfully",
-            "user": user_to_update.to_dict()
+            "user": serialize_user(user_to_update, "admin")
         }), 200
 
     except Exception as e:
@@ -1,13 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import (
     create_access_token, create_refresh_token, jwt_required,
-    get_jwt_identity, get_jwt, set_access_cookies, set_refresh_cookies,
+    get_jwt, set_access_cookies, set_refresh_cookies,
     unset_jwt_cookies
 )
 from datetime import datetime, timezone
 from models.user import User, TokenBlocklist
 from utils.validation import is_valid_username, is_strong_password, validate_gender, process_image
+from utils.thumbnails import thumbnails
 from utils.security import rate_limit, get_current_user_from_jwt
+from utils.candidate_deck import candidate_decks
+from utils.token_revocations import token_revocations
 from models.core import db
 
 auth_bp = Blueprint('auth', __name__)
@@ -97,6 +100,12 @@ def signup():
     if User.query.filter_by(username=username).first():
         return jsonify({"success": False, "message": "Username already taken"}), 400
 
+    # Store the pictures as blobs only once every other field is valid
+    try:
+        stored_pictures = [thumbnails.store(img) for img in processed_pictures]
+    except ValueError:
+        return jsonify({"success": False, "message": "Invalid image: must be a valid URL or base64 data URI"}), 400
+
     # Create new user object
     new_user = User(
         username=username,
@@ -112,7 +121,7 @@ def signup():
         category=category,
         bio=bio or "",
         name=name or "",
-        pictures=[Picture(image = img) for img in processed_pictures]
+        pictures=[Picture(image=image) for image in stored_pictures]
     )
 
     # Set hashed password and security answer
@@ -125,6 +134,9 @@ def signup():
     db.session.add(new_user)
     db.session.commit()
 
+    # Let live explore decks pick up the new user
+    candidate_decks.notify_new_user(new_user.id)
+
     # Create JWT tokens
     access_token = create_access_token(identity=new_user)
     refresh_token = create_refresh_token(identity=new_user)
@@ -216,13 +228,10 @@ def logout():
     jwt_data = get_jwt()
     jti = jwt_data["jti"]
     token_type = jwt_data["type"]
-    user_public_id = get_jwt_identity()
-
-    # Find user by public_id
-    user = User.query.filter_by(public_id=user_public_id).first()
-
-    if not user:
-        return jsonify({"success": False, "message": "User not found"}), 404
+    # Current user, already loaded while the JWT was verified
+    user, error_response, status_code = get_current_user_from_jwt()
+    if error_response:
+        return error_response, status_code
 
     # Add token to blocklist to revoke it
     db.session.add(TokenBlocklist(
@@ -233,6 +242,7 @@ def logout():
         expires=datetime.fromtimestamp(jwt_data["exp"], tz=timezone.utc)
     ))
     db.session.commit()
+    token_revocations.revoke(jti)
 
     # Build response
     response = jsonify({
@@ -1,10 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, case, func, select
 from datetime import datetime
 from utils.security import get_current_user_from_jwt, validate_conversation_access
-from models.user import User
-from models.chat import Conversation, Message
+from utils.helpers import build_image_url
+from utils.thumbnails import image_sizes
+from utils.pagination import encode_cursor, decode_cursor, get_limit
+from utils import unread_counters, read_receipts
+from utils.chat_history import load_message_page, page_info
+from utils.presence import presence_store
+from models.user import User, Picture
+from models.chat import Conversation, Message, UnreadCounter
 from models.core import db
 
 chat_bp = Blueprint('chat', __name__)
@@ -57,55 +63,116 @@ def get_conversations():
     """
     Get all conversations for the current user
     Only returns conversations where user is a participant
+    Served by a single query with unread counts and the other user's projection
+    Query params: limit, cursor (next_cursor from the previous page),
+    conversation_id or user_id (other participant's public id) to fetch one conversation
     """
     current_user, error_response, status_code = get_current_user_from_jwt()
     if error_response:
         return error_response, status_code
 
-    # Find all conversations where current user is either user1 or user2
-    conversations = Conversation.query.filter(
-        or_(
-            Conversation.user1_id == current_user.id,
-            Conversation.user2_id == current_user.id
-        )
-    ).order_by(Conversation.last_message_at.desc()).all()
+    limit = get_limit(request.args, default=100, maximum=100)
+    cursor = decode_cursor(request.args.get("cursor"), datetime, int)
 
-    # Format response with conversation details
-    conversations_data = []
-    for conv in conversations:
-        # Determine the other user in the conversation
-        other_user = conv.user2 if conv.user1_id == current_user.id else conv.user1
+    query = _inbox_query(current_user.id, cursor)
+    conversation_id = request.args.get("conversation_id", type=int)
+    if conversation_id is not None:
+        query = query.filter(Conversation.id == conversation_id)
+    other_public_id = request.args.get("user_id")
+    if other_public_id:
+        query = query.filter(User.public_id == other_public_id)
 
-        # Count unread messages for current user
-        unread_count = Message.query.filter(
-            Message.conversation_id == conv.id,
-            Message.sender_id != current_user.id,
-            Message.is_read == False
-        ).count()
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
+    # Format response with conversation details, presence from the live store
+    conversations_data = []
+    for row in rows:
+        last_seen = presence_store.last_seen(row.other_user_id, row.other_last_seen)
         conversations_data.append({
-            "id": conv.id,
+            "id": row.id,
             "other_user": {
-                "id": other_user.public_id,
-                "username": other_user.username,
-                "name": other_user.name,
-                "avatar": other_user.pictures[0].image if other_user.pictures else None,
-                "isOnline": other_user.is_online,
-                "lastSeen": other_user.last_seen.isoformat() + "Z" if other_user.last_seen else None
+                "id": row.other_public_id,
+                "username": row.other_username,
+                "name": row.other_name,
+                "avatar": build_image_url(row.other_avatar),
+                "avatarSizes": image_sizes(row.other_avatar),
+                "isOnline": presence_store.is_online(row.other_user_id),
+                "lastSeen": last_seen.isoformat() + "Z" if last_seen else None
             },
-            "last_message": conv.last_message,
-            "last_message_at": conv.last_message_at.isoformat() + "Z" if conv.last_message_at else None,
-            "unread_count": unread_count,
-            "created_at": conv.created_at.isoformat() + "Z" if conv.created_at else None
+            "last_message": row.last_message,
+            "last_message_at": row.last_message_at.isoformat() + "Z" if row.last_message_at else None,
+            "unread_count": row.unread_count,
+            "created_at": row.created_at.isoformat() + "Z" if row.created_at else None
         })
 
+    next_cursor = encode_cursor(rows[-1].activity_at, rows[-1].id) if has_more else None
+
     return jsonify({
         "success": True,
         "conversations": conversations_data,
-        "total": len(conversations_data)
+        "total": len(conversations_data),
+        "next_cursor": next_cursor,
+        "has_more": has_more
     }), 200
 
 
+def _inbox_query(user_id, cursor=None):
+    """
+    Build the inbox query for a user: one row per conversation with the other participant's
+    profile columns, their first picture and the materialized unread count, newest activity first
+    Conversations without messages sort by their creation time
+    """
+    other_user_id = case(
+        (Conversation.user1_id == user_id, Conversation.user2_id),
+        else_=Conversation.user1_id
+    )
+    is_participant = or_(Conversation.user1_id == user_id, Conversation.user2_id == user_id)
+    activity_at = func.coalesce(Conversation.last_message_at, Conversation.created_at)
+
+    first_picture = (
+        select(Picture.image)
+        .where(Picture.user_id == User.id)
+        .order_by(Picture.id)
+        .limit(1)
+        .correlate(User)
+        .scalar_subquery()
+    )
+
+    query = (
+        db.session.query(
+            Conversation.id,
+            Conversation.last_message,
+            Conversation.last_message_at,
+            Conversation.created_at,
+            activity_at.label("activity_at"),
+            User.public_id.label("other_public_id"),
+            User.username.label("other_username"),
+            User.name.label("other_name"),
+            User.id.label("other_user_id"),
+            User.last_seen.label("other_last_seen"),
+            first_picture.label("other_avatar"),
+            func.coalesce(UnreadCounter.unread_count, 0).label("unread_count")
+        )
+        .join(User, User.id == other_user_id)
+        .outerjoin(UnreadCounter, and_(
+            UnreadCounter.conversation_id == Conversation.id,
+            UnreadCounter.user_id == user_id
+        ))
+        .filter(is_participant)
+    )
+
+    if cursor:
+        cursor_at, cursor_id = cursor
+        query = query.filter(or_(
+            activity_at < cursor_at,
+            and_(activity_at == cursor_at, Conversation.id < cursor_id)
+        ))
+
+    return query.order_by(activity_at.desc(), Conversation.id.desc())
+
+
 @chat_bp.route("/conversations", methods=["POST"])
 @jwt_required()
 def create_conversation():
@@ -173,6 +240,7 @@ def get_messages(conversation_id):
     Get messages for a specific conversation
     Only accessible to conversation participants
     Enhanced with delivery status information and reply functionality
+    Query params: limit, before_id (older page) or after_id (newer messages)
     """
     current_user, error_response, status_code = get_current_user_from_jwt()
     if error_response:
@@ -183,30 +251,19 @@ def get_messages(conversation_id):
     if not is_authorized:
         return jsonify({"success": False, "message": error_msg}), 403
 
-    # Pagination parameters
-    page = int(request.args.get("page", 1))
-    limit = int(request.args.get("limit", 50))
-    offset = (page - 1) * limit
-
-    # Get messages for this conversation with reply data
-    messages_query = Message.query.filter_by(conversation_id=conversation_id)
-    total_messages = messages_query.count()
-
-    messages = messages_query.order_by(Message.timestamp.desc()).offset(offset).limit(limit).all()
-    messages.reverse()  # Reverse to get chronological order
+    # Cursor parameters
+    limit = get_limit(request.args, default=50, maximum=100)
+    before_id = request.args.get("before_id", type=int)
+    after_id = request.args.get("after_id", type=int)
 
     # Mark unread messages as read (only messages sent to current user)
-    unread_messages = Message.query.filter(
-        Message.conversation_id == conversation_id,
-        Message.sender_id != current_user.id,
-        Message.is_read == False
-    ).all()
-
-    for msg in unread_messages:
-        msg.mark_read()
-
-    if unread_messages:
+    receipt = read_receipts.mark_read(conversation_id, current_user.id, current_user.public_id)
+    if receipt.count:
         db.session.commit()
+        read_receipts.broadcast(receipt)
+
+    # Get messages for this conversation with reply data (after the commit so rows stay loaded)
+    messages, has_more = load_message_page(conversation_id, before_id=before_id, after_id=after_id, limit=limit)
 
     # Format response - now includes delivery status and reply data
     messages_data = [message.to_dict() for message in messages]
@@ -214,13 +271,7 @@ def get_messages(conversation_id):
     return jsonify({
         "success": True,
         "messages": messages_data,
-        "pagination": {
-            "page": page,
-            "limit": limit,
-            "total_messages": total_messages,
-            "has_next": (page * limit) < total_messages,
-            "has_prev": page > 1
-        }
+        "pagination": page_info(messages, has_more, limit, "newer" if after_id else "older")
     }), 200
 
 
@@ -288,6 +339,8 @@ def send_message(conversation_id):
     conversation.last_message_at = datetime.utcnow()
 
     db.session.add(new_message)
+    recipient_id = conversation.user2_id if conversation.user1_id == current_user.id else conversation.user1_id
+    unread_counters.increment(conversation_id, recipient_id)
     db.session.commit()
 
     return jsonify({
@@ -356,21 +409,16 @@ def mark_conversation_read(conversation_id):
         return jsonify({"success": False, "message": error_msg}), 403
 
     # Mark all unread messages from other user as read
-    unread_messages = Message.query.filter(
-        Message.conversation_id == conversation_id,
-        Message.sender_id != current_user.id,
-        Message.is_read == False
-    ).all()
-
-    for msg in unread_messages:
-        msg.mark_read()
+    receipt = read_receipts.mark_read(conversation_id, current_user.id, current_user.public_id)
 
-    if unread_messages:
+    if receipt.count:
         db.session.commit()
+        read_receipts.broadcast(receipt)
         return jsonify({
             "success": True,
-            "message": f"Marked {len(unread_messages)} messages as read",
-            "marked_count": len(unread_messages)
+            "message": f"Marked {receipt.count} messages as read",
+            "marked_count": receipt.count,
+            "up_to_id": receipt.up_to_id
         }), 200
     else:
         return jsonify({
@@ -386,32 +434,15 @@ def get_total_unread_count():
     """
     Get total unread message count across all conversations
     Useful for showing badge count in UI
+    Reads the per-user counter maintained on message send and mark-read
     """
     current_user, error_response, status_code = get_current_user_from_jwt()
     if error_response:
         return error_response, status_code
 
-    # Find all conversations where current user is either user1 or user2
-    conversations = Conversation.query.filter(
-        or_(
-            Conversation.user1_id == current_user.id,
-            Conversation.user2_id == current_user.id
-        )
-    ).all()
-
-    # Calculate total unread count across all conversations
-    total_unread = 0
-    for conv in conversations:
-        unread_count = Message.query.filter(
-            Message.conversation_id == conv.id,
-            Message.sender_id != current_user.id,
-            Message.is_read == False
-        ).count()
-        total_unread += unread_count
-
     return jsonify({
         "success": True,
-        "total_unread": total_unread
+        "total_unread": unread_counters.total_unread(current_user.id)
     }), 200
 
 
@@ -434,7 +465,8 @@ def get_user_profile(user_id):
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
-        # Return user profile data
+        # Return user profile data, presence from the live store
+        is_online, last_seen = presence_store.status(user)
         profile_data = {
             "id": user.public_id,
             "username": user.username,
@@ -443,10 +475,11 @@ def get_user_profile(user_id):
             "age": user.age,
             "level": user.level,
             "religious": user.religious,
-            "avatar": user.pictures[0].image if user.pictures else None,
-            "pictures": [pic.image for pic in user.pictures] if user.pictures else [],
-            "isOnline": user.is_online,
-            "lastSeen": user.last_seen.isoformat() + "Z" if user.last_seen else None
+            "avatar": build_image_url(user.pictures[0].image) if user.pictures else None,
+            "avatarSizes": image_sizes(user.pictures[0].image) if user.pictures else None,
+            "pictures": [build_image_url(pic.image) for pic in user.pictures] if user.pictures else [],
+            "isOnline": is_online,
+            "lastSeen": last_seen.isoformat() + "Z" if last_seen else None
         }
 
         return jsonify({
@@ -1,12 +1,18 @@
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import desc
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy import desc, select
 import os
 import time
 from werkzeug.utils import secure_filename
 
-from models.user import Post, Comment, Like, User
+from models.user import Post, Comment
 from models.core import db
+from utils.security import get_current_user_from_jwt
+from utils.thumbnails import thumbnails
+from utils import post_counters
+from utils.comments import comment_page
+from utils.feed import feed, feed_notifier
+from utils.pagination import get_limit
 from config import Config  # <-- You already have supabase there
 
 
@@ -22,37 +28,33 @@ def allowed_file(filename):
 
 
 def get_current_user():
-    """Get current user using public_id from JWT"""
-    current_user_identity = get_jwt_identity()
-    return User.query.filter_by(public_id=current_user_identity).first()
+    """Get current user using public_id from JWT (request-cached)"""
+    user, _, _ = get_current_user_from_jwt()
+    return user
 
 
 @feed_bp.route('/posts', methods=['GET'])
 @jwt_required()
 def get_posts():
-    """Get all posts sorted by creation date (newest first)"""
+    """
+    Get posts sorted by creation date (newest first)
+    Query params: limit (per_page also accepted), cursor (next_cursor from the previous page),
+    comments (newest comments to inline with each post, default 0)
+    """
     try:
         user = get_current_user()
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
-        # Get pagination parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        per_page = min(per_page, 50)
-
-        # Query posts with pagination
-        posts_query = Post.query.order_by(desc(Post.created_at))
-        paginated_posts = posts_query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        limit = get_limit(request.args, default=request.args.get('per_page', 20, type=int), maximum=50)
 
-        posts_data = []
-        for post in paginated_posts.items:
-            post_data = post.to_dict(current_user_id=user.id)
-            posts_data.append(post_data)
+        # Shared cached page, with counters and has_liked overlaid for this user
+        posts_data, next_cursor = feed.page(
+            user.id,
+            cursor=request.args.get('cursor'),
+            limit=limit,
+            comments=request.args.get('comments', 0, type=int)
+        )
 
         return jsonify({
             "success": True,
@@ -60,12 +62,9 @@ def get_posts():
             "data": {
                 "posts": posts_data,
                 "pagination": {
-                    "page": page,
-                    "per_page": per_page,
-                    "total": paginated_posts.total,
-                    "pages": paginated_posts.pages,
-                    "has_next": paginated_posts.has_next,
-                    "has_prev": paginated_posts.has_prev
+                    "per_page": limit,
+                    "has_next": next_cursor is not None,
+                    "next_cursor": next_cursor
                 }
             }
         }), 200
@@ -136,23 +135,29 @@ def create_post():
                 "data": None
             }), 400
 
+        # Store the image as a blob and queue its thumbnails, the post row keeps only its key or URL
+        try:
+            image = thumbnails.store(data.get('image'))
+        except ValueError:
+            return jsonify({
+                "success": False,
+                "message": "Image must be a valid URL or base64 data URI",
+                "data": None
+            }), 400
+
         # Create new post
         new_post = Post(
             user_id=user.id,
             text=data.get('text', '').strip(),
-            image=data.get('image'),
+            image=image,
             category=data.get('category'),
             location=data.get('location')
         )
 
         db.session.add(new_post)
         db.session.commit()
-
-        # Emit SocketIO event if available
-        if hasattr(current_app, 'socketio'):
-            current_app.socketio.emit('new_post', {
-                'post': new_post.to_dict(current_user_id=user.id)
-            })
+        feed.post_created()
+        feed_notifier.post_created(new_post.public_id)
 
         return jsonify({
             "success": True,
@@ -197,6 +202,8 @@ def delete_post(post_id):
 
         db.session.delete(post)
         db.session.commit()
+        feed.post_deleted()
+        feed_notifier.post_deleted(post_id)
 
         return jsonify({
             "success": True,
@@ -216,47 +223,42 @@ def delete_post(post_id):
 @feed_bp.route('/posts/<string:post_id>/like', methods=['POST'])
 @jwt_required()
 def like_post(post_id):
-    """Like or unlike a post"""
+    """
+    Like or unlike a post
+    Optional JSON body: {"liked": true|false} sets the state instead of flipping it, so retries are safe
+    Returns only the new state and count
+    """
     try:
         user = get_current_user()
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
-        post = Post.query.filter_by(public_id=post_id).first()
+        post_pk = db.session.execute(select(Post.id).where(Post.public_id == post_id)).scalar()
 
-        if not post:
+        if not post_pk:
             return jsonify({
                 "success": False,
                 "message": "Post not found",
                 "data": None
             }), 404
 
-        # Check if user already liked the post
-        existing_like = Like.query.filter_by(
-            user_id=user.id,
-            post_id=post.id
-        ).first()
-
-        if existing_like:
-            # Unlike the post
-            db.session.delete(existing_like)
-            action = "unliked"
-        else:
-            # Like the post
-            new_like = Like(user_id=user.id, post_id=post.id)
-            db.session.add(new_like)
-            action = "liked"
+        data = request.get_json(silent=True) or {}
+        desired = data.get('liked')
+        if desired is not None and not isinstance(desired, bool):
+            return jsonify({"success": False, "message": "liked must be boolean", "data": None}), 400
 
+        liked, likes_count = post_counters.toggle_like(post_pk, user.id, liked=desired)
         db.session.commit()
+        feed_notifier.post_changed(post_pk)
 
-        # Get updated post data
-        updated_post = post.to_dict(current_user_id=user.id)
-
+        action = "liked" if liked else "unliked"
         return jsonify({
             "success": True,
             "message": f"Post {action} successfully",
             "data": {
-                "post": updated_post,
+                "post_id": post_id,
+                "liked": liked,
+                "likes_count": likes_count,
                 "action": action
             }
         }), 200
@@ -273,35 +275,28 @@ def like_post(post_id):
 @feed_bp.route('/posts/<string:post_id>/comments', methods=['GET'])
 @jwt_required()
 def get_comments(post_id):
-    """Get all comments for a post"""
+    """
+    Get a post's comments, newest first
+    Query params: limit (per_page also accepted), cursor (next_cursor from the previous page)
+    """
     try:
         user = get_current_user()
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
-        post = Post.query.filter_by(public_id=post_id).first()
+        post_pk = db.session.execute(select(Post.id).where(Post.public_id == post_id)).scalar()
 
-        if not post:
+        if not post_pk:
             return jsonify({
                 "success": False,
                 "message": "Post not found",
                 "data": None
             }), 404
 
-        # Get pagination parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
-        per_page = min(per_page, 100)  # Limit to 100 comments per page
-
-        # Query comments with pagination
-        comments_query = Comment.query.filter_by(post_id=post.id).order_by(desc(Comment.created_at))
-        paginated_comments = comments_query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        limit = get_limit(request.args, default=request.args.get('per_page', 50, type=int), maximum=100)
 
-        comments_data = [comment.to_dict() for comment in paginated_comments.items]
+        # Authors are joined into the same query; newest first by (created_at, id)
+        comments_data, next_cursor = comment_page(post_pk, cursor=request.args.get('cursor'), limit=limit)
 
         return jsonify({
             "success": True,
@@ -309,12 +304,9 @@ def get_comments(post_id):
             "data": {
                 "comments": comments_data,
                 "pagination": {
-                    "page": page,
-                    "per_page": per_page,
-                    "total": paginated_comments.total,
-                    "pages": paginated_comments.pages,
-                    "has_next": paginated_comments.has_next,
-                    "has_prev": paginated_comments.has_prev
+                    "per_page": limit,
+                    "has_next": next_cursor is not None,
+                    "next_cursor": next_cursor
                 }
             }
         }), 200
@@ -362,14 +354,11 @@ def create_comment(post_id):
         )
 
         db.session.add(new_comment)
+        post_counters.adjust(post.id, comments=1)
         db.session.commit()
 
-        # Emit SocketIO event if available
-        if hasattr(current_app, 'socketio'):
-            current_app.socketio.emit('new_comment', {
-                'post_id': post.public_id,
-                'comment': new_comment.to_dict()
-            })
+        feed.comment_added(post.id)
+        feed_notifier.comment_added(post.id, new_comment.public_id)
 
         return jsonify({
             "success": True,
@@ -1,12 +1,20 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from sqlalchemy.sql.expression import func
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, case, select
+from sqlalchemy.exc import IntegrityError
 from utils.security import get_current_user_from_jwt
-from utils.validation import get_opposite_gender
-from models.user import User, Swipe
+from utils.candidate_deck import candidate_decks
+from utils.swipe_index import swipe_index
+from utils.match_engine import match_engine
+from utils import liked_me
+from utils.presence import presence_store
+from utils.helpers import build_image_url
+from utils.thumbnails import image_sizes
+from utils.serializers import serialize_user, requested_fields, user_load_options
+from utils.pagination import encode_cursor, decode_cursor, get_limit
+from models.user import User, Swipe, Match, Picture
 from models.core import db
-from datetime import datetime, timedelta
+from datetime import datetime
 
 
 matching_bp = Blueprint('matching', __name__)
@@ -17,86 +25,62 @@ def explore():
     """
     Explore endpoint for discovering potential matches
     Returns users based on the current user's 'interested_in' preference
+    Pages through a pre-shuffled candidate deck so pages never repeat each other
     Excludes users already liked by current user
     Includes passed users after 2 hours for reshows
-    Includes pagination for performance
+    Query params: cursor (from previous response), page (fallback), limit, refresh,
+    fields (comma-separated subset of the card projection)
     """
     current_user, error_response, status_code = get_current_user_from_jwt()
     if error_response:
         return error_response, status_code
 
-    # Get IDs of users liked by current user (permanent exclusion)
-    liked_ids = db.session.query(Swipe.target_user_id).filter_by(
-        user_id=current_user.id, 
-        action="like"
-    ).all()
-    liked_ids = [s[0] for s in liked_ids]
-
-    # Get IDs of users passed by current user within last 2 hours (temporary exclusion)
-    two_hours_ago = datetime.utcnow() - timedelta(hours=2)
-    recent_pass_ids = db.session.query(Swipe.target_user_id).filter(
-        Swipe.user_id == current_user.id,
-        Swipe.action == "pass",
-        Swipe.timestamp > two_hours_ago
-    ).all()
-    recent_pass_ids = [s[0] for s in recent_pass_ids]
-
-    # Combine exclusion lists
-    excluded_ids = liked_ids + recent_pass_ids
-
     # Pagination parameters
-    page = int(request.args.get("page", 1))
-    limit = int(request.args.get("limit", 30))
-
-    # Base query (exclude self, liked users, and recently passed users)
-    query = User.query.filter(User.id != current_user.id)
-    if excluded_ids:
-        query = query.filter(~User.id.in_(excluded_ids))
-
-    # Match logic based on 'interested_in'
-    if current_user.interested_in.lower() == "male":
-        query = query.filter(User.gender.ilike("male"))
-    elif current_user.interested_in.lower() == "female":
-        query = query.filter(User.gender.ilike("female"))
-    elif current_user.interested_in.lower() == "both":
-        query = query.filter(User.gender.ilike("male") | User.gender.ilike("female"))
-    else:
-        # If interested_in is invalid, return empty results
-        query = query.filter(User.id == None)  # Force empty results
-
-    print("Current user:", current_user.username)
-    print("Interested in:", current_user.interested_in)
-    print("Liked users (permanent exclude):", liked_ids)
-    print("Recently passed users (temporary exclude):", recent_pass_ids)
-    print("Total excluded:", excluded_ids)
-
-    # Get paginated random users
-    candidates = (
-        query.order_by(func.random())
-        .offset((page - 1) * limit)
-        .limit(limit)
-        .all()
+    page = max(1, request.args.get("page", 1, type=int))
+    limit = get_limit(request.args, default=30, maximum=100)
+    cursor = request.args.get("cursor")
+
+    if request.args.get("refresh", "").lower() == "true":
+        candidate_decks.invalidate(current_user.id)
+
+    candidate_ids, next_cursor = candidate_decks.next_page(
+        current_user,
+        cursor=cursor,
+        start=(page - 1) * limit,
+        limit=limit,
+        exclude=lambda ids: swipe_index.excluded(current_user.id, ids)
     )
 
-    print("Candidates found:", [u.username for u in candidates])
+    # Load the page's users with only the card columns, and keep deck order
+    fields = requested_fields()
+    users_by_id = {}
+    if candidate_ids:
+        users_by_id = {
+            user.id: user
+            for user in User.query.options(*user_load_options("card", fields)).filter(User.id.in_(candidate_ids)).all()
+        }
+    candidates = [users_by_id[user_id] for user_id in candidate_ids if user_id in users_by_id]
 
     # Return results based on the filter criteria
-    result = [user.to_dict() for user in candidates]
+    result = [serialize_user(user, "card", fields) for user in candidates]
 
     return jsonify({
         "success": True,
         "page": page,
         "limit": limit,
-        "profiles": result
+        "profiles": result,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
     }), 200
 
+
 @matching_bp.route("/swipe", methods=["POST"])
 @jwt_required()
 def swipe():
     """
     Swipe endpoint for user interactions
     Records likes and passes, checks for mutual matches
-    Returns match notification if both users like each other
+    Returns match notification if both users like each other, and pushes a 'match' event to both
     """
     current_user, error_response, status_code = get_current_user_from_jwt()
     if error_response:
@@ -116,27 +100,42 @@ def swipe():
         return jsonify({"success": False, "message": "Target user not found"}), 404
 
     # Save swipe action to database
+    swiped_at = datetime.utcnow()
     swipe = Swipe(
         user_id=current_user.id,
         target_user_id=target_user.id,
-        action=action
+        action=action,
+        timestamp=swiped_at
     )
     db.session.add(swipe)
-    db.session.commit()
+    try:
+        # Liked-me inboxes move in the same transaction: the swiper answered the target's
+        # like, and a like is filed with the target unless they already swiped back
+        liked_me.answered(current_user.id, target_user.id)
+        if action == "like":
+            liked_me.like_received(target_user.id, current_user.id)
+        db.session.commit()
+        # Keep the explore exclusion index in step with the new swipe
+        swipe_index.record(current_user.id, target_user.id, action, swiped_at)
+        created = True
+    except IntegrityError:
+        # Already liked this user (e.g. a double tap), the original like stands
+        db.session.rollback()
+        created = False
 
-    # If it's a "like", check if target user also liked back
     if action == "like":
-        mutual_like = Swipe.query.filter_by(
-            user_id=target_user.id,
-            target_user_id=current_user.id,
-            action="like"
-        ).first()
+        if created:
+            # Checked against the pending inbound likes in memory; a match notifies both users
+            matched_at = match_engine.like(current_user, target_user, swiped_at)
+        else:
+            matched_at = match_engine.matched_at(current_user.id, target_user.id)
 
-        if mutual_like:
+        if matched_at:
             return jsonify({
                 "success": True,
                 "message": "It's a match! 🎉",
-                "matched_with": target_user.public_id
+                "matched_with": target_user.public_id,
+                "matched_at": matched_at.isoformat() + "Z"
             }), 200
 
     return jsonify({"success": True, "message": f"You swiped {action}"}), 200
@@ -146,47 +145,109 @@ def swipe():
 @jwt_required()
 def get_matches():
     """
-    Get mutual matches - users who have liked each other
+    Get mutual matches - users who have liked each other, most recent match first
+    Reads the match records with the other user's columns and first picture in one query
+    Query params: limit, cursor (next_cursor from the previous page)
     """
     current_user, error_response, status_code = get_current_user_from_jwt()
     if error_response:
         return error_response, status_code
 
-    # Step 1: Find all users current_user has liked
-    liked_users = db.session.query(Swipe.target_user_id).filter_by(
-        user_id=current_user.id, action="like"
-    ).subquery()
-
-    # Step 2: Find users who liked current_user back
-    mutual_users = (
-        db.session.query(User)
-        .join(Swipe, Swipe.user_id == User.id)
-        .filter(
-            Swipe.target_user_id == current_user.id,
-            Swipe.action == "like",
-            User.id.in_(liked_users),
-            User.id != current_user.id
-        )
-        .all()
-    )
+    limit = get_limit(request.args, default=50, maximum=100)
+    cursor = decode_cursor(request.args.get("cursor"), datetime, int)
+
+    rows = _matches_query(current_user.id, cursor).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
     result = [
         {
-            "id": user.public_id,
-            "username": user.username,
-            "bio": user.bio,
-            "avatar": user.pictures[0].image if user.pictures else None
+            "id": row.public_id,
+            "username": row.username,
+            "bio": row.bio,
+            "avatar": build_image_url(row.avatar),
+            "avatarSizes": image_sizes(row.avatar),
+            "matched_at": row.matched_at.isoformat() + "Z"
         }
-        for user in mutual_users
+        for row in rows
     ]
+    next_cursor = encode_cursor(rows[-1].matched_at, rows[-1].other_user_id) if has_more else None
 
     return jsonify({
         "success": True,
         "count": len(result),
-        "matches": result
+        "matches": result,
+        "next_cursor": next_cursor,
+        "has_more": has_more
     }), 200
 
 
+def _matches_query(user_id, cursor=None):
+    """
+    Build the matches query for a user: one row per match with the other user's
+    profile columns and first picture, newest match first
+    """
+    other_user_id = case(
+        (Match.user1_id == user_id, Match.user2_id),
+        else_=Match.user1_id
+    )
+
+    first_picture = (
+        select(Picture.image)
+        .where(Picture.user_id == User.id)
+        .order_by(Picture.id)
+        .limit(1)
+        .correlate(User)
+        .scalar_subquery()
+    )
+
+    query = (
+        db.session.query(
+            Match.matched_at,
+            other_user_id.label("other_user_id"),
+            User.public_id,
+            User.username,
+            User.bio,
+            first_picture.label("avatar")
+        )
+        .join(User, User.id == other_user_id)
+        .filter(or_(Match.user1_id == user_id, Match.user2_id == user_id))
+    )
+
+    if cursor:
+        cursor_at, cursor_id = cursor
+        query = query.filter(or_(
+            Match.matched_at < cursor_at,
+            and_(Match.matched_at == cursor_at, other_user_id < cursor_id)
+        ))
+
+    return query.order_by(Match.matched_at.desc(), other_user_id.desc())
+
+
+@matching_bp.route("/matches/<string:user_id>", methods=["DELETE"])
+@jwt_required()
+def unmatch(user_id):
+    """
+    Unmatch a user
+    Removes the match and the current user's like; the other user is told with an 'unmatch' event
+    """
+    current_user, error_response, status_code = get_current_user_from_jwt()
+    if error_response:
+        return error_response, status_code
+
+    other_user = User.query.filter_by(public_id=user_id).first()
+    if not other_user:
+        return jsonify({"success": False, "message": "User not found"}), 404
+
+    if not match_engine.unmatch(current_user, other_user):
+        return jsonify({"success": False, "message": "Not matched with this user"}), 404
+
+    # The like is gone, so the explore index must not keep hiding this user
+    swipe_index.forget(current_user.id)
+
+    return jsonify({"success": True, "message": "Unmatched"}), 200
+
+
 @matching_bp.route("/users/online", methods=["GET"])
 @jwt_required()
 def get_online_users():
@@ -198,19 +259,21 @@ def get_online_users():
     if error_response:
         return error_response, status_code
 
-    # Get online users from database
-    online_users_list = User.query.filter_by(is_online=True).filter(User.id != current_user.id).all()
+    # Get online users from the live presence store
+    online_ids = presence_store.online_user_ids() - {current_user.id}
+    online_users_list = User.query.filter(User.id.in_(online_ids)).all() if online_ids else []
 
-    online_users_data = [
-        {
+    online_users_data = []
+    for user in online_users_list:
+        last_seen = presence_store.last_seen(user.id, user.last_seen)
+        online_users_data.append({
             "id": user.public_id,
             "username": user.username,
             "name": user.name,
-            "avatar": user.pictures[0].image if user.pictures else None,
-            "lastSeen": user.last_seen.isoformat() + "Z" if user.last_seen else None
-        }
-        for user in online_users_list
-    ]
+            "avatar": build_image_url(user.pictures[0].image) if user.pictures else None,
+            "avatarSizes": image_sizes(user.pictures[0].image) if user.pictures else None,
+            "lastSeen": last_seen.isoformat() + "Z" if last_seen else None
+        })
 
     return jsonify({
         "success": True,
@@ -224,65 +287,60 @@ def get_online_users():
 def get_all_users_who_liked_me():
     """
     Get all users who have liked the current user, but current user hasn't responded to
+    Pages the materialized liked-me inbox, newest like first; total_count is the O(1) badge
+    Query params: limit, cursor (next_cursor from the previous page),
+    fields (comma-separated subset of the card projection)
     """
     current_user, error_response, status_code = get_current_user_from_jwt()
     if error_response:
         return error_response, status_code
 
-    # Get pagination parameters
-    page = int(request.args.get("page", 1))
-    limit = int(request.args.get("limit", 20))
-
-    # Subquery to get user IDs that current user has already swiped on
-    user_swiped_subquery = db.session.query(Swipe.target_user_id).filter(
-        Swipe.user_id == current_user.id
-    ).subquery()
-
-    # Get users who liked current user but current user hasn't responded to
-    liked_me_users = (
-        db.session.query(User, Swipe.timestamp)
-        .join(Swipe, Swipe.user_id == User.id)
-        .filter(
-            Swipe.target_user_id == current_user.id,
-            Swipe.action == "like",
-            User.id != current_user.id,
-            ~User.id.in_(user_swiped_subquery)  # Exclude users current user has already swiped on
-        )
-        .order_by(Swipe.timestamp.desc())
-        .offset((page - 1) * limit)
-        .limit(limit)
-        .all()
-    )
+    limit = get_limit(request.args, default=20, maximum=100)
+    fields = requested_fields()
+
+    likes, next_cursor = liked_me.inbox_page(current_user.id, cursor=request.args.get("cursor"), limit=limit)
+
+    # Load the page's users with only the card columns, and keep inbox order
+    users_by_id = {}
+    if likes:
+        users_by_id = {
+            user.id: user
+            for user in User.query.options(*user_load_options("card", fields))
+            .filter(User.id.in_([liker_id for liker_id, _ in likes])).all()
+        }
 
     # Format response
     result = []
-    for user, liked_timestamp in liked_me_users:
-        user_data = user.to_dict()
-        user_data["liked_at"] = liked_timestamp.isoformat() + "Z" if liked_timestamp else None
-        
-        # Since we're excluding users current user has swiped on, is_mutual_match will always be False
+    for liker_id, liked_at in likes:
+        if liker_id not in users_by_id:
+            continue
+        user_data = serialize_user(users_by_id[liker_id], "card", fields)
+        user_data["liked_at"] = liked_at.isoformat() + "Z"
+
+        # The inbox only holds likes the current user hasn't swiped on, so never a mutual match
         user_data["is_mutual_match"] = False
         result.append(user_data)
 
-    # Get total count
-    total_count = (
-        db.session.query(User)
-        .join(Swipe, Swipe.user_id == User.id)
-        .filter(
-            Swipe.target_user_id == current_user.id,
-            Swipe.action == "like",
-            User.id != current_user.id,
-            ~User.id.in_(user_swiped_subquery)
-        )
-        .count()
-    )
-
     return jsonify({
         "success": True,
         "users": result,
         "count": len(result),
-        "total_count": total_count,
-        "page": page,
+        "total_count": liked_me.pending_count(current_user.id),
         "limit": limit,
-        "has_more": (page * limit) < total_count
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }), 200
+
+
+@matching_bp.route("/users/liked-me/count", methods=["GET"])
+@jwt_required()
+def get_liked_me_count():
+    """Number of likes waiting for the current user's answer, for the badge"""
+    current_user, error_response, status_code = get_current_user_from_jwt()
+    if error_response:
+        return error_response, status_code
+
+    return jsonify({
+        "success": True,
+        "pending_likes": liked_me.pending_count(current_user.id)
     }), 200
\ No newline at end of file
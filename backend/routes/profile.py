@@ -2,6 +2,10 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from utils.security import get_current_user_from_jwt
 from utils.validation import validate_gender
+from utils.helpers import build_image_url
+from utils.thumbnails import image_sizes
+from utils.presence import presence_store
+from utils.serializers import serialize_user, requested_fields
 from models.core import db
 
 profile_bp = Blueprint('profile', __name__)
@@ -13,6 +17,7 @@ def get_my_profile():
     Get current user's profile information
     Requires authentication via JWT
     Returns complete user profile without sensitive data
+    Query params: fields (comma-separated subset of the full projection)
     """
     user, error_response, status_code = get_current_user_from_jwt()
     if error_response:
@@ -20,7 +25,7 @@ def get_my_profile():
 
     return jsonify({
         "success": True,
-        "user": user.to_dict()
+        "user": serialize_user(user, "full", requested_fields())
     }), 200
 
 
@@ -84,15 +89,18 @@ def get_user_profile(user_public_id):
     if not target_user:
         return jsonify({"success": False, "message": "Target user not found"}), 404
 
+    # Presence from the live store, the columns are only flushed every few seconds
+    is_online, last_seen = presence_store.status(target_user)
     return jsonify({
         "success": True,
         "user": {
             "id": target_user.public_id,
             "username": target_user.username,
             "name": target_user.name,
-            "avatar": target_user.pictures[0].image if target_user.pictures else None,
-            "isOnline": target_user.is_online,
-            "lastSeen": target_user.last_seen.isoformat() + "Z" if target_user.last_seen else None,
+            "avatar": build_image_url(target_user.pictures[0].image) if target_user.pictures else None,
+            "avatarSizes": image_sizes(target_user.pictures[0].image) if target_user.pictures else None,
+            "isOnline": is_online,
+            "lastSeen": last_seen.isoformat() + "Z" if last_seen else None,
             "bio": target_user.bio,
             "department": target_user.department,
             "level": target_user.level
@@ -55,11 +55,11 @@ socketio = SocketIO(
 print(f"🔧 Socket.IO initialized with async_mode: {_ASYNC_WORKER}")
 print(f"🔧 CORS Origins: {cors_origins}")
 
-# ✅ Global in-memory storage
-online_users = {}
-print(f"🔧 Online users store initialized {online_users}")
+# ✅ Socket sessions: sid -> user and user -> sids, configured in create_app
+from utils.session_registry import session_registry
 
 from .chat_events import register_socket_events
+from . import feed_events  # noqa: F401 - registers the feed subscription handlers
 
 
-__all__ = ["socketio", "online_users", "register_socket_events"]
+__all__ = ["socketio", "session_registry", "register_socket_events"]
@@ -2,18 +2,21 @@ from flask_jwt_extended import decode_token
 from flask_socketio import join_room, leave_room, emit
 from flask import request as flask_request
 from datetime import datetime
-from sqlalchemy import or_
 from sqlalchemy.exc import SQLAlchemyError
 import traceback
 
 from models.core import db
 from models.user import User
-from models.chat import Conversation, Message
+from models.chat import Message
+from utils import unread_counters, read_receipts
+from utils.chat_history import load_message_page, page_info
+from utils.presence import presence, presence_store, initial_statuses
+from utils.rate_limit import socket_rate_limit
 from utils.security import (
     get_authenticated_user_from_socket,
     validate_socket_conversation_access,
 )
-from sockets import socketio, online_users
+from sockets import socketio, session_registry
 
 
 # -------------------------------------------------
@@ -24,51 +27,6 @@ def register_socket_events():
     print("🔧 Socket.IO event handlers registered successfully")
 
 
-# -------------------------------------------------
-# ✅ Broadcast user online/offline status
-# -------------------------------------------------
-def broadcast_online_status(user_id, is_online):
-    try:
-        conversations = Conversation.query.filter(
-            or_(Conversation.user1_id == user_id, Conversation.user2_id == user_id)
-        ).all()
-
-        user = User.query.get(user_id)
-        if not user:
-            print(f"❌ No user found with ID {user_id}")
-            return
-
-        payload = {
-            "user_id": user.public_id,
-            "username": user.username,
-            "is_online": is_online,
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-        }
-
-        print(f"🟢 Broadcasting status for {user.username}: {is_online}")
-        print(f"Conversations found: {[c.id for c in conversations]}")
-
-        for convo in conversations:
-            # Identify the other user in the conversation
-            other_user_id = (
-                convo.user2_id if convo.user1_id == user_id else convo.user1_id
-            )
-
-            # Notify the other user about this user's status
-            emit("user_online_status", payload, room=f"user_{other_user_id}")
-            print(f"📡 Emitting to user_{other_user_id}")
-
-            # Also notify anyone in the conversation room
-            emit("user_online_status", payload, room=f"conversation_{convo.id}")
-            print(f"📡 Emitting to conversation_{convo.id}")
-
-        print(f"✅ Broadcast complete: {user.username} -> {is_online}")
-
-    except Exception as e:
-        print(f"❌ Online status broadcast error: {e}")
-        traceback.print_exc()
-
-
 # -------------------------------------------------
 # ✅ Socket Connection Handlers
 # -------------------------------------------------
@@ -101,24 +59,22 @@ def handle_connect():
             print("❌ No user found for token")
             return False
 
-        user.is_online = True
-        user.last_seen = datetime.utcnow()
-        db.session.commit()
+        # ✅ 5. Register the socket (a user may have several tabs or devices open)
+        came_online = session_registry.connect(flask_request.sid, user.id, user.public_id, user.username)
 
-        # ✅ 5. Store user in online_users for lookup
-        online_users[user.id] = {
-            "sid": flask_request.sid,
-            "public_id": user.public_id,
-            "username": user.username,
-        }
+        # Persisted by the presence flusher, the handshake does not wait on a commit
+        presence_store.mark_online(user.id)
 
         join_room(f"user_{user.id}")
 
-        # Send online status of all users in conversations to this newly connected user
-        send_initial_online_statuses(user.id)
+        # Send online status of all users in conversations to this newly connected socket
+        statuses = initial_statuses(user.id)
+        if statuses:
+            emit("presence_digest", {"statuses": statuses})
 
-        # Broadcast that this user is now online
-        broadcast_online_status(user.id, True)
+        # Partners hear about this user in the next presence digest (only for their first socket)
+        if came_online:
+            presence.user_connected(user.id)
 
         print(f"✅ Authenticated socket for user: {user.username} ({user.public_id})")
         return True
@@ -129,56 +85,24 @@ def handle_connect():
         return False
 
 
-def send_initial_online_statuses(user_id):
-    """Send online status of all users in conversations to the newly connected user"""
-    try:
-        conversations = Conversation.query.filter(
-            or_(Conversation.user1_id == user_id, Conversation.user2_id == user_id)
-        ).all()
-
-        for convo in conversations:
-            other_user_id = (
-                convo.user2_id if convo.user1_id == user_id else convo.user1_id
-            )
-            other_user = User.query.get(other_user_id)
-
-            if other_user:
-                payload = {
-                    "user_id": other_user.public_id,
-                    "username": other_user.username,
-                    "is_online": other_user.is_online,
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                }
-                emit("user_online_status", payload, room=f"user_{user_id}")
-                print(f"📡 Sent initial status for {other_user.username} to user_{user_id}")
-
-    except Exception as e:
-        print(f"❌ Error sending initial online statuses: {e}")
-        traceback.print_exc()
-
-
 @socketio.on("disconnect")
 def handle_disconnect():
     try:
-        user_id = None
-        for uid, info in list(online_users.items()):
-            if info.get("sid") == flask_request.sid:
-                user_id = uid
-                break
-
-        if not user_id:
+        session, went_offline = session_registry.disconnect(flask_request.sid)
+        if not session:
             print("⚠️ Unknown socket disconnected")
             return
 
-        user = User.query.get(user_id)
-        if user:
-            user.is_online = False
-            user.last_seen = datetime.utcnow()
-            db.session.commit()
+        user_id = session["user_id"]
+        username = session["username"]
+
+        # Other tabs or devices are still connected, the user stays online
+        if not went_offline:
+            print(f"🔌 {username} closed one socket, still online.")
+            return
 
-        username = online_users[user_id]["username"]
-        online_users.pop(user_id, None)
-        broadcast_online_status(user_id, False)
+        presence_store.mark_offline(user_id)
+        presence.user_disconnected(user_id)
 
         print(f"🔌 {username} disconnected.")
 
@@ -199,7 +123,7 @@ def handle_join_conversation(data):
             emit("error", {"message": "Conversation ID required"})
             return
 
-        user_id, _, error = get_authenticated_user_from_socket(online_users, flask_request)
+        user_id, user_data, error = get_authenticated_user_from_socket(session_registry, flask_request)
         if not user_id:
             emit("error", {"message": error})
             return
@@ -213,27 +137,11 @@ def handle_join_conversation(data):
         room = f"conversation_{conversation_id}"
         join_room(room)
 
-        # Mark unread messages as read
-        unread = Message.query.filter(
-            Message.conversation_id == conversation_id,
-            Message.sender_id != user_id,
-            Message.is_read == False,
-        ).all()
-
-        if unread:
-            for msg in unread:
-                msg.mark_read()
-                db.session.add(msg)
+        # Mark unread messages as read, one coalesced receipt for the whole backlog
+        receipt = read_receipts.mark_read(convo.id, user_id, user_data["public_id"])
+        if receipt.count:
             db.session.commit()
-
-            # Emit message status updates for all read messages
-            for msg in unread:
-                emit("message_status_update", {
-                    "message_id": msg.id,
-                    "conversation_id": conversation_id,
-                    "status": "read",
-                    "read_at": msg.read_at.isoformat() + "Z" if msg.read_at else None
-                }, room=f"conversation_{conversation_id}")
+            read_receipts.broadcast(receipt)
 
         emit("joined_conversation", {"conversation_id": conversation_id})
         print(f"✅ User {user_id} joined {room}")
@@ -243,6 +151,45 @@ def handle_join_conversation(data):
         traceback.print_exc()
 
 
+@socketio.on("load_messages")
+def handle_load_messages(data):
+    """Cursor-paged chat history: {conversation_id, before_id | after_id, limit}"""
+    try:
+        conversation_id = data.get("conversation_id")
+        if not conversation_id:
+            emit("error", {"message": "Conversation ID required"})
+            return
+
+        user_id, _, error = get_authenticated_user_from_socket(session_registry, flask_request)
+        if not user_id:
+            emit("error", {"message": error})
+            return
+
+        is_auth, convo, error = validate_socket_conversation_access(conversation_id, user_id)
+        if not is_auth:
+            emit("error", {"message": error})
+            return
+
+        limit = max(1, min(int(data.get("limit") or 50), 100))
+        after_id = data.get("after_id")
+        messages, has_more = load_message_page(
+            conversation_id,
+            before_id=data.get("before_id"),
+            after_id=after_id,
+            limit=limit
+        )
+
+        emit("messages_page", {
+            "conversation_id": conversation_id,
+            "messages": [message.to_dict() for message in messages],
+            "pagination": page_info(messages, has_more, limit, "newer" if after_id else "older")
+        })
+
+    except Exception as e:
+        print(f"❌ Load messages error: {e}")
+        traceback.print_exc()
+
+
 @socketio.on("leave_conversation")
 def handle_leave_conversation(data):
     try:
@@ -258,6 +205,7 @@ def handle_leave_conversation(data):
 # sockets/chat_events.py - UPDATED send_message handler
 
 @socketio.on("send_message")
+@socket_rate_limit(max_events=20, window_seconds=10)
 def handle_send_message(data):
     try:
         conversation_id = data.get("conversation_id")
@@ -267,7 +215,7 @@ def handle_send_message(data):
             emit("error", {"message": "Invalid message"})
             return
 
-        user_id, user_data, error = get_authenticated_user_from_socket(online_users, flask_request)
+        user_id, user_data, error = get_authenticated_user_from_socket(session_registry, flask_request)
         if not user_id:
             emit("error", {"message": error})
             return
@@ -309,6 +257,8 @@ def handle_send_message(data):
         db.session.add(msg)
         convo.last_message = content
         convo.last_message_at = datetime.utcnow()
+        recipient_id = convo.user2_id if convo.user1_id == user_id else convo.user1_id
+        unread_counters.increment(conversation_id, recipient_id)
         db.session.commit()
         db.session.refresh(msg)
 
@@ -330,7 +280,7 @@ def handle_message_delivered(data):
         if not message_id or not conversation_id:
             return
 
-        user_id, user_data, error = get_authenticated_user_from_socket(online_users, flask_request)
+        user_id, user_data, error = get_authenticated_user_from_socket(session_registry, flask_request)
         if not user_id:
             return
 
@@ -359,40 +309,29 @@ def handle_message_delivered(data):
 def handle_read_messages(data):
     try:
         conversation_id = data.get("conversation_id")
-        message_ids = data.get("message_ids", [])
+        message_ids = data.get("message_ids") or None
+        up_to_id = data.get("up_to_id")
 
         if not conversation_id:
             return
 
-        user_id, user_data, error = get_authenticated_user_from_socket(online_users, flask_request)
+        user_id, user_data, error = get_authenticated_user_from_socket(session_registry, flask_request)
         if not user_id:
             return
 
-        # If no specific message IDs provided, mark all unread messages in conversation as read
-        if not message_ids:
-            unread_messages = Message.query.filter(
-                Message.conversation_id == conversation_id,
-                Message.sender_id != user_id,
-                Message.is_read == False
-            ).all()
-            message_ids = [msg.id for msg in unread_messages]
-
-        # Mark messages as read
-        for msg_id in message_ids:
-            message = Message.query.get(msg_id)
-            if message and message.sender_id != user_id and not message.is_read:
-                message.mark_read()
-                db.session.add(message)
-
-                emit("message_status_update", {
-                    "message_id": msg_id,
-                    "conversation_id": conversation_id,
-                    "status": "read",
-                    "read_at": message.read_at.isoformat() + "Z" if message.read_at else None
-                }, room=f"conversation_{conversation_id}")
+        is_auth, convo, error = validate_socket_conversation_access(conversation_id, user_id)
+        if not is_auth:
+            emit("error", {"message": error})
+            return
 
-        db.session.commit()
-        print(f"📖 {len(message_ids)} messages marked as read by {user_data['username']}")
+        # Without message IDs or up_to_id, every unread message in the conversation is marked read
+        receipt = read_receipts.mark_read(
+            convo.id, user_id, user_data["public_id"], up_to_id=up_to_id, message_ids=message_ids
+        )
+        if receipt.count:
+            db.session.commit()
+            read_receipts.broadcast(receipt)
+        print(f"📖 {receipt.count} messages marked as read by {user_data['username']}")
 
     except Exception as e:
         print(f"❌ Read messages error: {e}")
@@ -400,13 +339,14 @@ def handle_read_messages(data):
 
 
 @socketio.on("typing")
+@socket_rate_limit(max_events=30, window_seconds=10, notify=False)
 def handle_typing(data):
     try:
         print("👀 Typing event data:", data)
         conversation_id = data.get("conversation_id")
         is_typing = data.get("is_typing", True)
 
-        user_id, user_data, error = get_authenticated_user_from_socket(online_users, flask_request)
+        user_id, user_data, error = get_authenticated_user_from_socket(session_registry, flask_request)
         if not user_id:
             emit("error", {"message": error})
             return
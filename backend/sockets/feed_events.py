@@ -0,0 +1,46 @@
+from flask import request as flask_request
+from flask_socketio import join_room, leave_room, emit
+
+from utils.feed import FEED_TOPIC, POST_TOPIC, resolve_topic
+from utils.rate_limit import socket_rate_limit
+from utils.security import get_authenticated_user_from_socket
+from sockets import socketio, session_registry
+
+
+# -------------------------------------------------
+# ✅ Feed Topic Subscriptions ('feed' or 'post:<id>')
+# -------------------------------------------------
+@socketio.on("subscribe")
+@socket_rate_limit(max_events=60, window_seconds=10)
+def handle_subscribe(data):
+    user_id, _, error = get_authenticated_user_from_socket(session_registry, flask_request)
+    if not user_id:
+        emit("error", {"message": error})
+        return
+
+    topic = (data or {}).get("topic")
+    room = resolve_topic(topic)
+    if not room:
+        emit("error", {"message": "Unknown topic"})
+        return
+
+    join_room(room)
+    emit("subscribed", {"topic": room})
+
+
+@socketio.on("unsubscribe")
+@socket_rate_limit(max_events=60, window_seconds=10)
+def handle_unsubscribe(data):
+    user_id, _, error = get_authenticated_user_from_socket(session_registry, flask_request)
+    if not user_id:
+        emit("error", {"message": error})
+        return
+
+    # Only feed topics, never the user's own or conversation rooms; deleted posts can still be left
+    topic = (data or {}).get("topic")
+    if topic != FEED_TOPIC and not POST_TOPIC.match(topic or ""):
+        emit("error", {"message": "Unknown topic"})
+        return
+
+    leave_room(topic)
+    emit("unsubscribed", {"topic": topic})
@@ -0,0 +1,75 @@
+"""
+Socket.IO fan-out between server processes
+SOCKETIO_MESSAGE_QUEUE selects the pub/sub backend that relays room emits:
+    (empty)            single process, no queue
+    memory://          in-process stand-in, for tests running several servers in one process
+    local:///path.sock local hub over a UNIX socket (python manage.py sockets hub)
+    redis://...        Redis (or kafka://, amqp://, zmq+... handled by Flask-SocketIO)
+"""
+import queue
+import threading
+from urllib.parse import urlparse
+
+from socketio import PubSubManager
+
+from utils.local_hub import LocalHubClient
+
+
+class InProcessManager(PubSubManager):
+    """Pub/sub over in-memory queues shared by every server created in this process"""
+
+    name = "memory"
+    _channels = {}
+    _channels_lock = threading.Lock()
+
+    def __init__(self, url="memory://", channel="flask-socketio", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._queue = queue.Queue()
+        if not write_only:
+            with self._channels_lock:
+                self._channels.setdefault(channel, []).append(self._queue)
+
+    def _publish(self, data):
+        with self._channels_lock:
+            subscribers = list(self._channels.get(self.channel, ()))
+        for subscriber in subscribers:
+            subscriber.put(data)
+
+    def _listen(self):
+        while True:
+            yield self._queue.get()
+
+
+class LocalSocketManager(PubSubManager):
+    """Pub/sub through the local hub, for several worker processes on one machine"""
+
+    name = "local"
+
+    def __init__(self, url, channel="flask-socketio", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = urlparse(url).path
+        self.client = LocalHubClient(self.path)
+
+    def _publish(self, data):
+        self.client.publish(self.channel, data)
+
+    def _listen(self):
+        yield from self.client.listen(self.channel)
+
+
+def client_manager_options(app):
+    """
+    Extra SocketIO.init_app keyword arguments for the configured message queue
+    Returns:
+        {} for a single process, otherwise client_manager or message_queue options
+    """
+    url = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    if not url:
+        return {}
+
+    channel = app.config.get('SOCKETIO_CHANNEL', 'flask-socketio')
+    if url.startswith('memory://'):
+        return {"client_manager": InProcessManager(url, channel=channel)}
+    if url.startswith('local://'):
+        return {"client_manager": LocalSocketManager(url, channel=channel)}
+    return {"message_queue": url, "channel": channel}
@@ -7,7 +7,18 @@ from .validation import (
     process_image
 )
 from .security import rate_limit, validate_conversation_access, get_current_user_from_jwt
-from .helpers import build_image_url
+from .helpers import build_image_url, start_background_task, get_redis_client
+from .cache import TTLCache
+from .candidate_deck import candidate_decks
+from .swipe_index import swipe_index
+from .match_engine import match_engine
+from .session_registry import session_registry
+from .presence import presence, presence_store
+from .rate_limit import rate_limiter, socket_rate_limit
+from .blob_store import blob_store
+from .thumbnails import thumbnails, image_sizes
+from .serializers import serialize_user, user_load_options, requested_fields
+from .feed import feed, feed_notifier
 from .flutterwave_client import FlutterwaveClient, get_flutterwave_client  # 👈 Change this import
 
 __all__ = [
@@ -21,6 +32,25 @@ __all__ = [
     'validate_conversation_access',
     'get_current_user_from_jwt',
     'build_image_url',
+    'start_background_task',
+    'get_redis_client',
+    'TTLCache',
+    'candidate_decks',
+    'swipe_index',
+    'match_engine',
+    'session_registry',
+    'presence',
+    'presence_store',
+    'rate_limiter',
+    'socket_rate_limit',
+    'blob_store',
+    'thumbnails',
+    'image_sizes',
+    'serialize_user',
+    'user_load_options',
+    'requested_fields',
+    'feed',
+    'feed_notifier',
     'FlutterwaveClient',           # 👈 Keep class export
     'get_flutterwave_client'       # 👈 Change to function export
 ]
\ No newline at end of file
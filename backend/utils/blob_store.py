@@ -0,0 +1,178 @@
+import base64
+import hashlib
+import os
+import tempfile
+
+from sqlalchemy import select, update
+
+from models.core import db
+
+# Content types accepted for stored images and the file extension each is stored under
+IMAGE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+
+
+def decode_data_uri(image_data):
+    """
+    Split a data:image/...;base64 URI into bytes
+    Returns:
+        Tuple of (raw bytes, content type)
+    Raises:
+        ValueError: Malformed URI, unsupported image type or empty image
+    """
+    header, _, data = image_data.partition(",")
+    content_type = header[len("data:"):].split(";", 1)[0].lower()
+    if content_type not in IMAGE_EXTENSIONS:
+        raise ValueError(f"Unsupported image type: {content_type}")
+    raw = base64.b64decode(data, validate=True)
+    if not raw:
+        raise ValueError("Empty image")
+    return raw, content_type
+
+
+def blob_key(raw, content_type):
+    """Content address of an image: sha256 of the bytes, fanned out over two directory levels"""
+    digest = hashlib.sha256(raw).hexdigest()
+    extension = IMAGE_EXTENSIONS[content_type]
+    return f"blobs/{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+
+class LocalBlobStore:
+    """
+    Blobs on local disk under static/uploads, so build_image_url turns keys into static URLs
+    Rows store the key (blobs/ab/cd/<sha256>.<ext>)
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def exists(self, key):
+        return os.path.exists(os.path.join(self.root, key))
+
+    def get(self, key):
+        with open(os.path.join(self.root, key), "rb") as f:
+            return f.read()
+
+    def url(self, key):
+        return key
+
+    def put(self, key, raw, content_type):
+        path = os.path.join(self.root, key)
+        if os.path.exists(path):
+            return key  # Same content already stored
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+        return key
+
+
+class SupabaseBlobStore:
+    """Blobs in a Supabase storage bucket, rows store the public URL"""
+
+    def __init__(self, client, bucket):
+        self.bucket = client.storage.from_(bucket)
+
+    def exists(self, key):
+        folder, _, name = key.rpartition("/")
+        return any(item.get("name") == name for item in self.bucket.list(folder, {"search": name}))
+
+    def get(self, key):
+        return self.bucket.download(key)
+
+    def url(self, key):
+        return self.bucket.get_public_url(key)
+
+    def put(self, key, raw, content_type):
+        self.bucket.upload(key, raw, {"content-type": content_type, "upsert": "true"})
+        return self.url(key)
+
+
+class BlobStore:
+    """Content-addressed image storage: the same image is stored once however often it is uploaded"""
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app):
+        """Pick the backend from app config (IMAGE_STORE_BACKEND = local | supabase)"""
+        if app.config.get('IMAGE_STORE_BACKEND', 'local') == 'supabase':
+            self.backend = SupabaseBlobStore(app.config['supabase'], app.config['IMAGE_STORE_BUCKET'])
+        else:
+            root = app.config.get('IMAGE_STORE_ROOT') or os.path.join(app.static_folder, "uploads")
+            self.backend = LocalBlobStore(root)
+        app.extensions['blob_store'] = self
+
+    def save_bytes(self, raw, content_type):
+        """Store image bytes, returns the reference to keep in the row (key or URL)"""
+        return self.backend.put(blob_key(raw, content_type), raw, content_type)
+
+    @staticmethod
+    def key_for(ref):
+        """Blob key behind a stored reference, or None for external URLs and inline data"""
+        if not ref or ref.startswith("data:") or "blobs/" not in ref:
+            return None
+        return ref[ref.index("blobs/"):]
+
+    def save(self, image_data):
+        """
+        Store an uploaded image
+        Args:
+            image_data: data:image/...;base64 URI, or an http(s) URL which is kept as is
+        Returns:
+            Reference to keep in the row, or None for empty input
+        """
+        if not image_data:
+            return None
+        if not image_data.startswith("data:image/"):
+            return image_data
+        raw, content_type = decode_data_uri(image_data)
+        return self.save_bytes(raw, content_type)
+
+
+def migrate_inline_images(column, batch_size=200, save=None):
+    """
+    Move base64 images stored inline in a table into the blob store
+    Rows are streamed by primary key in batches, each batch commits on its own
+    Args:
+        column: Image column of a model, e.g. Picture.image
+        batch_size: Rows per batch
+        save: Callable storing one image and returning its reference (defaults to blob_store.save)
+    Yields:
+        Number of rows migrated in each batch
+    """
+    table = column.class_
+    save = save or blob_store.save
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(table.id, column)
+            .where(table.id > last_id, column.like("data:image/%"))
+            .order_by(table.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        for row_id, image_data in rows:
+            try:
+                stored = save(image_data)
+            except ValueError as e:
+                print(f"⚠️ Skipping {table.__tablename__} {row_id}: {e}")
+                continue
+            db.session.execute(update(table).where(table.id == row_id).values({column.key: stored}))
+        db.session.commit()
+        last_id = rows[-1][0]
+        yield len(rows)
+
+
+# Shared store instance, configured in create_app
+blob_store = BlobStore()
@@ -0,0 +1,91 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with LRU eviction and per-entry expiry
+    Used for server-side state that must stay bounded in memory
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        """
+        Args:
+            maxsize: Maximum number of entries kept before the least recently used is evicted
+            ttl: Default time-to-live in seconds for new entries
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        """Return the value for key if present and not expired, marking it as recently used"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, evicting the least recently used entries when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def touch(self, key, ttl=None):
+        """Extend the expiry of an existing entry, returns False if it is missing or expired"""
+        with self._lock:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                return False
+            self.set(key, value, ttl)
+            return True
+
+    def pop(self, key, default=None):
+        """Remove key and return its value (or default if missing/expired)"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None or entry[0] <= time.monotonic():
+                return default
+            return entry[1]
+
+    def values(self):
+        """Snapshot of all live values"""
+        now = time.monotonic()
+        with self._lock:
+            return [value for expires_at, value in self._data.values() if expires_at > now]
+
+    def prune(self):
+        """Drop every expired entry, returns the number of entries removed"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+            for key in expired:
+                del self._data[key]
+            return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+_MISSING = object()
@@ -0,0 +1,193 @@
+import random
+import threading
+from collections import deque
+
+from sqlalchemy import func
+
+from models.core import db
+from models.user import User
+from utils.cache import TTLCache
+from utils.helpers import start_background_task
+
+# Genders shown for each 'interested_in' preference (anything else gets an empty deck)
+GENDERS_BY_INTEREST = {
+    "male": ("male",),
+    "female": ("female",),
+    "both": ("male", "female"),
+}
+
+
+def _normalize_interest(interested_in):
+    return (interested_in or "").strip().lower()
+
+
+class CandidateDeck:
+    """
+    A shuffled list of eligible user IDs for one viewer
+    Positions before 'served' have already been handed out and are never reordered
+    """
+
+    def __init__(self, user_id, interested_in, seed, user_ids):
+        self.user_id = user_id
+        self.interested_in = interested_in
+        self.seed = seed
+        self.user_ids = user_ids
+        self.members = set(user_ids)
+        self.served = 0
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def accepts(self, user_id, gender):
+        """Check whether a user belongs in this deck"""
+        genders = GENDERS_BY_INTEREST.get(self.interested_in, ())
+        return (
+            user_id != self.user_id
+            and user_id not in self.members
+            and (gender or "").lower() in genders
+        )
+
+    def insert(self, user_id):
+        """Splice a user into the part of the deck that has not been served yet"""
+        with self.lock:
+            position = self.rng.randint(self.served, len(self.user_ids))
+            self.user_ids.insert(position, user_id)
+            self.members.add(user_id)
+
+
+class CandidateDeckEngine:
+    """
+    Builds one shuffled deck of candidate IDs per user and pages through it by cursor
+    Decks live server-side with a TTL so page N+1 continues where page N stopped
+    """
+
+    def __init__(self, ttl_seconds=1800, max_decks=10000):
+        self._decks = TTLCache(maxsize=max_decks, ttl=ttl_seconds)
+        self._pending = deque()
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._app = None
+
+    def init_app(self, app):
+        """Configure deck storage from app config"""
+        self._decks = TTLCache(
+            maxsize=app.config.get('EXPLORE_DECK_MAX_DECKS', 10000),
+            ttl=app.config.get('EXPLORE_DECK_TTL_SECONDS', 1800)
+        )
+        self._app = app
+        app.extensions['candidate_decks'] = self
+
+    def get_deck(self, user, rebuild=False):
+        """Return the user's live deck, building a new one if missing, expired or stale"""
+        deck = self._decks.get(user.id)
+        if rebuild or deck is None or deck.interested_in != _normalize_interest(user.interested_in):
+            deck = self._build(user)
+            self._decks.set(user.id, deck)
+        return deck
+
+    def invalidate(self, user_id):
+        """Drop a user's deck so the next explore call rebuilds it"""
+        self._decks.pop(user_id)
+
+    def next_page(self, user, cursor=None, start=0, limit=30, exclude=None):
+        """
+        Serve the next page of candidate IDs from the user's deck
+        Args:
+            user: Viewer requesting candidates
+            cursor: Opaque cursor returned by a previous call
+            start: Deck position to use when no cursor is given
+            limit: Maximum number of IDs to return
+            exclude: Optional callable taking a list of IDs and returning the subset to skip
+        Returns:
+            Tuple of (user_ids, next_cursor) where next_cursor is None at the end of the deck
+        """
+        deck = self.get_deck(user)
+        position = self._decode_cursor(cursor, deck) if cursor else max(start, 0)
+        page = []
+
+        while len(page) < limit:
+            with deck.lock:
+                chunk = deck.user_ids[position:position + limit * 2]
+                deck.served = max(deck.served, position + len(chunk))
+            if not chunk:
+                break
+
+            skipped = exclude(chunk) if exclude else set()
+            for offset, candidate_id in enumerate(chunk):
+                if candidate_id in skipped:
+                    continue
+                page.append(candidate_id)
+                if len(page) == limit:
+                    position += offset + 1
+                    break
+            else:
+                position += len(chunk)
+
+        has_more = position < len(deck.user_ids)
+        return page, self._encode_cursor(deck, position) if has_more else None
+
+    def notify_new_user(self, user_id):
+        """Queue a newly registered user to be spliced into live decks in the background"""
+        with self._lock:
+            self._pending.append(user_id)
+            if self._refreshing or self._app is None:
+                return
+            self._refreshing = True
+
+        start_background_task(self._app, self._refresh_pending)
+
+    def _build(self, user):
+        interested_in = _normalize_interest(user.interested_in)
+        genders = GENDERS_BY_INTEREST.get(interested_in)
+
+        user_ids = []
+        if genders:
+            rows = db.session.query(User.id).filter(
+                User.id != user.id,
+                func.lower(User.gender).in_(genders)
+            ).order_by(User.id).all()
+            user_ids = [row[0] for row in rows]
+
+        seed = random.SystemRandom().getrandbits(32)
+        deck = CandidateDeck(user.id, interested_in, seed, user_ids)
+        deck.rng.shuffle(deck.user_ids)
+        return deck
+
+    def _refresh_pending(self):
+        """Background task: add queued new users to every live deck that should show them"""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._refreshing = False
+                    return
+                user_ids = list(self._pending)
+                self._pending.clear()
+
+            try:
+                with self._app.app_context():
+                    new_users = db.session.query(User.id, User.gender).filter(User.id.in_(user_ids)).all()
+
+                for deck in self._decks.values():
+                    for new_user_id, gender in new_users:
+                        if deck.accepts(new_user_id, gender):
+                            deck.insert(new_user_id)
+            except Exception as e:
+                print(f"❌ Candidate deck refresh error: {e}")
+
+    @staticmethod
+    def _encode_cursor(deck, position):
+        return f"{deck.seed:x}:{position}"
+
+    @staticmethod
+    def _decode_cursor(cursor, deck):
+        """Translate a cursor into a deck position, restarting if it belongs to an older deck"""
+        try:
+            seed, position = cursor.split(":", 1)
+            if int(seed, 16) != deck.seed:
+                return 0
+            return max(int(position), 0)
+        except (ValueError, AttributeError):
+            return 0
+
+
+# Shared engine instance, configured in create_app
+candidate_decks = CandidateDeckEngine()
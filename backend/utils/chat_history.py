@@ -0,0 +1,61 @@
+from sqlalchemy import or_, and_, select
+from sqlalchemy.orm import joinedload, aliased
+
+from models.chat import Message
+
+
+def load_message_page(conversation_id, before_id=None, after_id=None, limit=50):
+    """
+    Load one page of a conversation's history by keyset instead of OFFSET + COUNT
+    Args:
+        conversation_id: Conversation to read
+        before_id: Return messages older than this message (scrolling back)
+        after_id: Return messages newer than this message (catching up)
+        limit: Page size
+    Returns:
+        Tuple of (messages in chronological order, has_more in the paging direction)
+    Senders and reply previews are eager-loaded so Message.to_dict does not lazy-load per row
+    """
+    reply_to = aliased(Message)
+    query = Message.query.filter(Message.conversation_id == conversation_id).options(
+        joinedload(Message.sender),
+        joinedload(Message.reply_to.of_type(reply_to)).joinedload(reply_to.sender)
+    )
+
+    anchor_id = after_id or before_id
+    if anchor_id:
+        anchor_timestamp = select(Message.timestamp).where(Message.id == anchor_id).scalar_subquery()
+        if after_id:
+            query = query.filter(or_(
+                Message.timestamp > anchor_timestamp,
+                and_(Message.timestamp == anchor_timestamp, Message.id > anchor_id)
+            ))
+        else:
+            query = query.filter(or_(
+                Message.timestamp < anchor_timestamp,
+                and_(Message.timestamp == anchor_timestamp, Message.id < anchor_id)
+            ))
+
+    if after_id:
+        query = query.order_by(Message.timestamp.asc(), Message.id.asc())
+    else:
+        query = query.order_by(Message.timestamp.desc(), Message.id.desc())
+
+    messages = query.limit(limit + 1).all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+
+    if not after_id:
+        messages.reverse()  # Reverse to get chronological order
+    return messages, has_more
+
+
+def page_info(messages, has_more, limit, direction):
+    """Cursor metadata returned next to a page of messages"""
+    return {
+        "limit": limit,
+        "direction": direction,
+        "has_more": has_more,
+        "oldest_id": messages[0].id if messages else None,
+        "newest_id": messages[-1].id if messages else None
+    }
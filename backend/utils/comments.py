@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+
+from models.user import Comment
+from utils.pagination import encode_cursor, decode_cursor
+from utils.serializers import user_load_options
+
+
+def _with_authors(query):
+    """Authors joined in the same query, with only the avatar projection's columns"""
+    return query.options(*user_load_options("avatar", relationship=Comment.user))
+
+
+def comment_page(post_id, cursor=None, limit=50):
+    """
+    One page of a post's comments, newest first, paged by a (created_at, id) cursor
+    Args:
+        post_id: Internal post id
+        cursor: next_cursor of the previous page, None for the newest comments
+        limit: Comments per page
+    Returns:
+        Tuple of (list of comment dicts, next cursor or None)
+    """
+    query = _with_authors(Comment.query).filter(Comment.post_id == post_id)
+    position = decode_cursor(cursor, datetime, int)
+    if position is not None:
+        created_at, comment_id = position
+        query = query.filter(or_(
+            Comment.created_at < created_at,
+            and_(Comment.created_at == created_at, Comment.id < comment_id)
+        ))
+    rows = query.order_by(Comment.created_at.desc(), Comment.id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    return [comment.to_dict() for comment in rows], next_cursor
+
+
+def latest_comments(post_ids, per_post=3):
+    """
+    The newest comments of several posts at once, for inline previews
+    Ranks comments per post in the database, so the whole batch is one query
+    (plus the authors' first pictures) however many posts there are
+    Args:
+        post_ids: Internal post ids
+        per_post: Comments kept per post
+    Returns:
+        Dict of post id -> list of comment dicts, newest first; every id is present
+    """
+    previews = {post_id: [] for post_id in post_ids}
+    if not previews or per_post <= 0:
+        return previews
+
+    ranked = select(
+        Comment.id,
+        func.row_number().over(
+            partition_by=Comment.post_id,
+            order_by=(Comment.created_at.desc(), Comment.id.desc())
+        ).label("rank")
+    ).where(Comment.post_id.in_(list(previews))).subquery()
+
+    rows = (
+        _with_authors(Comment.query)
+        .join(ranked, ranked.c.id == Comment.id)
+        .filter(ranked.c.rank <= per_post)
+        .order_by(Comment.post_id, Comment.created_at.desc(), Comment.id.desc())
+        .all()
+    )
+    for comment in rows:
+        previews[comment.post_id].append(comment.to_dict())
+    return previews
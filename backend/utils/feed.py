@@ -0,0 +1,271 @@
+import re
+import threading
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+
+from models.core import db
+from models.user import Like, Post
+from utils.cache import TTLCache
+from utils.comments import latest_comments
+from utils.helpers import start_background_task
+from utils.pagination import encode_cursor, decode_cursor
+from utils.serializers import user_load_options
+
+
+class FeedEngine:
+    """
+    The global home feed, paged by a (created_at, id) cursor
+    Everyone sees the same posts, so the serialized page is cached and shared; only
+    the counters and the viewer's has_liked bits are read per request, with one
+    primary-key lookup. The first page is dropped when a post is created, every page
+    when one is deleted; other workers catch up within the TTL.
+    Inline comment previews are cached per post and dropped when that post gets a comment.
+    """
+
+    def __init__(self, ttl_seconds=30, max_pages=512, inline_comments=3):
+        self.inline_comments = inline_comments
+        self._heads = TTLCache(maxsize=64, ttl=ttl_seconds)        # limit -> first page
+        self._pages = TTLCache(maxsize=max_pages, ttl=ttl_seconds)  # (cursor, limit) -> page
+        self._previews = TTLCache(maxsize=max_pages * 20, ttl=ttl_seconds)  # post id -> newest comments
+
+    def init_app(self, app):
+        """Configure page caches from app config"""
+        ttl = app.config.get('FEED_PAGE_CACHE_TTL_SECONDS', 30)
+        max_pages = app.config.get('FEED_PAGE_CACHE_MAX_PAGES', 512)
+        self.inline_comments = app.config.get('FEED_INLINE_COMMENTS_MAX', 3)
+        self._heads = TTLCache(maxsize=64, ttl=ttl)
+        self._pages = TTLCache(maxsize=max_pages, ttl=ttl)
+        self._previews = TTLCache(maxsize=max_pages * 20, ttl=ttl)
+        app.extensions['feed'] = self
+
+    def page(self, viewer_id, cursor=None, limit=20, comments=0):
+        """
+        One feed page for a viewer
+        Args:
+            viewer_id: User whose has_liked bits are overlaid
+            cursor: next_cursor of the previous page, None for the newest posts
+            limit: Posts per page
+            comments: Newest comments to inline with each post, capped at inline_comments
+        Returns:
+            Tuple of (list of post dicts, next cursor or None)
+        """
+        position = decode_cursor(cursor, datetime, int)
+        posts, next_cursor = self._shared_page(position, limit)
+        page = self._overlay(viewer_id, posts)
+
+        comments = min(comments, self.inline_comments)
+        if comments > 0 and page:
+            previews = self._comment_previews([post_id for post_id, _ in page])
+            for post_id, data in page:
+                data["comments"] = previews[post_id][:comments]
+        return [data for _, data in page], next_cursor
+
+    def _shared_page(self, position, limit):
+        cache, key = (self._heads, limit) if position is None else (self._pages, (position, limit))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        query = Post.query.options(*user_load_options("avatar", relationship=Post.user))
+        if position is not None:
+            created_at, post_id = position
+            query = query.filter(or_(
+                Post.created_at < created_at,
+                and_(Post.created_at == created_at, Post.id < post_id)
+            ))
+        rows = query.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        posts = [(post.id, post.to_dict(has_liked=False)) for post in rows]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+
+        cache.set(key, (posts, next_cursor))
+        return posts, next_cursor
+
+    def _overlay(self, viewer_id, posts):
+        """Fresh counters and the viewer's likes for a cached page, in one query, as (post id, dict) pairs"""
+        if not posts:
+            return []
+
+        liked = select(Like.id).where(Like.post_id == Post.id, Like.user_id == viewer_id).exists()
+        live = {
+            post_id: (likes_count, comments_count, has_liked)
+            for post_id, likes_count, comments_count, has_liked in db.session.execute(
+                select(Post.id, Post.likes_count, Post.comments_count, liked)
+                .where(Post.id.in_([post_id for post_id, _ in posts]))
+            )
+        }
+
+        page = []
+        for post_id, data in posts:
+            if post_id not in live:
+                continue  # Deleted by another worker since the page was cached
+            likes_count, comments_count, has_liked = live[post_id]
+            page.append((post_id, {**data, "likes_count": likes_count, "comments_count": comments_count,
+                                   "has_liked": bool(has_liked)}))
+        return page
+
+    def _comment_previews(self, post_ids):
+        """Newest comments of each post, loading the uncached posts in one query"""
+        previews = {}
+        missing = []
+        for post_id in post_ids:
+            cached = self._previews.get(post_id)
+            if cached is None:
+                missing.append(post_id)
+            else:
+                previews[post_id] = cached
+        if missing:
+            for post_id, comments in latest_comments(missing, self.inline_comments).items():
+                self._previews.set(post_id, comments)
+                previews[post_id] = comments
+        return previews
+
+    def comment_added(self, post_id):
+        """Only that post's preview is stale, its comments_count is read live"""
+        self._previews.pop(post_id)
+
+    def post_created(self):
+        """A new post only changes the first page, cursor pages are anchored below it"""
+        self._heads.clear()
+
+    def post_deleted(self):
+        """A deletion shifts every page that held the post"""
+        self._heads.clear()
+        self._pages.clear()
+
+
+# Realtime topics: the global feed and one room per post
+FEED_TOPIC = "feed"
+POST_TOPIC = re.compile(r"^post:([0-9a-f-]{36})$")
+
+# Comment IDs listed in one post_update, clients page through the rest
+MAX_COMMENT_IDS = 20
+
+
+def post_topic(public_id):
+    return f"post:{public_id}"
+
+
+class FeedNotifier:
+    """
+    Room-scoped realtime notifications for the feed
+    Clients subscribe to 'feed' or 'post:<id>' and receive small envelopes (IDs and counts)
+    that they hydrate over HTTP when needed. Changes are collected and sent once per
+    interval, so a burst of comments on a hot post becomes one post_update.
+    """
+
+    def __init__(self, interval_seconds=1):
+        self.interval_seconds = interval_seconds
+        self._app = None
+        self._lock = threading.Lock()
+        self._new_posts = []      # public IDs, oldest first
+        self._deleted_posts = []  # public IDs
+        self._touched = {}        # post id -> public IDs of comments added since the last flush
+        self._running = False
+
+    def init_app(self, app):
+        self.interval_seconds = app.config.get('FEED_EVENTS_INTERVAL_SECONDS', 1)
+        self._app = app
+        app.extensions['feed_notifier'] = self
+
+    def post_created(self, public_id):
+        with self._lock:
+            self._new_posts.append(public_id)
+        self._ensure_running()
+
+    def post_deleted(self, public_id):
+        with self._lock:
+            self._deleted_posts.append(public_id)
+        self._ensure_running()
+
+    def comment_added(self, post_id, comment_public_id):
+        with self._lock:
+            self._touched.setdefault(post_id, []).append(comment_public_id)
+        self._ensure_running()
+
+    def post_changed(self, post_id):
+        """Counters of a post moved (likes), subscribers get the new counts"""
+        with self._lock:
+            self._touched.setdefault(post_id, [])
+        self._ensure_running()
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._running or self._app is None:
+                return
+            self._running = True
+        start_background_task(self._app, self._run)
+
+    def _run(self):
+        socketio = self._app.extensions['socketio']
+        while True:
+            socketio.sleep(self.interval_seconds)
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception as e:
+                print(f"❌ Feed events error: {e}")
+
+    def flush(self):
+        """
+        Emit one feed_update and one post_update per touched post
+        Returns:
+            Number of events emitted
+        """
+        with self._lock:
+            new_posts, self._new_posts = self._new_posts, []
+            deleted_posts, self._deleted_posts = self._deleted_posts, []
+            touched, self._touched = self._touched, {}
+
+        socketio = self._app.extensions['socketio']
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        sent = 0
+
+        if new_posts or deleted_posts:
+            socketio.emit("feed_update", {
+                "new_post_ids": list(reversed(new_posts)),
+                "deleted_post_ids": deleted_posts,
+                "timestamp": timestamp,
+            }, room=FEED_TOPIC)
+            sent += 1
+
+        if touched:
+            rows = db.session.execute(
+                select(Post.id, Post.public_id, Post.likes_count, Post.comments_count)
+                .where(Post.id.in_(list(touched)))
+            ).all()
+            for post_id, public_id, likes_count, comments_count in rows:
+                comment_ids = touched[post_id]
+                socketio.emit("post_update", {
+                    "post_id": public_id,
+                    "likes_count": likes_count,
+                    "comments_count": comments_count,
+                    "new_comments": len(comment_ids),
+                    "new_comment_ids": comment_ids[-MAX_COMMENT_IDS:],
+                    "timestamp": timestamp,
+                }, room=post_topic(public_id))
+                sent += 1
+        return sent
+
+
+def resolve_topic(topic):
+    """
+    Check a subscription topic
+    Returns:
+        The room name, or None for unknown topics and missing posts
+    """
+    if topic == FEED_TOPIC:
+        return FEED_TOPIC
+    match = POST_TOPIC.match(topic or "")
+    if not match:
+        return None
+    exists = db.session.execute(select(Post.id).where(Post.public_id == match.group(1))).first()
+    return topic if exists else None
+
+
+# Shared instances, configured in create_app
+feed = FeedEngine()
+feed_notifier = FeedNotifier()
@@ -18,25 +18,50 @@ def build_image_url(image_path: str) -> str:
     return url_for("static", filename=f"uploads/{image_path}", _external=True)
 
 
-def initialize_database():
+def start_background_task(app, target, *args, **kwargs):
     """
-    Initialize database and handle schema updates
-    This should be called from the main app
+    Run target in the background using the app's async mode
+    Prefers Socket.IO's task runner (eventlet/gevent aware) and falls back to a daemon thread
+    """
+    socketio = app.extensions.get('socketio')
+    if socketio is not None:
+        return socketio.start_background_task(target, *args, **kwargs)
+
+    import threading
+    thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+    thread.start()
+    return thread
+
+
+_redis_clients = {}
+
+
+def get_redis_client(url):
+    """
+    Return a shared Redis client for url
+    Redis is optional and only needed when a shared backend is configured
+    """
+    if url not in _redis_clients:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The 'redis' package is required for shared backends (pip install redis)")
+        _redis_clients[url] = redis.Redis.from_url(url)
+    return _redis_clients[url]
+
+
+def dialect_insert(model):
+    """
+    Return an INSERT for model that supports on_conflict_do_update / on_conflict_do_nothing
+    on the configured database (PostgreSQL or SQLite)
     """
     from models.core import db
-    from models.user import User
-
-    db.create_all()
-
-    # Check if new columns need to be added (for existing databases)
-    try:
-        # Try to query the new fields to see if they exist
-        test_user = User.query.first()
-        if test_user:
-            # If we can access the user, check if new fields exist
-            if not hasattr(test_user, 'is_online'):
-                print("Database update needed for new fields...")
-                # In production, you would use proper migrations like Flask-Migrate
-                # For development, you can recreate the database or manually add columns
-    except Exception as e:
-        print(f"Database initialization note: {e}")
\ No newline at end of file
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return insert(model)
@@ -0,0 +1,140 @@
+from datetime import datetime
+
+from sqlalchemy import and_, case, delete, exists, func, insert, literal, or_, select, update
+
+from models.core import db
+from models.user import LikeInbox, Swipe, UserCounter
+from utils.helpers import dialect_insert
+from utils.pagination import encode_cursor, decode_cursor
+
+
+def _floor_subtract(column, amount):
+    """column - amount, never below zero"""
+    return case((column > amount, column - amount), else_=0)
+
+
+def _count(user_id, amount):
+    """Move a user's pending_likes badge"""
+    if amount > 0:
+        total = dialect_insert(UserCounter).values(user_id=user_id, pending_likes=amount)
+        db.session.execute(total.on_conflict_do_update(
+            index_elements=[UserCounter.user_id],
+            set_={"pending_likes": UserCounter.pending_likes + amount}
+        ))
+    elif amount < 0:
+        db.session.execute(
+            update(UserCounter)
+            .where(UserCounter.user_id == user_id)
+            .values(pending_likes=_floor_subtract(UserCounter.pending_likes, -amount))
+        )
+
+
+def like_received(user_id, liker_id):
+    """
+    File liker_id's like in user_id's inbox, unless user_id already swiped on them
+    Reads the like itself for liked_at, so it also restores a like after an unmatch
+    Runs inside the caller's transaction, so it commits together with the swipe
+    """
+    answered = select(Swipe.id).where(Swipe.user_id == user_id, Swipe.target_user_id == liker_id).exists()
+    like = (
+        select(literal(user_id), Swipe.user_id, func.coalesce(Swipe.timestamp, func.current_timestamp()))
+        .where(Swipe.user_id == liker_id, Swipe.target_user_id == user_id, Swipe.action == "like", ~answered)
+    )
+    added = db.session.execute(
+        dialect_insert(LikeInbox)
+        .from_select(["user_id", "liker_id", "liked_at"], like)
+        .on_conflict_do_nothing(index_elements=[LikeInbox.user_id, LikeInbox.liker_id])
+        .returning(LikeInbox.liker_id)
+    ).first()
+    if added:
+        _count(user_id, 1)
+
+
+def answered(user_id, liker_id):
+    """
+    user_id swiped on liker_id (like or pass), take them out of the inbox
+    Runs inside the caller's transaction
+    """
+    removed = db.session.execute(
+        delete(LikeInbox)
+        .where(LikeInbox.user_id == user_id, LikeInbox.liker_id == liker_id)
+        .returning(LikeInbox.liker_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if removed:
+        _count(user_id, -1)
+
+
+def pending_count(user_id):
+    """O(1) number of unanswered likes for a user"""
+    total = db.session.query(UserCounter.pending_likes).filter_by(user_id=user_id).scalar()
+    return total or 0
+
+
+def inbox_page(user_id, cursor=None, limit=20):
+    """
+    One page of a user's unanswered likes, newest first, paged by a (liked_at, liker_id) cursor
+    Returns:
+        Tuple of (list of (liker_id, liked_at), next cursor or None)
+    """
+    query = select(LikeInbox.liker_id, LikeInbox.liked_at).where(LikeInbox.user_id == user_id)
+    position = decode_cursor(cursor, datetime, int)
+    if position is not None:
+        liked_at, liker_id = position
+        query = query.where(or_(
+            LikeInbox.liked_at < liked_at,
+            and_(LikeInbox.liked_at == liked_at, LikeInbox.liker_id < liker_id)
+        ))
+    rows = db.session.execute(
+        query.order_by(LikeInbox.liked_at.desc(), LikeInbox.liker_id.desc()).limit(limit + 1)
+    ).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].liked_at, rows[-1].liker_id) if has_more else None
+    return [(row.liker_id, row.liked_at) for row in rows], next_cursor
+
+
+def rebuild(connection, user_ids=None):
+    """
+    Reconciliation job: recompute inboxes and pending_likes from the swipes table
+    Args:
+        connection: Connection or session to run on
+        user_ids: Optional list of users to rebuild, defaults to everyone
+    """
+    reply = Swipe.__table__.alias("reply")
+    pending = (
+        select(Swipe.target_user_id, Swipe.user_id, func.coalesce(Swipe.timestamp, func.current_timestamp()))
+        .where(
+            Swipe.action == "like",
+            Swipe.user_id != Swipe.target_user_id,
+            ~exists().where(reply.c.user_id == Swipe.target_user_id, reply.c.target_user_id == Swipe.user_id)
+        )
+    )
+    clear_inbox = delete(LikeInbox)
+    if user_ids is not None:
+        pending = pending.where(Swipe.target_user_id.in_(user_ids))
+        clear_inbox = clear_inbox.where(LikeInbox.user_id.in_(user_ids))
+
+    connection.execute(clear_inbox)
+    connection.execute(insert(LikeInbox).from_select(["user_id", "liker_id", "liked_at"], pending))
+
+    # Badges: refresh existing rows, then add rows for users that had none
+    counted = (
+        select(func.count())
+        .select_from(LikeInbox)
+        .where(LikeInbox.user_id == UserCounter.user_id)
+        .scalar_subquery()
+    )
+    refresh_totals = update(UserCounter).values(pending_likes=counted)
+    missing_totals = (
+        select(LikeInbox.user_id, func.count())
+        .where(LikeInbox.user_id.not_in(select(UserCounter.user_id)))
+        .group_by(LikeInbox.user_id)
+    )
+    if user_ids is not None:
+        refresh_totals = refresh_totals.where(UserCounter.user_id.in_(user_ids))
+        missing_totals = missing_totals.where(LikeInbox.user_id.in_(user_ids))
+
+    connection.execute(refresh_totals)
+    connection.execute(insert(UserCounter).from_select(["user_id", "pending_likes"], missing_totals))
@@ -0,0 +1,252 @@
+"""
+Minimal pub/sub, set and sorted set store served over a local UNIX socket
+Stand-in for Redis when several worker processes share one machine (development, load tests)
+Start it with: python manage.py sockets hub --path /tmp/laumeet-hub.sock
+"""
+import json
+import os
+import socket
+import socketserver
+import threading
+
+
+class _HubHandler(socketserver.StreamRequestHandler):
+    """One client connection, newline-delimited JSON requests and replies"""
+
+    def handle(self):
+        for line in self.rfile:
+            request = json.loads(line)
+            op, args = request["op"], request.get("args", [])
+
+            if op == "subscribe":
+                self.server.subscribe(args[0], self)
+                continue
+
+            try:
+                reply = {"result": self.server.execute(op, args)}
+            except Exception as e:
+                reply = {"error": str(e)}
+            self.send(reply)
+
+        self.server.unsubscribe(self)
+
+    def send(self, payload):
+        self.wfile.write(json.dumps(payload).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class LocalHub(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """The hub server: named sets and sorted sets for presence, channels for Socket.IO fan-out"""
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _HubHandler)
+        self.sets = {}
+        self.zsets = {}  # key -> {member: score}, members kept as strings like Redis
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, channel, handler):
+        with self.lock:
+            self.subscribers.setdefault(channel, []).append((handler, threading.Lock()))
+
+    def unsubscribe(self, handler):
+        with self.lock:
+            for channel, handlers in self.subscribers.items():
+                self.subscribers[channel] = [entry for entry in handlers if entry[0] is not handler]
+
+    def execute(self, op, args):
+        if op == "publish":
+            return self.publish(*args)
+
+        with self.lock:
+            if op == "sadd":
+                members = self.sets.setdefault(args[0], set())
+                before = len(members)
+                members.update(args[1:])
+                return len(members) - before
+            if op == "srem":
+                members = self.sets.get(args[0], set())
+                before = len(members)
+                members.difference_update(args[1:])
+                if not members:
+                    self.sets.pop(args[0], None)
+                return before - len(members)
+            if op == "scard":
+                return len(self.sets.get(args[0], ()))
+            if op == "smembers":
+                return list(self.sets.get(args[0], ()))
+            if op == "sismember":
+                return args[1] in self.sets.get(args[0], ())
+            if op == "zadd":
+                scores = self.zsets.setdefault(args[0], {})
+                before = len(scores)
+                scores.update((str(member), float(score)) for member, score in args[1].items())
+                return len(scores) - before
+            if op == "zrem":
+                return self._zrem(args[0], [str(member) for member in args[1:]])
+            if op == "zcard":
+                return len(self.zsets.get(args[0], ()))
+            if op == "zscore":
+                return self.zsets.get(args[0], {}).get(str(args[1]))
+            if op == "zrangebyscore":
+                low, high = float(args[1]), float(args[2])
+                scores = self.zsets.get(args[0], {})
+                return [member for member, score in sorted(scores.items(), key=lambda item: item[1]) if low <= score <= high]
+            if op == "zremrangebyscore":
+                low, high = float(args[1]), float(args[2])
+                scores = self.zsets.get(args[0], {})
+                return self._zrem(args[0], [member for member, score in scores.items() if low <= score <= high])
+            if op == "remove_session":
+                # Same steps as the session registry's Lua script, atomic under the hub lock
+                user_key, online_key, sid, user_id, cutoff = args
+                self._zrem(user_key, [str(sid)])
+                scores = self.zsets.get(user_key, {})
+                self._zrem(user_key, [member for member, score in scores.items() if score <= float(cutoff)])
+                remaining = len(self.zsets.get(user_key, ()))
+                if not remaining:
+                    self._zrem(online_key, [str(user_id)])
+                return remaining
+            if op == "delete":
+                return sum(
+                    (self.sets.pop(key, None) is not None) + (self.zsets.pop(key, None) is not None)
+                    for key in args
+                )
+        raise ValueError(f"Unknown hub operation: {op}")
+
+    def _zrem(self, key, members):
+        """Remove members from a sorted set, dropping it once empty; the caller holds the lock"""
+        scores = self.zsets.get(key, {})
+        removed = sum(scores.pop(member, None) is not None for member in members)
+        if not scores:
+            self.zsets.pop(key, None)
+        return removed
+
+    def publish(self, channel, message):
+        with self.lock:
+            handlers = list(self.subscribers.get(channel, ()))
+        delivered = 0
+        for handler, write_lock in handlers:
+            try:
+                with write_lock:
+                    handler.send({"message": message})
+                delivered += 1
+            except OSError:
+                self.unsubscribe(handler)
+        return delivered
+
+
+class _Pipeline:
+    """Queue set commands and run them in order on execute(), like a (non-transactional) Redis pipeline"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, op):
+        def queue(*args):
+            self.calls.append((op, args))
+            return self
+        return queue
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [getattr(self.client, op)(*args) for op, args in calls]
+
+
+class LocalHubClient:
+    """Client for LocalHub exposing the Redis commands used by the session registry"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        return sock.makefile("rwb")
+
+    def _call(self, op, *args):
+        with self._lock:
+            if self._file is None:
+                self._file = self._connect()
+            try:
+                self._file.write(json.dumps({"op": op, "args": list(args)}).encode("utf-8") + b"\n")
+                self._file.flush()
+                reply = json.loads(self._file.readline())
+            except (OSError, ValueError):
+                self._file = None
+                raise ConnectionError(f"Local hub at {self.path} is unavailable")
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+
+    def publish(self, channel, message):
+        return self._call("publish", channel, message)
+
+    def sadd(self, key, *members):
+        return self._call("sadd", key, *members)
+
+    def srem(self, key, *members):
+        return self._call("srem", key, *members)
+
+    def scard(self, key):
+        return self._call("scard", key)
+
+    def smembers(self, key):
+        return set(self._call("smembers", key))
+
+    def sismember(self, key, member):
+        return self._call("sismember", key, member)
+
+    def zadd(self, key, mapping):
+        return self._call("zadd", key, mapping)
+
+    def zrem(self, key, *members):
+        return self._call("zrem", key, *members)
+
+    def zcard(self, key):
+        return self._call("zcard", key)
+
+    def zscore(self, key, member):
+        return self._call("zscore", key, member)
+
+    def zrangebyscore(self, key, low, high):
+        return self._call("zrangebyscore", key, low, high)
+
+    def zremrangebyscore(self, key, low, high):
+        return self._call("zremrangebyscore", key, low, high)
+
+    def remove_session(self, user_key, online_key, sid, user_id, cutoff):
+        """Atomic socket removal, see RedisSessionBackend"""
+        return self._call("remove_session", user_key, online_key, sid, user_id, cutoff)
+
+    def delete(self, *keys):
+        return self._call("delete", *keys)
+
+    def pipeline(self):
+        return _Pipeline(self)
+
+    def listen(self, channel):
+        """Yield messages published on channel, over a dedicated connection"""
+        stream = self._connect()
+        stream.write(json.dumps({"op": "subscribe", "args": [channel]}).encode("utf-8") + b"\n")
+        stream.flush()
+        for line in stream:
+            yield json.loads(line)["message"]
+
+
+def serve(path):
+    """Run a hub in the foreground until interrupted"""
+    hub = LocalHub(path)
+    print(f"🔧 Local hub listening on {path}")
+    try:
+        hub.serve_forever()
+    finally:
+        hub.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
@@ -0,0 +1,305 @@
+import threading
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import and_, case, delete, exists, func, insert, select
+from sqlalchemy.orm import aliased
+
+from models.core import db
+from models.user import Match, Swipe
+from utils import liked_me
+from utils.cache import TTLCache
+from utils.helpers import dialect_insert, get_redis_client
+from utils.serializers import serialize_user
+
+
+def _load_pending(user_id, liking):
+    """
+    IDs of users who liked user_id and have not been liked back
+    Loaded on user_id's first like after their like on `liking` is committed, so that
+    like does not count as a like back
+    """
+    liked_back = select(Swipe.target_user_id).where(
+        Swipe.user_id == user_id,
+        Swipe.action == "like",
+        Swipe.target_user_id != liking
+    )
+    return db.session.execute(
+        select(Swipe.user_id).where(
+            Swipe.target_user_id == user_id,
+            Swipe.action == "like",
+            Swipe.user_id.not_in(liked_back)
+        )
+    ).scalars().all()
+
+
+class PendingLikes:
+    """Inbound likes waiting for a like back; loaded once the owner swipes"""
+
+    __slots__ = ("ids", "loaded")
+
+    def __init__(self):
+        self.ids = set()
+        self.loaded = False
+
+
+def _liked_back(user_id, target_user_id):
+    """Whether target_user_id has a committed like on user_id (uq_swipes_user_target_like lookup)"""
+    return db.session.execute(
+        select(Swipe.id).where(
+            Swipe.user_id == target_user_id,
+            Swipe.target_user_id == user_id,
+            Swipe.action == "like"
+        )
+    ).first() is not None
+
+
+class MemoryMatchIndexBackend:
+    """
+    In-process reverse index, for a single worker
+    Inbound likes are recorded even for users who are not loaded yet, so a like that
+    lands while the owner's rows are read from the database is never lost
+    With confirm_misses (several workers, each seeing only its own likes) a miss is
+    checked against the swipes table before it is trusted
+    """
+
+    def __init__(self, max_users=20000, ttl_seconds=3600, confirm_misses=False):
+        self._entries = TTLCache(maxsize=max_users, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+        self.confirm_misses = confirm_misses
+
+    def like(self, user_id, target_user_id):
+        with self._lock:
+            entry = self._entry(user_id)
+        if not entry.loaded:
+            pending = _load_pending(user_id, liking=target_user_id)
+            with self._lock:
+                entry.ids.update(pending)
+                entry.loaded = True
+
+        with self._lock:
+            if target_user_id in entry.ids:
+                entry.ids.discard(target_user_id)
+                return True
+        if self.confirm_misses and _liked_back(user_id, target_user_id):
+            return True
+        with self._lock:
+            self._entry(target_user_id).ids.add(user_id)
+            return False
+
+    def forget(self, user_id):
+        self._entries.pop(user_id)
+
+    def _entry(self, user_id):
+        """Get or create a user's entry, the caller holds the lock"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            entry = PendingLikes()
+            self._entries.set(user_id, entry)
+        return entry
+
+
+class RedisMatchIndexBackend:
+    """
+    Reverse index shared by every worker through Redis, one set of pending likers per user
+    The check and the insert run in one transaction, so two users liking each other at
+    the same moment on different workers cannot both miss the match
+    """
+
+    def __init__(self, client, ttl_seconds=3600, prefix="match_index"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def like(self, user_id, target_user_id):
+        pending_key, loaded_key = self._keys(user_id)
+        if not self.client.exists(loaded_key):
+            self._load(user_id, target_user_id)
+
+        target_pending_key, _ = self._keys(target_user_id)
+        pipe = self.client.pipeline()
+        pipe.srem(pending_key, target_user_id)
+        pipe.sadd(target_pending_key, user_id)
+        pipe.expire(target_pending_key, self.ttl_seconds)
+        removed, _, _ = pipe.execute()
+
+        if removed:
+            # Matched: the like just filed for the target is not pending after all
+            self.client.srem(target_pending_key, user_id)
+            return True
+        return False
+
+    def forget(self, user_id):
+        self.client.delete(*self._keys(user_id))
+
+    def _load(self, user_id, liking):
+        pending_key, loaded_key = self._keys(user_id)
+        pending = _load_pending(user_id, liking)
+        pipe = self.client.pipeline()
+        if pending:
+            pipe.sadd(pending_key, *pending)
+        pipe.set(loaded_key, 1)
+        for key in (pending_key, loaded_key):
+            pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+    def _keys(self, user_id):
+        return (
+            f"{self.prefix}:{user_id}:pending",
+            f"{self.prefix}:{user_id}:loaded",
+        )
+
+
+class MatchEngine:
+    """
+    Detects mutual likes on the swipe path
+    A reverse index of pending inbound likes answers "did the target already like me"
+    without querying swipes; a hit writes the match record and pushes a 'match' event
+    to both users' rooms
+    """
+
+    def __init__(self):
+        self.backend = MemoryMatchIndexBackend()
+
+    def init_app(self, app):
+        """
+        Pick the backend from app config (MATCH_INDEX_BACKEND = memory | redis)
+        The memory backend confirms misses in the database when several workers are
+        configured (Socket.IO message queue or a shared session registry)
+        """
+        ttl_seconds = app.config.get('MATCH_INDEX_TTL_SECONDS', 3600)
+        if app.config.get('MATCH_INDEX_BACKEND', 'memory') == 'redis':
+            self.backend = RedisMatchIndexBackend(get_redis_client(app.config['REDIS_URL']), ttl_seconds=ttl_seconds)
+        else:
+            multi_worker = (
+                bool(app.config.get('SOCKETIO_MESSAGE_QUEUE'))
+                or app.config.get('SESSION_REGISTRY_BACKEND', 'memory') != 'memory'
+            )
+            self.backend = MemoryMatchIndexBackend(
+                max_users=app.config.get('MATCH_INDEX_MAX_USERS', 20000),
+                ttl_seconds=ttl_seconds,
+                confirm_misses=multi_worker
+            )
+        app.extensions['match_engine'] = self
+
+    def like(self, user, target_user, at=None):
+        """
+        Apply a committed like, called by the /swipe handler
+        Args:
+            user: User who liked
+            target_user: User who was liked
+            at: Time of the like
+        Returns:
+            matched_at when the like completed a match, otherwise None
+        """
+        if not self.backend.like(user.id, target_user.id):
+            return None
+        matched_at, created = self.record(user.id, target_user.id, at)
+        if created:
+            # Both sides can see the match when both were loaded cold at once, only the insert notifies
+            self.notify(user, target_user, matched_at)
+        return matched_at
+
+    def record(self, user_id, other_user_id, at=None):
+        """
+        Write the match record, keeping the original one if the pair already matched
+        Both liked-me inboxes are cleared too: when the two likes were committed by
+        overlapping transactions, each one filed an inbox row for the other
+        Returns:
+            Tuple of (matched_at, whether this call created the record)
+        """
+        user1_id, user2_id = Match.pair(user_id, other_user_id)
+        matched_at = db.session.execute(
+            dialect_insert(Match)
+            .values(user1_id=user1_id, user2_id=user2_id, matched_at=at or datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=[Match.user1_id, Match.user2_id])
+            .returning(Match.matched_at)
+        ).scalar()
+        liked_me.answered(user_id, other_user_id)
+        liked_me.answered(other_user_id, user_id)
+        db.session.commit()
+        if matched_at is None:
+            return self.matched_at(user_id, other_user_id), False
+        return matched_at, True
+
+    def matched_at(self, user_id, other_user_id):
+        """When two users matched, None if they have not"""
+        user1_id, user2_id = Match.pair(user_id, other_user_id)
+        return db.session.execute(
+            select(Match.matched_at).where(Match.user1_id == user1_id, Match.user2_id == user2_id)
+        ).scalar()
+
+    def notify(self, user, other_user, matched_at):
+        """Push 'match' to both users, each event describing the other side"""
+        socketio = current_app.extensions.get('socketio')
+        if socketio is None:
+            return
+        timestamp = matched_at.isoformat() + "Z"
+        for recipient, matched_with in ((user, other_user), (other_user, user)):
+            socketio.emit("match", {
+                "user": serialize_user(matched_with, "avatar"),
+                "matched_at": timestamp,
+            }, room=f"user_{recipient.id}")
+
+    def unmatch(self, user, other_user):
+        """
+        Remove a match on behalf of user
+        The match record and user's like are deleted; other_user's like stands, so it is
+        back in user's liked-me inbox and a new like from user would match them again
+        Returns:
+            True if the users were matched
+        """
+        user1_id, user2_id = Match.pair(user.id, other_user.id)
+        removed = db.session.execute(
+            delete(Match)
+            .where(Match.user1_id == user1_id, Match.user2_id == user2_id)
+            .returning(Match.user1_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if not removed:
+            return False
+
+        db.session.execute(
+            delete(Swipe)
+            .where(Swipe.user_id == user.id, Swipe.target_user_id == other_user.id, Swipe.action == "like")
+            .execution_options(synchronize_session=False)
+        )
+        liked_me.like_received(user.id, other_user.id)
+        db.session.commit()
+        self.forget(user.id)
+
+        socketio = current_app.extensions.get('socketio')
+        if socketio is not None:
+            socketio.emit("unmatch", {"user_id": user.public_id}, room=f"user_{other_user.id}")
+        return True
+
+    def forget(self, user_id):
+        """Drop cached state for a user (e.g. after their swipes are deleted)"""
+        self.backend.forget(user_id)
+
+
+def backfill(connection):
+    """
+    Write match records for mutual likes that have none, e.g. likes from before the match engine
+    matched_at is the time of the second like
+    Args:
+        connection: Connection or session to run on
+    """
+    liked_back = aliased(Swipe)
+    matched_at = case((Swipe.timestamp > liked_back.timestamp, Swipe.timestamp), else_=liked_back.timestamp)
+    recorded = exists().where(Match.user1_id == Swipe.user_id, Match.user2_id == Swipe.target_user_id)
+
+    mutual = (
+        select(Swipe.user_id, Swipe.target_user_id, func.coalesce(matched_at, func.current_timestamp()))
+        .join(liked_back, and_(
+            liked_back.user_id == Swipe.target_user_id,
+            liked_back.target_user_id == Swipe.user_id,
+            liked_back.action == "like"
+        ))
+        .where(Swipe.action == "like", Swipe.user_id < Swipe.target_user_id, ~recorded)
+    )
+    connection.execute(insert(Match).from_select(["user1_id", "user2_id", "matched_at"], mutual))
+
+
+# Shared engine instance, configured in create_app
+match_engine = MatchEngine()
@@ -0,0 +1,45 @@
+import base64
+from datetime import datetime
+
+
+def encode_cursor(*values):
+    """
+    Encode keyset pagination values (datetimes, ints, strings) into an opaque URL-safe cursor
+    Example: encode_cursor(post.created_at, post.id)
+    """
+    parts = [value.isoformat() if isinstance(value, datetime) else str(value) for value in values]
+    raw = "|".join(parts).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, *types):
+    """
+    Decode a cursor produced by encode_cursor back into typed values
+    Args:
+        cursor: Cursor string from the client
+        types: Expected type of each value (datetime, int or str)
+    Returns:
+        Tuple of values, or None if the cursor is missing or malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|")
+        if len(parts) != len(types):
+            return None
+        return tuple(
+            datetime.fromisoformat(part) if kind is datetime else kind(part)
+            for kind, part in zip(types, parts)
+        )
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def get_limit(args, default=20, maximum=100):
+    """Read a 'limit' query parameter, clamped to 1..maximum"""
+    try:
+        limit = int(args.get("limit", default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
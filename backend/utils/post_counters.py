@@ -0,0 +1,87 @@
+from sqlalchemy import case, delete, func, select, update
+
+from models.core import db
+from models.user import Comment, Like, Post
+from utils.helpers import dialect_insert
+
+
+def _floor_add(column, amount):
+    """column + amount, never below zero"""
+    return case((column + amount > 0, column + amount), else_=0)
+
+
+def adjust(post_id, likes=0, comments=0):
+    """
+    Move a post's denormalized counters
+    Runs inside the caller's transaction, so it commits together with the like or comment
+    """
+    values = {}
+    if likes:
+        values["likes_count"] = _floor_add(Post.likes_count, likes)
+    if comments:
+        values["comments_count"] = _floor_add(Post.comments_count, comments)
+    if values:
+        db.session.execute(
+            update(Post).where(Post.id == post_id).values(values).execution_options(synchronize_session=False)
+        )
+
+
+def toggle_like(post_id, user_id, liked=None):
+    """
+    Like or unlike a post without a read-then-write race
+    The (post_id, user_id) unique index arbitrates concurrent taps: the delete and the
+    conflict-ignoring insert each report whether they changed a row, and only a real
+    change moves likes_count, in the caller's transaction
+    Args:
+        liked: Desired state, None flips the current one
+    Returns:
+        Tuple of (liked, likes_count) after the change
+    """
+    removed = None
+    if liked is not True:
+        removed = db.session.execute(
+            delete(Like)
+            .where(Like.post_id == post_id, Like.user_id == user_id)
+            .returning(Like.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+
+    if removed:
+        delta, liked = -1, False
+    elif liked is False:
+        delta = 0
+    else:
+        added = db.session.execute(
+            dialect_insert(Like)
+            .values(post_id=post_id, user_id=user_id)
+            .on_conflict_do_nothing(index_elements=[Like.post_id, Like.user_id])
+            .returning(Like.id)
+        ).first()
+        delta, liked = (1 if added else 0), True
+
+    if delta:
+        likes_count = db.session.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(likes_count=_floor_add(Post.likes_count, delta))
+            .returning(Post.likes_count)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+    else:
+        likes_count = db.session.execute(select(Post.likes_count).where(Post.id == post_id)).scalar()
+    return liked, likes_count
+
+
+def rebuild(connection, post_ids=None):
+    """
+    Reconciliation job: recompute likes_count and comments_count from the likes and comments tables
+    Args:
+        connection: Connection or session to run on
+        post_ids: Optional list of posts to rebuild, defaults to every post
+    """
+    likes = select(func.count(Like.id)).where(Like.post_id == Post.id).scalar_subquery()
+    comments = select(func.count(Comment.id)).where(Comment.post_id == Post.id).scalar_subquery()
+    statement = update(Post).values(likes_count=likes, comments_count=comments)
+    if post_ids is not None:
+        statement = statement.where(Post.id.in_(post_ids))
+    connection.execute(statement.execution_options(synchronize_session=False))
@@ -0,0 +1,255 @@
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import case, or_, select, update
+
+from models.core import db
+from models.user import User
+from models.chat import Conversation
+from utils.helpers import start_background_task
+from utils.session_registry import session_registry
+
+
+def _status_payload(public_id, username, is_online, last_seen):
+    return {
+        "user_id": public_id,
+        "username": username,
+        "is_online": is_online,
+        "last_seen": last_seen.isoformat() + "Z" if last_seen else None,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+class PresenceBroadcaster:
+    """
+    Batches online/offline changes into one 'presence_digest' per conversation partner
+    Disconnects only count after a grace period, so a reconnecting phone never flaps offline
+    """
+
+    def __init__(self, grace_seconds=10, interval_seconds=2):
+        self.grace_seconds = grace_seconds
+        self.interval_seconds = interval_seconds
+        self._app = None
+        self._lock = threading.Lock()
+        self._changed = {}           # user_id -> latest is_online, waiting for the next digest
+        self._pending_offline = {}   # user_id -> monotonic deadline of the grace period
+        self._running = False
+
+    def init_app(self, app):
+        self.grace_seconds = app.config.get('PRESENCE_OFFLINE_GRACE_SECONDS', 10)
+        self.interval_seconds = app.config.get('PRESENCE_DIGEST_INTERVAL_SECONDS', 2)
+        self._app = app
+        app.extensions['presence'] = self
+
+    def user_connected(self, user_id):
+        """A user's first socket opened, cancels a pending offline instead of announcing twice"""
+        with self._lock:
+            self._pending_offline.pop(user_id, None)
+            self._changed[user_id] = True
+        self._ensure_running()
+
+    def user_disconnected(self, user_id):
+        """A user's last socket closed, announced offline once the grace period passes"""
+        with self._lock:
+            self._pending_offline[user_id] = time.monotonic() + self.grace_seconds
+        self._ensure_running()
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._running or self._app is None:
+                return
+            self._running = True
+        start_background_task(self._app, self._run)
+
+    def _run(self):
+        socketio = self._app.extensions['socketio']
+        while True:
+            socketio.sleep(self.interval_seconds)
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception as e:
+                print(f"❌ Presence digest error: {e}")
+
+    def _collect(self):
+        """Take the changes due now, dropping flaps that ended where partners already are"""
+        now = time.monotonic()
+        with self._lock:
+            for user_id, deadline in list(self._pending_offline.items()):
+                if deadline <= now:
+                    del self._pending_offline[user_id]
+                    self._changed[user_id] = False
+            changes, self._changed = self._changed, {}
+
+        due = {}
+        for user_id, is_online in changes.items():
+            # Another tab, device or worker may still hold a socket
+            if not is_online and session_registry.is_online(user_id):
+                continue
+            # Last announced status lives in the registry backend, so a user who connected
+            # on one worker and disconnected on another is still announced offline
+            if not session_registry.announce(user_id, is_online):
+                continue
+            due[user_id] = is_online
+        return due
+
+    def flush(self):
+        """
+        Send one digest per online partner of every user whose status changed
+        Returns:
+            Number of digests emitted
+        """
+        due = self._collect()
+        if not due:
+            return 0
+
+        user_ids = list(due)
+        users = db.session.execute(
+            select(User.id, User.public_id, User.username, User.last_seen).where(User.id.in_(user_ids))
+        ).all()
+        statuses = {
+            user_id: _status_payload(public_id, username, due[user_id], presence_store.last_seen(user_id, last_seen))
+            for user_id, public_id, username, last_seen in users
+        }
+
+        pairs = db.session.execute(
+            select(Conversation.user1_id, Conversation.user2_id).where(
+                or_(Conversation.user1_id.in_(user_ids), Conversation.user2_id.in_(user_ids))
+            )
+        ).all()
+
+        digests = {}
+        for user1_id, user2_id in pairs:
+            for subject_id, recipient_id in ((user1_id, user2_id), (user2_id, user1_id)):
+                if subject_id in statuses:
+                    digests.setdefault(recipient_id, {})[subject_id] = statuses[subject_id]
+
+        socketio = self._app.extensions['socketio']
+        sent = 0
+        for recipient_id, recipient_statuses in digests.items():
+            if not session_registry.is_online(recipient_id):
+                continue
+            socketio.emit("presence_digest", {"statuses": list(recipient_statuses.values())},
+                          room=f"user_{recipient_id}")
+            sent += 1
+        return sent
+
+
+class PresenceStore:
+    """
+    Live presence, the source of truth for reads
+    Socket handshakes only touch memory, a background flusher persists changes to
+    users.is_online / users.last_seen with one bulk UPDATE every few seconds
+    """
+
+    def __init__(self, interval_seconds=5):
+        self.interval_seconds = interval_seconds
+        self._app = None
+        self._lock = threading.Lock()
+        self._dirty = {}  # user_id -> (is_online, last_seen) not yet written
+        self._running = False
+
+    def init_app(self, app):
+        self.interval_seconds = app.config.get('PRESENCE_FLUSH_INTERVAL_SECONDS', 5)
+        self._app = app
+        app.extensions['presence_store'] = self
+
+    def mark_online(self, user_id):
+        self._record(user_id, True)
+
+    def mark_offline(self, user_id):
+        self._record(user_id, False)
+
+    def _record(self, user_id, is_online):
+        with self._lock:
+            self._dirty[user_id] = (is_online, datetime.utcnow())
+            if self._running or self._app is None:
+                return
+            self._running = True
+        start_background_task(self._app, self._run)
+
+    def is_online(self, user_id):
+        return session_registry.is_online(user_id)
+
+    def online_user_ids(self):
+        return session_registry.online_user_ids()
+
+    def last_seen(self, user_id, stored=None):
+        """Newest last_seen for a user, falling back to the stored column once flushed"""
+        with self._lock:
+            pending = self._dirty.get(user_id)
+        return pending[1] if pending else stored
+
+    def status(self, user):
+        """(is_online, last_seen) for a User row, read from the live store"""
+        return self.is_online(user.id), self.last_seen(user.id, user.last_seen)
+
+    def _run(self):
+        socketio = self._app.extensions['socketio']
+        while True:
+            socketio.sleep(self.interval_seconds)
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception as e:
+                print(f"❌ Presence flush error: {e}")
+
+    def flush(self):
+        """
+        Write pending presence changes with a single UPDATE ... CASE statement
+        Returns:
+            Number of users written
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return 0
+
+        try:
+            db.session.execute(
+                update(User)
+                .where(User.id.in_(list(dirty)))
+                .values(
+                    is_online=case({user_id: state[0] for user_id, state in dirty.items()}, value=User.id),
+                    last_seen=case({user_id: state[1] for user_id, state in dirty.items()}, value=User.id)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Put the batch back unless a newer change for the same user arrived meanwhile
+            with self._lock:
+                for user_id, state in dirty.items():
+                    self._dirty.setdefault(user_id, state)
+            raise
+        return len(dirty)
+
+
+def initial_statuses(user_id):
+    """
+    Status of every conversation partner of user_id, loaded with one joined query
+    Returns:
+        List of user_online_status payloads
+    """
+    partner_id = case(
+        (Conversation.user1_id == user_id, Conversation.user2_id),
+        else_=Conversation.user1_id
+    )
+    rows = db.session.execute(
+        select(User.id, User.public_id, User.username, User.last_seen)
+        .join(Conversation, User.id == partner_id)
+        .where(or_(Conversation.user1_id == user_id, Conversation.user2_id == user_id))
+        .distinct()
+    ).all()
+    return [
+        _status_payload(public_id, username, presence_store.is_online(partner),
+                        presence_store.last_seen(partner, last_seen))
+        for partner, public_id, username, last_seen in rows
+    ]
+
+
+# Shared instances, configured in create_app
+presence = PresenceBroadcaster()
+presence_store = PresenceStore()
@@ -0,0 +1,156 @@
+import math
+import threading
+import time
+from functools import wraps
+
+from flask import request, jsonify
+from flask_socketio import emit
+
+from utils.cache import TTLCache
+from utils.helpers import get_redis_client
+from utils.session_registry import session_registry
+
+
+def _estimate(previous, current, elapsed_fraction):
+    """Sliding-window count: the previous window's hits weighted by how much of it still overlaps"""
+    return previous * (1 - elapsed_fraction) + current
+
+
+class MemoryRateLimitStore:
+    """Per-process counters, three numbers per key, least recently used keys evicted past maxsize"""
+
+    def __init__(self, maxsize=100000):
+        self._counters = TTLCache(maxsize=maxsize, ttl=3600)
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window_seconds, now):
+        window = int(now // window_seconds)
+        elapsed_fraction = (now % window_seconds) / window_seconds
+        with self._lock:
+            start, current, previous = self._counters.get(key) or (window, 0, 0)
+            if window != start:
+                previous = current if window == start + 1 else 0
+                current = 0
+            allowed = _estimate(previous, current, elapsed_fraction) < limit
+            if allowed:
+                current += 1
+            # Entries outlive the window they may still be weighed against
+            self._counters.set(key, (window, current, previous), ttl=2 * window_seconds)
+        return allowed
+
+
+class RedisRateLimitStore:
+    """Counters shared by every worker, one expiring integer per key and window"""
+
+    def __init__(self, client, prefix="rate_limit"):
+        self.client = client
+        self.prefix = prefix
+
+    def hit(self, key, limit, window_seconds, now):
+        window = int(now // window_seconds)
+        elapsed_fraction = (now % window_seconds) / window_seconds
+        current_key = f"{self.prefix}:{key}:{window}"
+
+        pipe = self.client.pipeline()
+        pipe.incr(current_key)
+        pipe.expire(current_key, 2 * window_seconds)
+        pipe.get(f"{self.prefix}:{key}:{window - 1}")
+        current, _, previous = pipe.execute()
+
+        # The increment counted this attempt, undo it when it is over the limit
+        if _estimate(int(previous or 0), current - 1, elapsed_fraction) >= limit:
+            self.client.decr(current_key)
+            return False
+        return True
+
+
+class RateLimiter:
+    """
+    Sliding-window counter rate limiting in O(1) memory per key
+    Shared by HTTP routes (rate_limit) and socket events (socket_rate_limit)
+    """
+
+    def __init__(self):
+        self.store = MemoryRateLimitStore()
+
+    def init_app(self, app):
+        """Pick the counter store from app config (RATE_LIMIT_BACKEND = memory | redis)"""
+        if app.config.get('RATE_LIMIT_BACKEND', 'memory') == 'redis':
+            self.store = RedisRateLimitStore(get_redis_client(app.config['REDIS_URL']))
+        else:
+            self.store = MemoryRateLimitStore(maxsize=app.config.get('RATE_LIMIT_MAX_KEYS', 100000))
+        app.extensions['rate_limiter'] = self
+
+    def hit(self, key, limit, window_seconds):
+        """
+        Count one attempt for key
+        Returns:
+            True if the attempt is allowed, False if key is over limit in the sliding window
+        """
+        return self.store.hit(key, limit, window_seconds, time.time())
+
+
+def _request_key():
+    """Client IP, plus the username when the body is JSON (login and password reset forms)"""
+    ip = request.remote_addr
+    data = request.get_json(silent=True) if request.is_json else None
+    username = data.get('username') if isinstance(data, dict) else None
+    return f"{ip}:{username}" if username else ip
+
+
+def rate_limit(max_attempts=5, window_seconds=300, key_func=None):
+    """
+    Decorator function to implement rate limiting on routes
+    Args:
+        max_attempts: Maximum number of allowed attempts within time window
+        window_seconds: Time window in seconds for counting attempts
+        key_func: Optional callable returning the client key (defaults to IP + username)
+    Returns:
+        Decorator function that applies rate limiting
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Each route counts separately
+            key = f"{f.__name__}:{(key_func or _request_key)()}"
+            if not rate_limiter.hit(key, max_attempts, window_seconds):
+                return jsonify({
+                    "success": False,
+                    "message": f"Too many attempts. Please try again in {math.ceil(window_seconds / 60)} minutes."
+                }), 429  # HTTP 429 Too Many Requests
+
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
+def socket_rate_limit(max_events, window_seconds, notify=True):
+    """
+    Decorator for Socket.IO handlers, limits events per user (per socket before authentication)
+    Args:
+        max_events: Events allowed within the window
+        window_seconds: Window length in seconds
+        notify: Emit an 'error' event back to the sender when an event is dropped
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            session = session_registry.get(request.sid)
+            client = f"user:{session['user_id']}" if session else f"sid:{request.sid}"
+            if not rate_limiter.hit(f"socket:{f.__name__}:{client}", max_events, window_seconds):
+                if notify:
+                    emit("error", {"message": "You're doing that too fast. Please slow down."})
+                return None
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
+# Shared limiter instance, configured in create_app
+rate_limiter = RateLimiter()
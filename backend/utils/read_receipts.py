@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import update
+
+from models.core import db
+from models.chat import Message
+from utils import unread_counters
+
+
+class ReadReceipt:
+    """Result of one bulk mark-read: which messages flipped and the conversation's new high-water mark"""
+
+    def __init__(self, conversation_id, reader_public_id, message_ids, read_at, explicit_ids=False):
+        self.conversation_id = conversation_id
+        self.reader_public_id = reader_public_id
+        self.message_ids = sorted(message_ids)
+        self.read_at = read_at
+        self.explicit_ids = explicit_ids
+
+    @property
+    def count(self):
+        return len(self.message_ids)
+
+    @property
+    def up_to_id(self):
+        return self.message_ids[-1] if self.message_ids else None
+
+    def to_event(self):
+        """Payload for the coalesced 'messages_read' socket event"""
+        payload = {
+            "conversation_id": self.conversation_id,
+            "reader_id": self.reader_public_id,
+            "up_to_id": self.up_to_id,
+            "count": self.count,
+            "read_at": self.read_at.isoformat() + "Z"
+        }
+        # Only a hand-picked set of IDs needs listing, otherwise everything up to the mark is read
+        if self.explicit_ids:
+            payload["message_ids"] = self.message_ids
+        return payload
+
+
+def mark_read(conversation_id, reader_id, reader_public_id, up_to_id=None, message_ids=None):
+    """
+    Mark the other participant's unread messages as read with one UPDATE ... RETURNING id
+    Args:
+        conversation_id: Conversation being read
+        reader_id: Internal ID of the user reading
+        reader_public_id: Public ID of the reader, sent to clients
+        up_to_id: Only mark messages with id <= up_to_id
+        message_ids: Only mark these messages
+    Returns:
+        ReadReceipt (possibly empty). Unread counters are updated, the caller commits.
+    """
+    read_at = datetime.utcnow()
+    statement = (
+        update(Message)
+        .where(
+            Message.conversation_id == conversation_id,
+            Message.sender_id != reader_id,
+            Message.is_read == False
+        )
+        .values(is_read=True, read_at=read_at)
+        .returning(Message.id)
+        .execution_options(synchronize_session=False)
+    )
+    if up_to_id is not None:
+        statement = statement.where(Message.id <= up_to_id)
+    if message_ids:
+        statement = statement.where(Message.id.in_(message_ids))
+
+    marked_ids = db.session.execute(statement).scalars().all()
+    unread_counters.mark_read(reader_id, conversation_id, len(marked_ids))
+
+    return ReadReceipt(conversation_id, reader_public_id, marked_ids, read_at, explicit_ids=bool(message_ids))
+
+
+def broadcast(receipt):
+    """Send one 'messages_read' event to the conversation room (no-op for empty receipts)"""
+    if not receipt.count:
+        return
+    socketio = current_app.extensions.get('socketio')
+    if socketio is not None:
+        socketio.emit("messages_read", receipt.to_event(), room=f"conversation_{receipt.conversation_id}")
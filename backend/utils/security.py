@@ -1,54 +1,8 @@
-import time
-from functools import wraps
-from flask import request, jsonify
+from flask import jsonify, g
 from flask_jwt_extended import get_jwt_identity
 from models.user import User
 from models.chat import Conversation
-
-# Rate limiting storage
-reset_attempts = {}
-
-
-def rate_limit(max_attempts=5, window_seconds=300):
-    """
-    Decorator function to implement rate limiting on routes
-    Args:
-        max_attempts: Maximum number of allowed attempts within time window
-        window_seconds: Time window in seconds for counting attempts
-    Returns:
-        Decorator function that applies rate limiting
-    """
-
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            # Get client IP address and username from request
-            ip = request.remote_addr
-            username = request.json.get('username') if request.json else None
-            # Create unique key for rate limiting (IP + username if available)
-            key = f"{ip}:{username}" if username else ip
-
-            now = time.time()  # Current timestamp
-
-            # Clean old attempts: remove attempts older than the time window
-            reset_attempts[key] = [t for t in reset_attempts.get(key, []) if now - t < window_seconds]
-
-            # Check if user has exceeded the maximum allowed attempts
-            if len(reset_attempts.get(key, [])) >= max_attempts:
-                return jsonify({
-                    "success": False,
-                    "message": f"Too many attempts. Please try again in {window_seconds // 60} minutes."
-                }), 429  # HTTP 429 Too Many Requests
-
-            # Add current attempt timestamp to the list
-            reset_attempts.setdefault(key, []).append(now)
-
-            # Proceed with the original function if rate limit not exceeded
-            return f(*args, **kwargs)
-
-        return decorated_function
-
-    return decorator
+from utils.rate_limit import rate_limit  # noqa: F401 - routes import it from here
 
 
 def validate_conversation_access(conversation_id, user_id):
@@ -66,13 +20,29 @@ def validate_conversation_access(conversation_id, user_id):
     return True, conversation, None
 
 
+def load_identity(public_id):
+    """
+    Resolve a JWT's user once per request, cached on g
+    Revocation is answered separately from memory (see utils.token_revocations)
+    Returns:
+        User or None
+    """
+    cached = g.get('_identity')
+    if cached is not None and cached[0] == public_id:
+        return cached[1]
+
+    user = User.query.filter_by(public_id=public_id).first()
+    g._identity = (public_id, user)
+    return user
+
+
 def get_current_user_from_jwt():
     """
     Extract current user from JWT token
+    Served from the request cache filled while the JWT was verified
     Returns (user, error_response, status_code)
     """
-    public_id = get_jwt_identity()
-    user = User.query.filter_by(public_id=public_id).first()
+    user = load_identity(get_jwt_identity())
 
     if not user:
         return None, jsonify({"success": False, "message": "User not found"}), 404
@@ -80,16 +50,16 @@ def get_current_user_from_jwt():
     return user, None, None
 
 
-def get_authenticated_user_from_socket(online_users, flask_request):
+def get_authenticated_user_from_socket(session_registry, flask_request):
     """
     Extract authenticated user from socket connection
     Returns (user_id, user_data, error_message)
     """
     try:
-        for uid, user_data in online_users.items():
-            if user_data['sid'] == flask_request.sid:
-                return uid, user_data, None
-        return None, None, "User not authenticated"
+        user_data = session_registry.get(flask_request.sid)
+        if user_data is None:
+            return None, None, "User not authenticated"
+        return user_data['user_id'], user_data, None
     except Exception as e:
         return None, None, f"Authentication error: {str(e)}"
 
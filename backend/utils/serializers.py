@@ -0,0 +1,161 @@
+import json
+import time
+
+from flask import request
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from models.user import User
+from utils.helpers import build_image_url
+from utils.presence import presence_store
+from utils.thumbnails import image_sizes
+
+
+def _first_picture(user):
+    return user.pictures[0].image if user.pictures else None
+
+
+def _timestamp(value):
+    return value.isoformat() + "Z" if value else None
+
+
+# Output field -> (columns it reads, value getter); None in columns means the pictures relationship
+USER_FIELDS = {
+    "id": ((User.public_id,), lambda user: user.public_id),
+    "username": ((User.username,), lambda user: user.username),
+    "name": ((User.name,), lambda user: user.name),
+    "age": ((User.age,), lambda user: str(user.age)),
+    "gender": ((User.gender,), lambda user: user.gender),
+    "department": ((User.department,), lambda user: user.department),
+    "genotype": ((User.genotype,), lambda user: user.genotype),
+    "level": ((User.level,), lambda user: user.level),
+    "interestedIn": ((User.interested_in,), lambda user: user.interested_in),
+    "religious": ((User.religious,), lambda user: user.religious),
+    "isAnonymous": ((User.is_anonymous,), lambda user: user.is_anonymous),
+    "category": ((User.category,), lambda user: user.category),
+    "bio": ((User.bio,), lambda user: user.bio),
+    "is_admin": ((User.is_admin,), lambda user: user.is_admin),
+    "isOnline": ((), lambda user: presence_store.is_online(user.id)),
+    "lastSeen": ((User.last_seen,), lambda user: _timestamp(presence_store.last_seen(user.id, user.last_seen))),
+    "avatar": ((None,), lambda user: build_image_url(_first_picture(user))),
+    "avatarSizes": ((None,), lambda user: image_sizes(_first_picture(user))),
+    "pictures": ((None,), lambda user: [build_image_url(picture.image) for picture in user.pictures]),
+    "pictureSizes": ((None,), lambda user: [image_sizes(picture.image) for picture in user.pictures]),
+    "timestamp": ((User.timestamp,), lambda user: _timestamp(user.timestamp)),
+    "security_question": ((User.security_question,), lambda user: user.security_question),
+}
+
+_FULL = (
+    "id", "username", "name", "age", "gender", "department", "genotype", "level", "interestedIn",
+    "religious", "isAnonymous", "category", "bio", "is_admin", "isOnline", "lastSeen", "pictures",
+    "pictureSizes", "timestamp",
+)
+
+# Named projections, each one the most a caller of that kind may see
+USER_PROJECTIONS = {
+    # Post/comment authors and other list rows
+    "avatar": ("id", "username", "name", "department", "avatar", "avatarSizes"),
+    # Explore deck and liked-me cards
+    "card": (
+        "id", "username", "name", "age", "gender", "department", "genotype", "level", "interestedIn",
+        "religious", "isAnonymous", "category", "bio", "pictures", "pictureSizes",
+    ),
+    # The user's own profile, signup and login
+    "full": _FULL,
+    "admin": _FULL + ("security_question",),
+}
+
+
+def projection_fields(projection="full", fields=None):
+    """
+    Fields a serializer emits
+    Args:
+        projection: Name in USER_PROJECTIONS
+        fields: Optional subset requested by the client, names outside the projection are ignored
+    Returns:
+        Tuple of field names in projection order
+    """
+    allowed = USER_PROJECTIONS[projection]
+    if not fields:
+        return allowed
+    return tuple(name for name in allowed if name in fields)
+
+
+def requested_fields():
+    """Parse the ?fields=a,b,c query parameter, None when absent"""
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+def user_load_options(projection="full", fields=None, relationship=None):
+    """
+    Loader options that fetch only the columns a projection reads
+    Args:
+        projection: Name in USER_PROJECTIONS
+        fields: Optional client field subset, see projection_fields
+        relationship: Relationship to User when users are loaded through another entity (e.g. Post.user)
+    Returns:
+        List of options for Query.options / select().options
+    """
+    columns = {User.id}
+    with_pictures = False
+    for name in projection_fields(projection, fields):
+        for column in USER_FIELDS[name][0]:
+            if column is None:
+                with_pictures = True
+            else:
+                columns.add(column)
+
+    if relationship is None:
+        options = [load_only(*columns)]
+        if with_pictures:
+            options.append(selectinload(User.pictures))
+    else:
+        options = [joinedload(relationship).load_only(*columns)]
+        if with_pictures:
+            options.append(joinedload(relationship).selectinload(User.pictures))
+    return options
+
+
+def serialize_user(user, projection="full", fields=None):
+    """
+    Convert a User to a dictionary for JSON responses
+    Args:
+        user: User instance, ideally loaded with user_load_options for the same projection
+        projection: Name in USER_PROJECTIONS
+        fields: Optional client field subset
+    Returns:
+        Dictionary with the projection's fields
+    """
+    return {name: USER_FIELDS[name][1](user) for name in projection_fields(projection, fields)}
+
+
+def benchmark_projections(limit=200, repeat=5):
+    """
+    Load and serialize the same users with every projection
+    Returns:
+        List of dicts: projection, users, bytes_per_user, ms_per_user (query + serialization)
+    """
+    from models.core import db
+
+    results = []
+    user_ids = db.session.execute(db.select(User.id).order_by(User.id).limit(limit)).scalars().all()
+    for projection in USER_PROJECTIONS:
+        elapsed = 0.0
+        payload = b""
+        for _ in range(repeat):
+            db.session.expunge_all()  # Every run loads from the database
+            start = time.perf_counter()
+            users = User.query.options(*user_load_options(projection)).filter(User.id.in_(user_ids)).all()
+            payload = json.dumps([serialize_user(user, projection) for user in users]).encode("utf-8")
+            elapsed += time.perf_counter() - start
+
+        count = max(len(user_ids), 1)
+        results.append({
+            "projection": projection,
+            "users": len(user_ids),
+            "bytes_per_user": len(payload) / count,
+            "ms_per_user": elapsed / repeat / count * 1000,
+        })
+    return results
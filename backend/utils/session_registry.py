@@ -0,0 +1,274 @@
+import threading
+import time
+
+from utils.helpers import get_redis_client, start_background_task
+from utils.local_hub import LocalHubClient
+
+
+class MemorySessionBackend:
+    """
+    Presence for a single server process: user_id -> set of socket IDs
+    Users are spread over lock-striped shards so connects for different users do not contend
+    """
+
+    def __init__(self, shards=16):
+        self._shards = [(threading.Lock(), {}) for _ in range(shards)]
+        self._announced_lock = threading.Lock()
+        self._announced = set()
+
+    def _shard(self, user_id):
+        return self._shards[hash(user_id) % len(self._shards)]
+
+    def add(self, user_id, sid):
+        """Register a socket, returns how many sockets the user now has"""
+        lock, users = self._shard(user_id)
+        with lock:
+            sids = users.setdefault(user_id, set())
+            sids.add(sid)
+            return len(sids)
+
+    def remove(self, user_id, sid):
+        """Unregister a socket, returns how many sockets the user has left"""
+        lock, users = self._shard(user_id)
+        with lock:
+            sids = users.get(user_id)
+            if sids is None:
+                return 0
+            sids.discard(sid)
+            if not sids:
+                del users[user_id]
+            return len(sids)
+
+    def sids(self, user_id):
+        lock, users = self._shard(user_id)
+        with lock:
+            return set(users.get(user_id, ()))
+
+    def is_online(self, user_id):
+        lock, users = self._shard(user_id)
+        with lock:
+            return user_id in users
+
+    def heartbeat(self, sids_by_user):
+        """Nothing to refresh, sockets live and die with this process"""
+
+    def announce(self, user_id, is_online):
+        """Record the status partners were told, returns False if it was already announced"""
+        with self._announced_lock:
+            if is_online == (user_id in self._announced):
+                return False
+            if is_online:
+                self._announced.add(user_id)
+            else:
+                self._announced.discard(user_id)
+            return True
+
+    def online_user_ids(self):
+        online = set()
+        for lock, users in self._shards:
+            with lock:
+                online.update(users)
+        return online
+
+
+# Drop one socket and, if it was the user's last live one, the user from the online set,
+# in one step so a connect on another process cannot land in between
+_REMOVE_SCRIPT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[3])
+local remaining = redis.call('ZCARD', KEYS[1])
+if remaining == 0 then
+    redis.call('ZREM', KEYS[2], ARGV[2])
+end
+return remaining
+"""
+
+
+class RedisSessionBackend:
+    """
+    Presence shared by every server process through Redis
+    Each user has a sorted set of socket IDs scored by their last heartbeat, and a global
+    sorted set holds the users with at least one socket; entries older than ttl_seconds
+    (sockets of a process that died) are ignored by reads and pruned on writes
+    """
+
+    def __init__(self, client, prefix="sessions", ttl_seconds=90):
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.online_key = f"{prefix}:online"
+        self.announced_key = f"{prefix}:announced"
+
+    def _user_key(self, user_id):
+        return f"{self.prefix}:user:{user_id}"
+
+    def _cutoff(self):
+        return time.time() - self.ttl_seconds
+
+    def add(self, user_id, sid):
+        key = self._user_key(user_id)
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(key, "-inf", now - self.ttl_seconds)
+        pipe.zadd(key, {sid: now})
+        pipe.zadd(self.online_key, {user_id: now})
+        pipe.zcard(key)
+        return pipe.execute()[-1]
+
+    def remove(self, user_id, sid):
+        return self._remove(self._user_key(user_id), sid, user_id, self._cutoff())
+
+    def _remove(self, key, sid, user_id, cutoff):
+        return self.client.eval(_REMOVE_SCRIPT, 2, key, self.online_key, sid, user_id, cutoff)
+
+    def heartbeat(self, sids_by_user):
+        """Refresh the sockets held by this process, and expire users nobody refreshed"""
+        now = time.time()
+        pipe = self.client.pipeline()
+        for user_id, sids in sids_by_user.items():
+            pipe.zadd(self._user_key(user_id), {sid: now for sid in sids})
+            pipe.zadd(self.online_key, {user_id: now})
+        pipe.zremrangebyscore(self.online_key, "-inf", now - self.ttl_seconds)
+        pipe.execute()
+
+    def announce(self, user_id, is_online):
+        """SADD / SREM report whether the set changed, so exactly one process announces each change"""
+        if is_online:
+            return bool(self.client.sadd(self.announced_key, user_id))
+        return bool(self.client.srem(self.announced_key, user_id))
+
+    def sids(self, user_id):
+        sids = self.client.zrangebyscore(self._user_key(user_id), self._cutoff(), "+inf")
+        return {sid.decode() if isinstance(sid, bytes) else sid for sid in sids}
+
+    def is_online(self, user_id):
+        seen = self.client.zscore(self.online_key, user_id)
+        return seen is not None and seen >= self._cutoff()
+
+    def online_user_ids(self):
+        return {int(user_id) for user_id in self.client.zrangebyscore(self.online_key, self._cutoff(), "+inf")}
+
+
+class LocalHubSessionBackend(RedisSessionBackend):
+    """Redis layout served by the local hub, which runs the atomic removal natively instead of Lua"""
+
+    def _remove(self, key, sid, user_id, cutoff):
+        return self.client.remove_session(key, self.online_key, sid, user_id, cutoff)
+
+
+class SessionRegistry:
+    """
+    Socket session lookups in O(1): sid -> session for the events handled by this process,
+    user -> set of sids (any process, via the backend) for presence and multi-tab users
+    """
+
+    def __init__(self, shards=16):
+        self._sessions = [(threading.Lock(), {}) for _ in range(shards)]
+        self.backend = MemorySessionBackend(shards)
+        self.heartbeat_seconds = 30
+        self._app = None
+        self._lock = threading.Lock()
+        self._running = False
+
+    def init_app(self, app):
+        """Pick the presence backend from app config (SESSION_REGISTRY_BACKEND = memory | redis | local)"""
+        shards = app.config.get('SESSION_REGISTRY_SHARDS', 16)
+        self._sessions = [(threading.Lock(), {}) for _ in range(shards)]
+        self.heartbeat_seconds = app.config.get('SESSION_HEARTBEAT_SECONDS', 30)
+        ttl_seconds = app.config.get('SESSION_TTL_SECONDS', 90)
+        backend = app.config.get('SESSION_REGISTRY_BACKEND', 'memory')
+        if backend == 'redis':
+            self.backend = RedisSessionBackend(get_redis_client(app.config['REDIS_URL']), ttl_seconds=ttl_seconds)
+        elif backend == 'local':
+            # Same sorted set commands as Redis, served by the local hub
+            self.backend = LocalHubSessionBackend(LocalHubClient(app.config['LOCAL_HUB_PATH']), ttl_seconds=ttl_seconds)
+        else:
+            self.backend = MemorySessionBackend(shards)
+        self._app = app
+        app.extensions['session_registry'] = self
+
+    def _shard(self, sid):
+        return self._sessions[hash(sid) % len(self._sessions)]
+
+    def connect(self, sid, user_id, public_id, username):
+        """
+        Register an authenticated socket
+        Returns:
+            True if this is the user's first open socket (they just came online)
+        """
+        session = {"sid": sid, "user_id": user_id, "public_id": public_id, "username": username}
+        lock, sessions = self._shard(sid)
+        with lock:
+            sessions[sid] = session
+        self._ensure_heartbeat()
+        return self.backend.add(user_id, sid) == 1
+
+    def disconnect(self, sid):
+        """
+        Forget a socket
+        Returns:
+            Tuple of (session or None if unknown, True if it was the user's last open socket)
+        """
+        lock, sessions = self._shard(sid)
+        with lock:
+            session = sessions.pop(sid, None)
+        if session is None:
+            return None, False
+        return session, self.backend.remove(session["user_id"], sid) == 0
+
+    def get(self, sid):
+        """Session dict (sid, user_id, public_id, username) for a socket, or None"""
+        lock, sessions = self._shard(sid)
+        with lock:
+            return sessions.get(sid)
+
+    def sids(self, user_id):
+        """All open sockets of a user (several tabs or devices)"""
+        return self.backend.sids(user_id)
+
+    def is_online(self, user_id):
+        return self.backend.is_online(user_id)
+
+    def announce(self, user_id, is_online):
+        """
+        Record the status broadcast to a user's partners, shared by every process using the backend
+        Returns:
+            True if it differs from the last announced status (the caller should broadcast it)
+        """
+        return self.backend.announce(user_id, is_online)
+
+    def online_user_ids(self):
+        return self.backend.online_user_ids()
+
+    def heartbeat(self):
+        """Tell the shared backend this process's sockets are still alive"""
+        sids_by_user = {}
+        for lock, sessions in self._sessions:
+            with lock:
+                for sid, session in sessions.items():
+                    sids_by_user.setdefault(session["user_id"], []).append(sid)
+        self.backend.heartbeat(sids_by_user)
+
+    def _ensure_heartbeat(self):
+        with self._lock:
+            if self._running or self._app is None or isinstance(self.backend, MemorySessionBackend):
+                return
+            self._running = True
+        start_background_task(self._app, self._run)
+
+    def _run(self):
+        socketio = self._app.extensions['socketio']
+        while True:
+            socketio.sleep(self.heartbeat_seconds)
+            try:
+                self.heartbeat()
+            except Exception as e:
+                print(f"❌ Session heartbeat error: {e}")
+
+    def __len__(self):
+        """Number of sockets handled by this process"""
+        return sum(len(sessions) for _, sessions in self._sessions)
+
+
+# Shared registry instance, configured in create_app
+session_registry = SessionRegistry()
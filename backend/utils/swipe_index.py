@@ -0,0 +1,206 @@
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, and_
+
+from models.core import db
+from models.user import Swipe
+from utils.cache import TTLCache
+from utils.helpers import get_redis_client
+
+# Passed users come back to explore after this many seconds
+PASS_RESHOW_SECONDS = 2 * 60 * 60
+
+
+def _epoch(dt):
+    """Convert a naive UTC datetime to epoch seconds"""
+    if dt is None:
+        return time.time()
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+class UserExclusions:
+    """
+    Exclusion state for one swiper
+    Likes are kept forever, passes are grouped into time buckets that expire as a whole
+    """
+
+    def __init__(self, bucket_seconds):
+        self.bucket_seconds = bucket_seconds
+        self.liked = set()
+        self.pass_buckets = {}  # bucket number -> set of user ids
+        self.lock = threading.Lock()
+
+    def add(self, target_user_id, action, at):
+        with self.lock:
+            if action == "like":
+                self.liked.add(target_user_id)
+            elif action == "pass":
+                bucket = int(at // self.bucket_seconds)
+                self.pass_buckets.setdefault(bucket, set()).add(target_user_id)
+
+    def excluded(self, candidate_ids, now):
+        """Return the candidates hidden by a like or by a pass still inside the reshow window"""
+        oldest_live_bucket = int((now - PASS_RESHOW_SECONDS) // self.bucket_seconds)
+        with self.lock:
+            for bucket in [b for b in self.pass_buckets if b < oldest_live_bucket]:
+                del self.pass_buckets[bucket]
+            passes = list(self.pass_buckets.values())
+
+            return {
+                candidate_id for candidate_id in candidate_ids
+                if candidate_id in self.liked or any(candidate_id in passed for passed in passes)
+            }
+
+
+class MemorySwipeIndexBackend:
+    """In-process exclusion index, one bounded entry per recently active swiper"""
+
+    def __init__(self, max_users=20000, ttl_seconds=3600, bucket_seconds=600):
+        self.bucket_seconds = bucket_seconds
+        self._entries = TTLCache(maxsize=max_users, ttl=ttl_seconds)
+        self._load_lock = threading.Lock()
+
+    def excluded(self, user_id, candidate_ids, now):
+        return self._entry(user_id).excluded(candidate_ids, now)
+
+    def record(self, user_id, target_user_id, action, at):
+        # Only update loaded entries, anything else is read fresh from the database on first use
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            entry.add(target_user_id, action, at)
+
+    def forget(self, user_id):
+        self._entries.pop(user_id)
+
+    def _entry(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            return entry
+
+        with self._load_lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                entry = UserExclusions(self.bucket_seconds)
+                for target_user_id, action, at in _load_swipes(user_id):
+                    entry.add(target_user_id, action, at)
+                self._entries.set(user_id, entry)
+            return entry
+
+
+class RedisSwipeIndexBackend:
+    """
+    Exclusion index shared by every worker through Redis
+    Likes live in a set, passes in a sorted set scored by swipe time
+    """
+
+    def __init__(self, client, ttl_seconds=3600, prefix="swipe_index"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def excluded(self, user_id, candidate_ids, now):
+        liked_key, passed_key, loaded_key = self._keys(user_id)
+        if not self.client.exists(loaded_key):
+            self._load(user_id)
+
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(passed_key, "-inf", now - PASS_RESHOW_SECONDS)
+        pipe.smismember(liked_key, candidate_ids)
+        pipe.zmscore(passed_key, candidate_ids)
+        _, liked_flags, pass_scores = pipe.execute()
+
+        return {
+            candidate_id
+            for candidate_id, liked, passed_at in zip(candidate_ids, liked_flags, pass_scores)
+            if liked or passed_at is not None
+        }
+
+    def record(self, user_id, target_user_id, action, at):
+        liked_key, passed_key, loaded_key = self._keys(user_id)
+        if not self.client.exists(loaded_key):
+            return
+
+        if action == "like":
+            self.client.sadd(liked_key, target_user_id)
+        elif action == "pass":
+            self.client.zadd(passed_key, {target_user_id: at})
+
+    def forget(self, user_id):
+        self.client.delete(*self._keys(user_id))
+
+    def _load(self, user_id):
+        liked_key, passed_key, loaded_key = self._keys(user_id)
+        pipe = self.client.pipeline()
+        pipe.delete(liked_key, passed_key)
+        for target_user_id, action, at in _load_swipes(user_id):
+            if action == "like":
+                pipe.sadd(liked_key, target_user_id)
+            elif action == "pass":
+                pipe.zadd(passed_key, {target_user_id: at})
+        pipe.set(loaded_key, 1)
+        for key in (liked_key, passed_key, loaded_key):
+            pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+    def _keys(self, user_id):
+        return (
+            f"{self.prefix}:{user_id}:liked",
+            f"{self.prefix}:{user_id}:passed",
+            f"{self.prefix}:{user_id}:loaded",
+        )
+
+
+def _load_swipes(user_id):
+    """Yield (target_user_id, action, epoch_seconds) for every like and every pass still in the reshow window"""
+    pass_cutoff = datetime.utcnow() - timedelta(seconds=PASS_RESHOW_SECONDS)
+    rows = db.session.query(Swipe.target_user_id, Swipe.action, Swipe.timestamp).filter(
+        Swipe.user_id == user_id,
+        or_(
+            Swipe.action == "like",
+            and_(Swipe.action == "pass", Swipe.timestamp > pass_cutoff)
+        )
+    ).all()
+    for target_user_id, action, timestamp in rows:
+        yield target_user_id, action, _epoch(timestamp)
+
+
+class SwipeExclusionIndex:
+    """
+    Answers "which of these candidates should this user not see" without sending
+    the user's whole swipe history back to the database as a NOT IN list
+    """
+
+    def __init__(self):
+        self.backend = MemorySwipeIndexBackend()
+
+    def init_app(self, app):
+        """Pick the backend from app config (SWIPE_INDEX_BACKEND = memory | redis)"""
+        ttl_seconds = app.config.get('SWIPE_INDEX_TTL_SECONDS', 3600)
+        if app.config.get('SWIPE_INDEX_BACKEND', 'memory') == 'redis':
+            self.backend = RedisSwipeIndexBackend(get_redis_client(app.config['REDIS_URL']), ttl_seconds=ttl_seconds)
+        else:
+            self.backend = MemorySwipeIndexBackend(
+                max_users=app.config.get('SWIPE_INDEX_MAX_USERS', 20000),
+                ttl_seconds=ttl_seconds
+            )
+        app.extensions['swipe_index'] = self
+
+    def excluded(self, user_id, candidate_ids):
+        """Return the subset of candidate_ids hidden from user_id (liked, or passed within 2 hours)"""
+        if not candidate_ids:
+            return set()
+        return self.backend.excluded(user_id, list(candidate_ids), time.time())
+
+    def record(self, user_id, target_user_id, action, at=None):
+        """Apply a new swipe to the index, called by the /swipe handler after commit"""
+        self.backend.record(user_id, target_user_id, action, _epoch(at))
+
+    def forget(self, user_id):
+        """Drop cached state for a user (e.g. after their swipes are deleted)"""
+        self.backend.forget(user_id)
+
+
+# Shared index instance, configured in create_app
+swipe_index = SwipeExclusionIndex()
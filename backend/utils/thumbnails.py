@@ -0,0 +1,223 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+from sqlalchemy import select
+
+from models.core import db
+from utils.blob_store import blob_store, decode_data_uri
+from utils.cache import TTLCache
+from utils.helpers import build_image_url
+
+# Output formats: file extension -> (Pillow format, content type)
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpg": ("JPEG", "image/jpeg"),
+}
+
+
+def variant_key(key, size, extension):
+    """Blob key of one derivative: blobs/ab/cd/<sha256>_<size>.<ext> next to the original"""
+    return f"{key.rsplit('.', 1)[0]}_{size}.{extension}"
+
+
+def render_thumbnails(raw, sizes, extensions, quality=80):
+    """
+    Decode an image once and encode every size in every format
+    Sizes bound the longest side, images are never upscaled
+    Yields:
+        Tuples of (size, extension, encoded bytes, content type)
+    """
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(raw)))
+    image = image.convert("RGB")
+
+    # Largest first, each smaller size is resized from the previous one
+    for size in sorted(sizes, reverse=True):
+        image.thumbnail((size, size), Image.LANCZOS)
+        for extension in extensions:
+            pillow_format, content_type = THUMBNAIL_FORMATS[extension]
+            output = io.BytesIO()
+            image.save(output, format=pillow_format, quality=quality)
+            yield size, extension, output.getvalue(), content_type
+
+
+def _off_event_loop(fn, *args):
+    """
+    Run CPU-bound work on a real OS thread when eventlet or gevent patched threading
+    Under monkey patching the pool's workers are green threads, so Pillow would otherwise
+    hold the event loop (and every request and socket) for the whole render
+    """
+    try:
+        from eventlet import patcher, tpool
+        if patcher.is_monkey_patched("thread"):
+            return tpool.execute(fn, *args)
+    except ImportError:
+        pass
+    try:
+        from gevent import get_hub, monkey
+        if monkey.is_module_patched("threading"):
+            return get_hub().threadpool.apply(fn, args)
+    except ImportError:
+        pass
+    return fn(*args)
+
+
+class ThumbnailPipeline:
+    """
+    Precomputed image sizes (64/256/800 by default) in WebP and JPEG
+    Uploads return as soon as the original is stored, derivatives are rendered by a
+    small worker pool (rendering on OS threads even under eventlet) and saved next to it
+    under predictable keys, so serializers can build size-specific URLs; whether a blob's
+    derivatives exist is checked once and cached, missing ones are rechecked every
+    MISSING_RECHECK_SECONDS
+    """
+
+    MISSING_RECHECK_SECONDS = 30
+
+    def __init__(self):
+        self.sizes = (64, 256, 800)
+        self.extensions = ("webp", "jpg")
+        self.quality = 80
+        self.workers = 2
+        self._executor = None
+        self._lock = threading.Lock()
+        self._ready = TTLCache(maxsize=50000, ttl=3600)
+
+    def init_app(self, app):
+        self.sizes = tuple(app.config.get('IMAGE_THUMBNAIL_SIZES', self.sizes))
+        self.extensions = tuple(app.config.get('IMAGE_THUMBNAIL_FORMATS', self.extensions))
+        self.quality = app.config.get('IMAGE_THUMBNAIL_QUALITY', 80)
+        self.workers = app.config.get('IMAGE_THUMBNAIL_WORKERS', 2)
+        app.extensions['thumbnails'] = self
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="thumbnails")
+            return self._executor
+
+    def store(self, image_data):
+        """
+        Store an uploaded image and queue its thumbnails
+        Args:
+            image_data: data:image/...;base64 URI, or an http(s) URL which is kept as is
+        Returns:
+            Reference to keep in the row, or None for empty input
+        """
+        if not image_data or not image_data.startswith("data:image/"):
+            return blob_store.save(image_data)
+        raw, content_type = decode_data_uri(image_data)
+        ref = blob_store.save_bytes(raw, content_type)
+        self.submit(ref, raw)
+        return ref
+
+    def submit(self, ref, raw=None):
+        """Queue derivatives for a stored image, returns the future or None if ref is not a blob"""
+        key = blob_store.key_for(ref)
+        if key is None:
+            return None
+        return self._pool().submit(self._generate, key, raw)
+
+    def _generate(self, key, raw):
+        try:
+            return self.generate(key, raw)
+        except Exception as e:
+            print(f"❌ Thumbnail error for {key}: {e}")
+            return 0
+
+    def generate(self, key, raw=None):
+        """
+        Render and store every derivative of one blob, skipping blobs already done
+        Returns:
+            Number of derivatives written
+        """
+        backend = blob_store.backend
+        if backend.exists(self._last_variant(key)):
+            self._ready.set(key, True)
+            return 0
+        if raw is None:
+            raw = backend.get(key)
+
+        rendered = _off_event_loop(
+            lambda: list(render_thumbnails(raw, self.sizes, self.extensions, self.quality))
+        )
+        written = 0
+        for size, extension, data, content_type in rendered:
+            backend.put(variant_key(key, size, extension), data, content_type)
+            written += 1
+        self._ready.set(key, True)
+        return written
+
+    def _last_variant(self, key):
+        """Key of the derivative written last, its existence means every derivative is there"""
+        return variant_key(key, min(self.sizes), self.extensions[-1])
+
+    def ready(self, key):
+        """Whether a blob's derivatives are all stored"""
+        ready = self._ready.get(key)
+        if ready is None:
+            ready = blob_store.backend.exists(self._last_variant(key))
+            self._ready.set(key, ready, ttl=None if ready else self.MISSING_RECHECK_SECONDS)
+        return ready
+
+    def wait(self):
+        """Block until queued thumbnails are written (management commands call this before exiting)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def urls(self, ref):
+        """
+        Size-specific URLs of a stored image in the preferred format
+        Returns:
+            Dict of size -> URL, or None for external URLs, inline images and images whose
+            derivatives are not rendered yet (use the original)
+        """
+        key = blob_store.key_for(ref)
+        if key is None or not self.ready(key):
+            return None
+        backend = blob_store.backend
+        return {
+            str(size): build_image_url(backend.url(variant_key(key, size, self.extensions[0])))
+            for size in self.sizes
+        }
+
+
+def backfill_thumbnails(column, batch_size=100):
+    """
+    Render missing derivatives for images already in the blob store
+    Args:
+        column: Image column of a model, e.g. Picture.image
+        batch_size: Rows per batch, each batch is rendered by the worker pool
+    Yields:
+        Number of images processed in each batch
+    """
+    table = column.class_
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(table.id, column)
+            .where(table.id > last_id, column.like("%blobs/%"))
+            .order_by(table.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        futures = [thumbnails.submit(ref) for _, ref in rows]
+        for future in futures:
+            if future is not None:
+                future.result()
+        last_id = rows[-1][0]
+        yield len(rows)
+
+
+def image_sizes(ref):
+    """Size-specific URLs for serializers, see ThumbnailPipeline.urls"""
+    return thumbnails.urls(ref)
+
+
+# Shared pipeline instance, configured in create_app
+thumbnails = ThumbnailPipeline()
@@ -0,0 +1,167 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from models.core import db
+from models.user import TokenBlocklist
+from utils.cache import TTLCache
+from utils.helpers import start_background_task
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, no false negatives and a tunable false-positive rate"""
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class TokenRevocationCache:
+    """
+    Answers "is this JWT revoked" from memory
+    A Bloom filter of unexpired revoked JTIs fronts the token_blacklist table: a miss means
+    not revoked, only a hit is confirmed against the database. Revocations made by other
+    workers are picked up every few seconds, expired rows are pruned in batches.
+    Each sync re-reads an overlap window, so rows committed late or stamped by a skewed
+    clock are not missed; re-adding a JTI to the filter is harmless.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._lock = threading.Lock()
+        self._filter = None
+        self._confirmed = TTLCache(maxsize=10000, ttl=300)
+        self._synced_at = None
+        self._running = False
+        self.capacity = 100000
+        self.sync_seconds = 10
+        self.sync_overlap_seconds = 60
+        self.prune_seconds = 3600
+        self.prune_batch_size = 1000
+
+    def init_app(self, app):
+        self.capacity = app.config.get('TOKEN_BLOCKLIST_BLOOM_CAPACITY', 100000)
+        self.sync_seconds = app.config.get('TOKEN_BLOCKLIST_SYNC_SECONDS', 10)
+        self.sync_overlap_seconds = app.config.get('TOKEN_BLOCKLIST_SYNC_OVERLAP_SECONDS', 60)
+        self.prune_seconds = app.config.get('TOKEN_BLOCKLIST_PRUNE_SECONDS', 3600)
+        self.prune_batch_size = app.config.get('TOKEN_BLOCKLIST_PRUNE_BATCH_SIZE', 1000)
+        self._app = app
+        app.extensions['token_revocations'] = self
+
+    def is_revoked(self, jti):
+        """Check a token, touching the database only on a Bloom filter hit"""
+        if self._filter is None:
+            self.reload()
+        if jti not in self._filter:
+            return False
+
+        revoked = self._confirmed.get(jti)
+        if revoked is None:
+            revoked = db.session.query(TokenBlocklist.id).filter_by(jti=jti).first() is not None
+            self._confirmed.set(jti, revoked)
+        return revoked
+
+    def revoke(self, jti):
+        """Add a token revoked by this worker, called by /logout after the blocklist row is committed"""
+        if self._filter is None:
+            self.reload()
+        with self._lock:
+            self._filter.add(jti)
+        self._confirmed.set(jti, True)
+
+    def reload(self):
+        """Rebuild the filter from every unexpired revoked token"""
+        now = datetime.utcnow()
+        jtis = db.session.execute(
+            select(TokenBlocklist.jti).where(TokenBlocklist.expires > now)
+        ).scalars().all()
+
+        bloom = BloomFilter(capacity=max(self.capacity, 2 * len(jtis)))
+        for jti in jtis:
+            bloom.add(jti)
+        with self._lock:
+            self._filter = bloom
+            self._synced_at = now - timedelta(seconds=self.sync_overlap_seconds)
+        self._confirmed.clear()
+        self._ensure_running()
+        return len(jtis)
+
+    def sync(self):
+        """Add tokens revoked by other workers since the last sync"""
+        now = datetime.utcnow()
+        jtis = db.session.execute(
+            select(TokenBlocklist.jti).where(TokenBlocklist.revoked_at >= self._synced_at)
+        ).scalars().all()
+        with self._lock:
+            for jti in jtis:
+                self._filter.add(jti)
+            self._synced_at = now - timedelta(seconds=self.sync_overlap_seconds)
+        for jti in jtis:
+            self._confirmed.pop(jti)
+        return len(jtis)
+
+    def prune(self):
+        """
+        Delete expired blocklist rows in batches, then rebuild the filter without them
+        Returns:
+            Number of rows deleted
+        """
+        now = datetime.utcnow()
+        deleted = 0
+        while True:
+            ids = db.session.execute(
+                select(TokenBlocklist.id).where(TokenBlocklist.expires <= now).limit(self.prune_batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            db.session.execute(delete(TokenBlocklist).where(TokenBlocklist.id.in_(ids)))
+            db.session.commit()
+            deleted += len(ids)
+
+        self.reload()
+        return deleted
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._running or self._app is None or 'socketio' not in self._app.extensions:
+                return
+            self._running = True
+        start_background_task(self._app, self._run)
+
+    def _run(self):
+        socketio = self._app.extensions['socketio']
+        pruned_at = time.monotonic()
+        while True:
+            socketio.sleep(self.sync_seconds)
+            try:
+                with self._app.app_context():
+                    if time.monotonic() - pruned_at >= self.prune_seconds:
+                        pruned_at = time.monotonic()
+                        deleted = self.prune()
+                        if deleted:
+                            print(f"🧹 Pruned {deleted} expired blocklist tokens")
+                    else:
+                        self.sync()
+            except Exception as e:
+                print(f"❌ Token blocklist sync error: {e}")
+
+
+# Shared revocation cache instance, configured in create_app
+token_revocations = TokenRevocationCache()
@@ -0,0 +1,111 @@
+from sqlalchemy import case, func, insert, select, update, delete
+
+from models.core import db
+from models.user import UserCounter
+from models.chat import Conversation, Message, UnreadCounter
+from utils.helpers import dialect_insert
+
+
+def _floor_subtract(column, amount):
+    """column - amount, never below zero"""
+    return case((column > amount, column - amount), else_=0)
+
+
+def increment(conversation_id, recipient_id, amount=1):
+    """
+    Count new unread messages for the recipient of a conversation
+    Runs inside the caller's transaction, so it commits together with the message
+    """
+    counter = dialect_insert(UnreadCounter).values(
+        user_id=recipient_id, conversation_id=conversation_id, unread_count=amount
+    )
+    db.session.execute(counter.on_conflict_do_update(
+        index_elements=[UnreadCounter.user_id, UnreadCounter.conversation_id],
+        set_={"unread_count": UnreadCounter.unread_count + amount}
+    ))
+
+    total = dialect_insert(UserCounter).values(user_id=recipient_id, unread_messages=amount)
+    db.session.execute(total.on_conflict_do_update(
+        index_elements=[UserCounter.user_id],
+        set_={"unread_messages": UserCounter.unread_messages + amount}
+    ))
+
+
+def mark_read(user_id, conversation_id, amount):
+    """
+    Take messages the user just read off their counters
+    Args:
+        amount: Number of messages actually flipped to read
+    """
+    if not amount:
+        return
+
+    db.session.execute(
+        update(UnreadCounter)
+        .where(UnreadCounter.user_id == user_id, UnreadCounter.conversation_id == conversation_id)
+        .values(unread_count=_floor_subtract(UnreadCounter.unread_count, amount))
+    )
+    db.session.execute(
+        update(UserCounter)
+        .where(UserCounter.user_id == user_id)
+        .values(unread_messages=_floor_subtract(UserCounter.unread_messages, amount))
+    )
+
+
+def total_unread(user_id):
+    """O(1) total unread messages for a user"""
+    total = db.session.query(UserCounter.unread_messages).filter_by(user_id=user_id).scalar()
+    return total or 0
+
+
+def rebuild(connection, user_ids=None):
+    """
+    Reconciliation job: recompute counters from the messages table
+    Args:
+        connection: Connection or session to run on
+        user_ids: Optional list of users to rebuild, defaults to everyone
+    """
+    recipient_id = case(
+        (Message.sender_id == Conversation.user1_id, Conversation.user2_id),
+        else_=Conversation.user1_id
+    )
+    unread = (
+        select(
+            recipient_id.label("user_id"),
+            Message.conversation_id,
+            func.count(Message.id).label("unread_count")
+        )
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .where(Message.is_read == False)
+        .group_by(recipient_id, Message.conversation_id)
+    )
+
+    clear_counters = delete(UnreadCounter)
+    if user_ids is not None:
+        unread = unread.having(recipient_id.in_(user_ids))
+        clear_counters = clear_counters.where(UnreadCounter.user_id.in_(user_ids))
+
+    connection.execute(clear_counters)
+    connection.execute(insert(UnreadCounter).from_select(["user_id", "conversation_id", "unread_count"], unread))
+
+    # Totals: refresh existing rows, then add rows for users that had none
+    summed = (
+        select(func.coalesce(func.sum(UnreadCounter.unread_count), 0))
+        .where(UnreadCounter.user_id == UserCounter.user_id)
+        .scalar_subquery()
+    )
+    refresh_totals = update(UserCounter).values(unread_messages=summed)
+    missing_totals = (
+        select(UnreadCounter.user_id, func.sum(UnreadCounter.unread_count))
+        .where(UnreadCounter.user_id.not_in(select(UserCounter.user_id)))
+        .group_by(UnreadCounter.user_id)
+    )
+    if user_ids is not None:
+        refresh_totals = refresh_totals.where(UserCounter.user_id.in_(user_ids))
+        missing_totals = missing_totals.where(UnreadCounter.user_id.in_(user_ids))
+
+    connection.execute(refresh_totals)
+    # Columns added by later migrations keep their database defaults (this also runs in migration 3)
+    connection.execute(
+        insert(UserCounter).from_select(["user_id", "unread_messages"], missing_totals, include_defaults=False)
+    )
@@ -3,6 +3,7 @@ import base64
 from PIL import Image
 import io
 from flask import jsonify
+from utils.blob_store import decode_data_uri
 
 def is_valid_username(username):
     """
@@ -72,13 +73,10 @@ def is_valid_image_data(image_data, max_size_kb=500):
     # Check if it's base64 encoded image data
     if image_data.startswith('data:image/'):
         try:
-            # Split data URI header from base64 data
-            header, data = image_data.split(',', 1)
-            # Verify it's valid base64
-            base64.b64decode(data)
+            # Verify it's a supported image type with valid base64
+            raw, _ = decode_data_uri(image_data)
 
-            # Calculate approximate size (base64 is about 33% larger than binary)
-            size_kb = len(data) * 3 / 4 / 1024
+            size_kb = len(raw) / 1024
             if size_kb > max_size_kb:
                 return False, f"Image size exceeds {max_size_kb}KB limit"
 
@@ -96,11 +94,10 @@ def process_image(image_data, max_size_kb=500, resize_to=(800, 800)):
     Validate and compress image data (base64 or URL).
     Returns (is_valid, message, processed_image_string)
     """
-    # Handle base64
+    # Handle base64, with the same type whitelist and strict decoding as the blob store
     if image_data.startswith('data:image/'):
         try:
-            header, data = image_data.split(',', 1)
-            raw = base64.b64decode(data)
+            raw, _ = decode_data_uri(image_data)
 
             size_kb = len(raw) / 1024
             if size_kb > max_size_kb:
@@ -524,14 +524,13 @@ export default function ChatDetailPage() {
   const fetchConversationById = async (id: string | number) => {
     if (!id) return null;
     try {
-      const response = await api.get('/chat/conversations');
+      // The slug is either a conversation id or the other user's public id
+      const chatIdStr = String(id);
+      const filter = /^\d+$/.test(chatIdStr) ? 'conversation_id' : 'user_id';
+      const response = await api.get(`/chat/conversations?${filter}=${encodeURIComponent(chatIdStr)}`);
       if (response.data.success) {
         const conversations = response.data.conversations || [];
-        const currentConv = conversations.find((conv: Conversation) => {
-          const convIdStr = String(conv.id);
-          const chatIdStr = String(id);
-          return convIdStr === chatIdStr || String(conv.other_user.id) === chatIdStr;
-        });
+        const currentConv = conversations[0];
 
         if (!currentConv) {
           setError('Chat not found');
@@ -711,6 +710,11 @@ export default function ChatDetailPage() {
       }
     };
 
+    // Batched presence: apply each status in the digest
+    const handlePresenceDigest = (data: { statuses?: any[] }) => {
+      (data?.statuses ?? []).forEach(handleOnlineStatus);
+    };
+
     const handleMessageStatusUpdate = (data: any) => {
       console.log('📬 Message status update:', data);
       if (!data) return;
@@ -741,6 +745,33 @@ export default function ChatDetailPage() {
       );
     };
 
+    // One coalesced receipt: everything the reader has seen up to up_to_id (or the listed IDs)
+    const handleMessagesRead = (data: any) => {
+      console.log('📖 Messages read:', data);
+      if (!data || data.up_to_id == null) return;
+
+      const listed = Array.isArray(data.message_ids)
+        ? new Set(data.message_ids.map((id: number | string) => String(id)))
+        : null;
+
+      setMessages(prev =>
+        prev.map(msg => {
+          if (msg.sender_id === data.reader_id || msg.is_read) return msg;
+          const covered = listed
+            ? listed.has(String(msg.id))
+            : Number(msg.id) <= Number(data.up_to_id);
+          if (!covered) return msg;
+
+          return {
+            ...msg,
+            status: 'read',
+            read_at: data.read_at ?? msg.read_at,
+            is_read: true
+          };
+        })
+      );
+    };
+
     const handleJoinedConversation = (data: any) => {
       console.log('✅ Joined conversation room:', data);
     };
@@ -748,7 +779,9 @@ export default function ChatDetailPage() {
     socket.on('new_message', handleNewMessage);
     socket.on('user_typing', handleTyping);
     socket.on('user_online_status', handleOnlineStatus);
+    socket.on('presence_digest', handlePresenceDigest);
     socket.on('message_status_update', handleMessageStatusUpdate);
+    socket.on('messages_read', handleMessagesRead);
     socket.on('joined_conversation', handleJoinedConversation);
 
     return () => {
@@ -757,7 +790,9 @@ export default function ChatDetailPage() {
       socket.off('new_message', handleNewMessage);
       socket.off('user_typing', handleTyping);
       socket.off('user_online_status', handleOnlineStatus);
+      socket.off('presence_digest', handlePresenceDigest);
       socket.off('message_status_update', handleMessageStatusUpdate);
+      socket.off('messages_read', handleMessagesRead);
       socket.off('joined_conversation', handleJoinedConversation);
 
       clearTimeout(reconnectTimer);
@@ -991,9 +1026,10 @@ export default function ChatDetailPage() {
   const markMessagesAsRead = useCallback((messageIds: (string | number)[]) => {
     if (!socket || !conversation) return;
     console.log('📖 Marking messages as read:', messageIds);
+    // The server marks everything up to the newest seen message in one statement
     socket.emit('read_messages', {
       conversation_id: conversation.id,
-      message_ids: messageIds
+      up_to_id: Math.max(...messageIds.map(id => Number(id)))
     });
   }, [socket, conversation]);
 
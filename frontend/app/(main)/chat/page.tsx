@@ -370,6 +370,11 @@ export default function ChatPage() {
       );
     };
 
+    // Batched presence: apply each status in the digest
+    const handlePresenceDigest = (data: { statuses?: any[] }) => {
+      (data?.statuses ?? []).forEach(handleOnlineStatus);
+    };
+
     // Handle message status updates
     const handleMessageStatusUpdate = (data: {
       message_id: string;
@@ -390,12 +395,48 @@ export default function ChatPage() {
       );
     };
 
+    // Handle coalesced read receipts: everything up to up_to_id (or the listed ids) is read
+    const handleMessagesRead = (data: {
+      conversation_id: number | string;
+      reader_id: string;
+      up_to_id: number | string | null;
+      count: number;
+      message_ids?: (number | string)[];
+    }) => {
+      console.log('📖 Messages read in list:', data);
+      if (!data || data.up_to_id == null) return;
+
+      const listed = Array.isArray(data.message_ids)
+        ? new Set(data.message_ids.map(id => String(id)))
+        : null;
+
+      setConversations(prev =>
+        prev.map(c => {
+          if (String(c.id) !== String(data.conversation_id)) return c;
+
+          // Read on another tab or device of this user: the unread badge shrinks
+          if (data.reader_id !== c.other_user.id) {
+            return { ...c, unread_count: Math.max(0, c.unread_count - data.count) };
+          }
+
+          // The other user read our messages: tick the last one if it is covered
+          if (c.last_message_id == null || c.last_message_sender_id === c.other_user.id) return c;
+          const covered = listed
+            ? listed.has(String(c.last_message_id))
+            : Number(c.last_message_id) <= Number(data.up_to_id);
+          return covered ? { ...c, last_message_status: 'read' } : c;
+        })
+      );
+    };
+
     // Register event listeners
     socket.on('new_message', handleNewMessage);
     socket.on('conversation_update', handleConversationUpdate);
     socket.on('user_typing', handleTyping);
     socket.on('user_online_status', handleOnlineStatus);
+    socket.on('presence_digest', handlePresenceDigest);
     socket.on('message_status_update', handleMessageStatusUpdate);
+    socket.on('messages_read', handleMessagesRead);
 
     // Cleanup
     return () => {
@@ -404,7 +445,9 @@ export default function ChatPage() {
       socket.off('conversation_update', handleConversationUpdate);
       socket.off('user_typing', handleTyping);
       socket.off('user_online_status', handleOnlineStatus);
+      socket.off('presence_digest', handlePresenceDigest);
       socket.off('message_status_update', handleMessageStatusUpdate);
+      socket.off('messages_read', handleMessagesRead);
     };
   }, [socket, isConnected, pinnedConversations, fetchConversations, hasSubscription]);
 
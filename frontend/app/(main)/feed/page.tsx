@@ -24,7 +24,9 @@ interface Post {
     id: string;
     username: string;
     name: string;
-    pictures: string[];
+    avatar?: string | null;
+    avatarSizes?: Record<string, string> | null;
+    pictures?: string[];
     department?: string;
   };
   comments_count: number;
@@ -38,12 +40,9 @@ interface ApiResponse {
   data: {
     posts: Post[];
     pagination: {
-      page: number;
       per_page: number;
-      total: number;
-      pages: number;
       has_next: boolean;
-      has_prev: boolean;
+      next_cursor: string | null;
     };
   };
 }
@@ -66,7 +65,7 @@ export default function FeedPage() {
       setLoading(true);
       console.log('🔧 Loading posts from feed...');
 
-      const response = await feedApi.getPosts(1, 20);
+      const response = await feedApi.getPosts(null, 20);
       const data: ApiResponse = response.data;
 
       console.log('🔧 Posts loaded:', data);
@@ -114,8 +113,8 @@ export default function FeedPage() {
             if (post.id === postId) {
               return {
                 ...post,
-                likes_count: data.data.post.likes_count,
-                has_liked: data.data.action === 'liked'
+                likes_count: data.data.likes_count,
+                has_liked: data.data.liked
               };
             }
             return post;
@@ -205,9 +204,7 @@ export default function FeedPage() {
   };
 
   const getUserAvatar = (post: Post) => {
-    return post.user.pictures && post.user.pictures.length > 0
-      ? post.user.pictures[0]
-      : '/api/placeholder/40/40';
+    return post.user.avatarSizes?.['64'] || post.user.avatar || post.user.pictures?.[0] || '/api/placeholder/40/40';
   };
 
   const getUserDisplayName = (post: Post) => {
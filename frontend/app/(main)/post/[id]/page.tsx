@@ -29,7 +29,9 @@ interface Comment {
     id: string;
     username: string;
     name: string;
-    pictures: string[];
+    avatar?: string | null;
+    avatarSizes?: Record<string, string> | null;
+    pictures?: string[];
     department?: string;
   };
 }
@@ -45,7 +47,9 @@ interface Post {
     id: string;
     username: string;
     name: string;
-    pictures: string[];
+    avatar?: string | null;
+    avatarSizes?: Record<string, string> | null;
+    pictures?: string[];
     department?: string;
   };
   comments_count: number;
@@ -116,8 +120,8 @@ export default function PostPage() {
           prev
             ? {
                 ...prev,
-                likes_count: data.data.post.likes_count,
-                has_liked: data.data.action === 'liked'
+                likes_count: data.data.likes_count,
+                has_liked: data.data.liked
               }
             : null
         );
@@ -215,9 +219,7 @@ export default function PostPage() {
   };
 
   const getUserAvatar = (user: any) =>
-    user.pictures && user.pictures.length > 0
-      ? user.pictures[0]
-      : '/api/placeholder/40/40';
+    user.avatarSizes?.['64'] || user.avatar || user.pictures?.[0] || '/api/placeholder/40/40';
 
   const getUserDisplayName = (user: any) => user.name || user.username;
 
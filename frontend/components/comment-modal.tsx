@@ -19,7 +19,9 @@ interface Comment {
     id: string;
     username: string;
     name: string;
-    pictures: string[];
+    avatar?: string | null;
+    avatarSizes?: Record<string, string> | null;
+    pictures?: string[];
   };
 }
 
@@ -32,7 +34,9 @@ interface Post {
     id: string;
     username: string;
     name: string;
-    pictures: string[];
+    avatar?: string | null;
+    avatarSizes?: Record<string, string> | null;
+    pictures?: string[];
   };
   comments_count: number;
   likes_count: number;
@@ -141,9 +145,7 @@ export function CommentModal({ post, open, onOpenChange, onCommentAdded }: Comme
   };
 
   const getUserAvatar = (user: any) => {
-    return user.pictures && user.pictures.length > 0
-      ? user.pictures[0]
-      : '/api/placeholder/32/32';
+    return user.avatarSizes?.['64'] || user.avatar || user.pictures?.[0] || '/api/placeholder/32/32';
   };
 
   const getUserDisplayName = (user: any) => {
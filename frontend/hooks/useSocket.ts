@@ -163,6 +163,22 @@ export const useSocket = (): UseSocketReturn => {
         return newSet;
       });
     });
+
+    // Batched presence: one digest carries every partner whose status changed
+    socket.on("presence_digest", (data: { statuses: { user_id: string; is_online: boolean }[] }) => {
+      console.log("👥 Presence digest:", data);
+      setOnlineUsers(prev => {
+        const newSet = new Set(prev);
+        (data?.statuses ?? []).forEach(status => {
+          if (status.is_online) {
+            newSet.add(status.user_id);
+          } else {
+            newSet.delete(status.user_id);
+          }
+        });
+        return newSet;
+      });
+    });
     // Connect the socket
     socket.connect();
     return socket;
@@ -20,8 +20,8 @@ interface UsersWhoLikedMeResponse {
   users: UserWhoLikedMe[];
   count: number;
   total_count: number;
-  page: number;
   limit: number;
+  next_cursor: string | null;
   has_more: boolean;
 }
 
@@ -75,8 +75,8 @@ const getCookie = (name: string): string | null => {
 // lib/axio.ts - Fix the feedApi methods
 export const feedApi = {
   // Posts - FIXED: Use GET method for fetching posts
-  getPosts: (page: number = 1, per_page: number = 20) =>
-    api.get(`feed/posts?page=${page}&per_page=${per_page}`),
+  getPosts: (cursor?: string | null, limit: number = 20) =>
+    api.get(`feed/posts?limit=${limit}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`),
 
   getPost: (postId: string) =>
     api.get(`feed/posts/${postId}`),
@@ -93,8 +93,8 @@ export const feedApi = {
 
 
   // Comments - Make sure these endpoints match your backend
-  getComments: (postId: string, page: number = 1, per_page: number = 50) =>
-    api.get(`feed/posts/${postId}/comments?page=${page}&per_page=${per_page}`),
+  getComments: (postId: string, cursor?: string | null, limit: number = 50) =>
+    api.get(`feed/posts/${postId}/comments?limit=${limit}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`),
 
   createComment: (postId: string, text: string) =>
     api.post(`feed/posts/${postId}/comments`, { text }),
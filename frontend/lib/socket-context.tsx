@@ -64,6 +64,11 @@ export const SocketProvider: React.FC<SocketProviderProps> = ({ children }) => {
     });
   }, []);
 
+  // 🔹 Handle batched presence digests
+  const handlePresenceDigest = useCallback((data: any) => {
+    (data?.statuses ?? []).forEach(handleOnlineStatus);
+  }, [handleOnlineStatus]);
+
   // 🔹 Emit online when connected
   useEffect(() => {
     if (!shouldUseSocket || !socket || !isConnected || !userId) return;
@@ -85,10 +90,12 @@ export const SocketProvider: React.FC<SocketProviderProps> = ({ children }) => {
   useEffect(() => {
     if (!shouldUseSocket || !socket) return;
     socket.on('user_online_status', handleOnlineStatus);
+    socket.on('presence_digest', handlePresenceDigest);
     return () => {
       socket.off('user_online_status', handleOnlineStatus);
+      socket.off('presence_digest', handlePresenceDigest);
     };
-  }, [shouldUseSocket, socket, handleOnlineStatus]);
+  }, [shouldUseSocket, socket, handleOnlineStatus, handlePresenceDigest]);
 
   // 🔹 Auto-reconnect if connection error
   useEffect(() => {
@@ -37,7 +37,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       });
     }
     console.log("Token:", token); // Debugging line to check the token value
-    const backendRes = await fetch(`${BACKEND_URL}/conversations`, {
+    const query = new URLSearchParams(req.query as Record<string, string>).toString();
+    const backendRes = await fetch(`${BACKEND_URL}/conversations${query ? `?${query}` : ''}`, {
       method: "GET",
       headers: { 
         "Content-Type": "application/json",
@@ -6,7 +6,8 @@ const BACKEND_URL = process.env.NODE_ENV === "development"
   : "https://laumeet.onrender.com";
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
-  const url = `${BACKEND_URL}/api/posts`;
+  const query = new URLSearchParams(req.query as Record<string, string>).toString();
+  const url = `${BACKEND_URL}/api/posts${query ? `?${query}` : ''}`;
 
   console.log(`🔧 Feed Posts Proxy: ${req.method} ${url}`);
   console.log("🔧 Request body:", req.body);
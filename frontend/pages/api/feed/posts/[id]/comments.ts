@@ -15,7 +15,10 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     });
   }
 
-  const url = `${BACKEND_URL}/api/posts/${id}/comments`;
+  const params = new URLSearchParams(req.query as Record<string, string>);
+  params.delete('id');
+  const query = params.toString();
+  const url = `${BACKEND_URL}/api/posts/${id}/comments${query ? `?${query}` : ''}`;
 
   console.log(`🔧 Comments API: ${req.method} ${url}`);
   console.log("🔧 Cookies:", req.headers.cookie);
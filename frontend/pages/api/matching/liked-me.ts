@@ -30,7 +30,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         });
       }
 
-      const backendRes = await fetch(`${BACKEND_URL}/users/liked-me`, {
+      const query = new URLSearchParams(req.query as Record<string, string>).toString();
+      const backendRes = await fetch(`${BACKEND_URL}/users/liked-me${query ? `?${query}` : ''}`, {
         method: "GET",
         headers: { 
           "Content-Type": "application/json",